@@ -0,0 +1,100 @@
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from common import ErrorCollector
+from bench_iterative import random_expression, outcome
+from fast_scanner import FastScanner
+from parser import Parser
+from interpreter import Interpreter
+from ast_printer import AstPrinter
+from ast_arena import AstArena, ArenaParser
+from lox_runtime_error import LoxRuntimeError
+
+class GcTimer:
+
+    def __init__(self):
+        self.total: float = 0.0
+        self.collections: int = 0
+        self.started: float = 0.0
+
+    def __call__(self, phase: str, info: dict):
+        if phase == "start":
+            self.started = time.perf_counter()
+        else:
+            self.total += time.perf_counter() - self.started
+            self.collections += 1
+
+def arena_outcome(arena: AstArena) -> tuple:
+    try:
+        return ("value", repr(arena.evaluate()))
+    except LoxRuntimeError as error:
+        return ("error", error.message, id(error.token))
+    except ZeroDivisionError:
+        return ("zero division",)
+
+def check(rng: random.Random, cases: int):
+    for _ in range(cases):
+        source: str = random_expression(rng, 6)
+        tokens: list = FastScanner(source, ErrorCollector()).scan_tokens()
+        expr = Parser(tokens).parse()
+        arena: AstArena = ArenaParser(tokens).parse_arena()
+
+        if arena.print() != AstPrinter().print(expr):
+            raise AssertionError(f"Printing differs on {source!r}")
+        if arena_outcome(arena) != outcome(Interpreter(), expr):
+            raise AssertionError(f"Evaluation differs on {source!r}")
+        if AstPrinter().print(arena.to_expr()) != AstPrinter().print(expr):
+            raise AssertionError(f"to_expr differs on {source!r}")
+        if AstArena.loads(arena.dumps()).print() != AstArena.from_expr(expr).print():
+            raise AssertionError(f"Serialization differs on {source!r}")
+
+def large_source(terms: int) -> str:
+    return " + ".join(f"({i} * 2.5 - -{i % 10}) / (3 + {i % 7})" for i in range(terms))
+
+def build(parse) -> tuple[object, float, float, int, int]:
+    timer: GcTimer = GcTimer()
+    gc.collect()
+    gc.callbacks.append(timer)
+    start: float = time.perf_counter()
+    try:
+        result = parse()
+        elapsed: float = time.perf_counter() - start
+    finally:
+        gc.callbacks.remove(timer)
+
+    #Measured separately because tracing allocations slows parsing down several times
+    del result
+    tracemalloc.start()
+    result = parse()
+    size: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, timer.total, timer.collections, size
+
+def main():
+    check(random.Random(0), 2000)
+    print("AstArena matches the Expr tree on 2000 random sources")
+
+    terms: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source: str = large_source(terms)
+    tokens: list = FastScanner(source, ErrorCollector()).scan_tokens()
+
+    _, tree_time, tree_gc, tree_collections, tree_size = build(lambda: Parser(tokens).parse())
+    arena, arena_time, arena_gc, arena_collections, arena_size = build(lambda: ArenaParser(tokens).parse_arena())
+
+    print(f"{len(tokens)} tokens, {len(arena)} nodes")
+    print(f"Expr tree: parse {tree_time * 1e3:8.1f} ms, gc {tree_gc * 1e3:7.1f} ms in {tree_collections:3} collections, {tree_size / 1e6:7.2f} MB")
+    print(f"AstArena:  parse {arena_time * 1e3:8.1f} ms, gc {arena_gc * 1e3:7.1f} ms in {arena_collections:3} collections, {arena_size / 1e6:7.2f} MB")
+
+    start: float = time.perf_counter()
+    arena.evaluate()
+    evaluate_time: float = time.perf_counter() - start
+    start = time.perf_counter()
+    data: bytes = arena.dumps()
+    AstArena.loads(data)
+    serialize_time: float = time.perf_counter() - start
+    print(f"AstArena.evaluate {evaluate_time * 1e3:.1f} ms, dumps + loads {serialize_time * 1e3:.1f} ms ({len(data) / 1e6:.2f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import contextlib
+import io
+import random
+import sys
+import time
+import common
+from lox import Lox
+from batch import Batch, BatchError
+
+def sources(count: int) -> list[str]:
+    rng: random.Random = random.Random(0)
+    out: list[str] = []
+    for i in range(count):
+        a: int = rng.randint(0, 99)
+        b: int = rng.randint(1, 99)
+        match i % 6:
+            case 0: out.append(f"({a} + {b}) * {a} - {b} / 2")
+            case 1: out.append(f"\"id-\" + \"{a}\"")
+            case 2: out.append(f"{a} < {b} == !false")
+            case 3: out.append(f"-{a} * (\"x\" - {b})")
+            case 4: out.append(f"{a} + * {b}")
+            case 5: out.append(f"{a} / 0 + {b}")
+    return out
+
+def literal(value) -> str:
+    if isinstance(value, str): return f'"{value}"'
+    if value is None: return "nil"
+    if isinstance(value, bool): return "true" if value else "false"
+    return repr(value)
+
+def rows(count: int) -> list[dict]:
+    rng: random.Random = random.Random(1)
+    out: list[dict] = []
+    for _ in range(count):
+        row: dict = {"x": float(rng.randint(0, 99)), "y": float(rng.randint(0, 99))}
+        #Now and then a row with a mistyped, missing or zero input
+        roll: float = rng.random()
+        if roll < 0.05: row["y"] = "s"
+        elif roll < 0.1: del row["y"]
+        elif roll < 0.15: row["y"] = 0.0
+        out.append(row)
+    return out
+
+ROW_EXPRESSION: str = "(x + y) * x - x / y > 10 or y == nil"
+
+def substitute(row: dict) -> str:
+    #ROW_EXPRESSION with the row's values written in as literals
+    source: str = ROW_EXPRESSION
+    for name, value in row.items():
+        source = source.replace(name, literal(value))
+    return source
+
+def check_rows(items: list[dict]):
+    #Each row must give what the same expression with the row's values written in gives
+    results: list = Batch().evaluate_rows(ROW_EXPRESSION, items)
+    for row, result in zip(items, results):
+        expected = Batch().evaluate_one(substitute(row))
+        if result != expected:
+            raise AssertionError(f"{row}: {result!r} != {expected!r}")
+
+def main():
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    items: list[str] = sources(count)
+
+    lox: Lox = Lox(["pylox"])
+    start: float = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for source in items:
+            lox.had_error = False
+            #Lox.run lets division by zero escape, a caller has to guard every item
+            try:
+                lox.run(source)
+            except ZeroDivisionError:
+                pass
+    loop_time: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results: list = Batch().evaluate(items)
+    batch_time: float = time.perf_counter() - start
+
+    errors: int = sum(1 for result in results if isinstance(result, BatchError))
+    print(f"{count} sources, {errors} errors")
+    print(f"Lox.run per item: {loop_time * 1e3:9.2f} ms")
+    print(f"Batch.evaluate:   {batch_time * 1e3:9.2f} ms  ({loop_time / batch_time:.2f}x)")
+
+    inputs: list[dict] = rows(count)
+    check_rows(inputs[:500])
+    substituted: list[str] = [substitute(row) for row in inputs]
+
+    start = time.perf_counter()
+    Batch().evaluate(substituted)
+    per_source_time: float = time.perf_counter() - start
+    start = time.perf_counter()
+    results = Batch().evaluate_rows(ROW_EXPRESSION, inputs)
+    rows_time: float = time.perf_counter() - start
+
+    errors = sum(1 for result in results if isinstance(result, BatchError))
+    print(f"{count} rows of one expression, {errors} errors")
+    print(f"one source per row:   {per_source_time * 1e3:9.2f} ms")
+    print(f"Batch.evaluate_rows:  {rows_time * 1e3:9.2f} ms  ({per_source_time / rows_time:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import sys
+from common import parse, best_of
+from interpreter import Interpreter
+from closure_compiler import ClosureCompiler
+
+def deep_source(depth: int) -> str:
+    #Alternate operators so every level is a Binary node with a nested right operand
+    ops: list[str] = ["+", "*", "-", "/"]
+    source: str = "1"
+    for i in range(depth):
+        source = f"({i % 7 + 1} {ops[i % 4]} -{source})"
+    return source
+
+def main():
+    depth: int = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    number: int = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), depth * 20))
+
+    expr = parse(deep_source(depth))
+    interpreter: Interpreter = Interpreter()
+    #Everything here is a literal, so without this the whole tree folds to one constant
+    unfolded = ClosureCompiler(fold_constants=False).compile(expr)
+    folded = ClosureCompiler().compile(expr)
+
+    expected = interpreter.evaluate(expr)
+    assert unfolded() == expected and folded() == expected
+
+    tree_time: float = best_of(lambda: interpreter.evaluate(expr), number=number)
+    closure_time: float = best_of(unfolded, number=number)
+    folded_time: float = best_of(folded, number=number)
+    compile_time: float = best_of(lambda: ClosureCompiler().compile(expr), number=10)
+
+    print(f"depth {depth}")
+    print(f"Interpreter.evaluate:  {tree_time * 1e6:10.1f} us")
+    print(f"closures, no folding:  {closure_time * 1e6:10.1f} us  ({tree_time / closure_time:.2f}x)")
+    print(f"closures, folded:      {folded_time * 1e6:10.1f} us  ({tree_time / folded_time:.2f}x)")
+    print(f"ClosureCompiler.compile: {compile_time * 1e6:8.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import gc
+import random
+import sys
+import weakref
+from common import ErrorCollector, parse, best_of
+from bench_iterative import random_expression, outcome
+from bench_inline_cache import formula, mixed
+from scanner import Scanner
+from parser import Parser
+from expr import *
+from interpreter import Interpreter
+from closure_compiler import ClosureCompiler
+from python_compiler import PythonCompiler, SourceGenerator
+from ast_printer import AstPrinter
+
+def check(rng: random.Random, cases: int):
+    #A tiny nesting limit spills nearly every node, checking that spilling keeps evaluation order
+    default: int = SourceGenerator.MAX_NESTING
+    for nesting in (default, 2):
+        SourceGenerator.MAX_NESTING = nesting
+        #A small cache, so eviction and recompiling happen during the run too
+        compiler: PythonCompiler = PythonCompiler(max_entries=32)
+        for _ in range(cases):
+            source: str = random_expression(rng, rng.randint(1, 7))
+            expression: Expr|None = Parser(Scanner(source, ErrorCollector()).scan_tokens(), ErrorCollector()).parse()
+            if expression is None: continue
+            expected: tuple = outcome(Interpreter(), expression)
+            if outcome(compiler, expression) != expected:
+                raise AssertionError(f"Generated code differs from Interpreter on {AstPrinter().print(expression)}")
+            #A fresh tree of the same shape shares the code object but not its constants or tokens
+            copy: Expr = parse(source)
+            if outcome(compiler, copy) != outcome(Interpreter(), copy):
+                raise AssertionError(f"Shared code object differs from Interpreter on {source}")
+    SourceGenerator.MAX_NESTING = default
+
+    #Far deeper than one Python expression may nest
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+    deep: Expr = parse("1" + " - 1" * 3000 + " == " + "-" * 500 + "2")
+    compiler = PythonCompiler()
+    if repr(compiler.evaluate(deep)) != repr(Interpreter().evaluate(deep)) or compiler.misses != 1:
+        raise AssertionError("Deep expression differs from Interpreter or was not compiled")
+
+    #A tree that falls back to the Interpreter must still be collectable
+    generate = SourceGenerator.generate
+    SourceGenerator.generate = too_deep
+    try:
+        compiler = PythonCompiler()
+        tree: Expr = parse("1 + 2 * 3")
+        collected: weakref.ref = weakref.ref(tree)
+        if compiler.evaluate(tree) != 7.0:
+            raise AssertionError("Fallback evaluation differs from Interpreter")
+        del tree
+        gc.collect()
+        if collected() is not None:
+            raise AssertionError("PythonCompiler keeps a tree it could not compile alive")
+    finally:
+        SourceGenerator.generate = generate
+
+def too_deep(generator: SourceGenerator, expression: Expr) -> str:
+    raise RecursionError()
+
+def main():
+    runs: int = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    check(random.Random(0), 5000)
+    print("Generated code matches Interpreter on 2 x 5000 random expressions")
+
+    for name, source in (("numeric formula", formula(60)), ("mixed types", mixed(200))):
+        expression: Expr = parse(source)
+        interpreter: Interpreter = Interpreter()
+        closures: ClosureCompiler = ClosureCompiler(fold_constants=False)
+        compiler: PythonCompiler = PythonCompiler()
+        expected: str = repr(interpreter.evaluate(expression))
+        if repr(closures.compile(expression)()) != expected or repr(compiler.evaluate(expression)) != expected:
+            raise AssertionError(f"{name}: results differ")
+
+        def run(evaluate):
+            def timed():
+                for _ in range(runs):
+                    evaluate()
+            return best_of(timed, 3)
+
+        tree_time: float = run(lambda: interpreter.evaluate(expression))
+        closure_time: float = run(closures.compile(expression))
+        python_time: float = run(compiler.compile(expression))
+        print(f"{name}: {runs} evaluations  interpreter {tree_time * 1000:8.2f} ms  "
+              f"closures {closure_time * 1000:8.2f} ms ({tree_time / closure_time:.1f}x)  "
+              f"generated {python_time * 1000:8.2f} ms ({tree_time / python_time:.1f}x)")
+
+    #Many trees with one shape: only the first pays for compile()
+    rng: random.Random = random.Random(7)
+    sources: list[str] = [f"({rng.randint(0, 99)} + {rng.randint(0, 99)}) * 2 - {rng.randint(1, 9)} < 50" for _ in range(2000)]
+    trees: list[Expr] = [parse(source) for source in sources]
+
+    def compile_shared():
+        compiler: PythonCompiler = PythonCompiler()
+        for tree in trees:
+            compiler.evaluate(tree)
+
+    def compile_unshared():
+        compiler: PythonCompiler = PythonCompiler(max_entries=0)
+        for tree in trees:
+            compiler.evaluate(tree)
+
+    shared_time: float = best_of(compile_shared, 3)
+    unshared_time: float = best_of(compile_unshared, 3)
+    print(f"compile and run {len(trees)} same-shaped trees: no code cache {unshared_time * 1000:8.2f} ms  "
+          f"code cache {shared_time * 1000:8.2f} ms  ({unshared_time / shared_time:.1f}x)")
+
+if __name__ == "__main__":
+    main()
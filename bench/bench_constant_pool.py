@@ -0,0 +1,70 @@
+import random
+import sys
+import tracemalloc
+from common import ErrorCollector, best_of
+from bench_scanner import random_source
+from scanner import Scanner
+from fast_scanner import FastScanner
+from constant_pool import ConstantPool
+
+class NoPool:
+    #Stands in for ConstantPool with the scanners' behaviour before interning
+
+    def lexeme(self, text: str) -> str:
+        return text
+
+    def string(self, value: str) -> str:
+        return value
+
+    def number(self, text: str) -> float:
+        return float(text)
+
+def generated_source(lines: int) -> str:
+    #Machine-generated rules reuse a small vocabulary of names, units and thresholds
+    rng: random.Random = random.Random(2)
+    names: list[str] = ["price", "total", "count", "weight", "rate", "limit"]
+    units: list[str] = ['"USD"', '"EUR"', '"kg"', '"items"']
+    out: list[str] = []
+    for _ in range(lines):
+        out.append(f"({rng.choice(names)} * {rng.choice(['1.5', '2', '0.25', '100'])} + {rng.choice(names)}) "
+                   f"* {rng.choice(units)} >= -{rng.choice(['10', '250', '99.5'])} and {rng.choice(units)} != nil;")
+    return "\n".join(out)
+
+def retained(fn) -> tuple[object, int]:
+    tracemalloc.start()
+    result: object = fn()
+    size: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def check(rng: random.Random, cases: int):
+    for _ in range(cases):
+        source: str = random_source(rng, rng.randint(0, 60))
+        for scanner_class in (Scanner, FastScanner):
+            pooled: list = [(t.type, t.lexeme, t.literal, t.line) for t in scanner_class(source, ErrorCollector()).scan_tokens()]
+            plain: list = [(t.type, t.lexeme, t.literal, t.line) for t in scanner_class(source, ErrorCollector(), NoPool()).scan_tokens()]
+            if pooled != plain:
+                raise AssertionError(f"Pooled {scanner_class.__name__} differs on {source!r}")
+
+def main():
+    lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    check(random.Random(0), 1000)
+    print("Pooled scanners match unpooled scanners on 1000 random sources")
+
+    source: str = generated_source(lines)
+    print(f"{len(source)} chars")
+    for scanner_class in (Scanner, FastScanner):
+        pooled_scanner = scanner_class(source, ErrorCollector())
+        tokens, pooled = retained(pooled_scanner.scan_tokens)
+        _, plain = retained(lambda: scanner_class(source, ErrorCollector(), NoPool()).scan_tokens())
+        pooled_time: float = best_of(lambda: scanner_class(source, ErrorCollector()).scan_tokens(), 3)
+        plain_time: float = best_of(lambda: scanner_class(source, ErrorCollector(), NoPool()).scan_tokens(), 3)
+
+        print(f"{scanner_class.__name__}: {len(tokens)} tokens")
+        for name, (lookups, distinct) in pooled_scanner.pool.stats().items():
+            print(f"  {name:<8} {lookups:8d} lookups  {distinct:6d} distinct  ({lookups / max(distinct, 1):.0f}x dedup)")
+        print(f"  retained {plain / 1e6:6.2f} MB -> {pooled / 1e6:6.2f} MB  ({(plain - pooled) / 1e6:.2f} MB saved)")
+        print(f"  scan     {plain_time * 1000:6.1f} ms -> {pooled_time * 1000:6.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import random
+import sys
+import tracemalloc
+from typing import Any
+from common import ErrorCollector, best_of
+from bench_iterative import random_expression, outcome
+from fast_scanner import FastScanner
+from parser import Parser
+from interpreter import Interpreter
+from resolver import Resolver
+from lox_runtime_error import LoxRuntimeError
+from expr import Expr
+from hash_cons import HashConsParser, MemoizingInterpreter
+
+#Globals of every evaluation, u is never defined
+VALUES: dict[str, Any] = {"x": 2.0, "y": 0.5, "s": "a"}
+
+def numeric_expression(rng: random.Random, depth: int) -> str:
+    #Always evaluates to a number, so timings cover the whole tree
+    if depth == 0 or rng.random() < 0.2: return str(rng.randint(1, 9))
+    if rng.random() < 0.2: return "-" + numeric_expression(rng, depth - 1)
+    op: str = rng.choice(["+", "-", "*"])
+    return f"({numeric_expression(rng, depth - 1)} {op} {numeric_expression(rng, depth - 1)})"
+
+def variable_expression(rng: random.Random, depth: int) -> str:
+    #Like random_expression over variables too, with assignments that change x between repeats
+    roll: float = rng.random()
+    if depth == 0 or roll < 0.25: return rng.choice(["x", "y", "s", "u", "1", "2.5", "\"a\"", "nil"])
+    if roll < 0.35: return rng.choice(["-", "!"]) + variable_expression(rng, depth - 1)
+    if roll < 0.4: return f"(x = {variable_expression(rng, depth - 1)})"
+    op: str = rng.choice(["+", "-", "*", "/", "<", "==", "and", "or"])
+    return f"({variable_expression(rng, depth - 1)} {op} {variable_expression(rng, depth - 1)})"
+
+def numeric_variable_expression(rng: random.Random, depth: int) -> str:
+    #numeric_expression with variables among the leaves
+    if depth == 0 or rng.random() < 0.2: return rng.choice(["x", "y", str(rng.randint(1, 9))])
+    if rng.random() < 0.2: return "-" + numeric_variable_expression(rng, depth - 1)
+    op: str = rng.choice(["+", "-", "*"])
+    return f"({numeric_variable_expression(rng, depth - 1)} {op} {numeric_variable_expression(rng, depth - 1)})"
+
+def bind(interpreter: Interpreter, expr: Expr) -> Interpreter:
+    for name, value in VALUES.items():
+        interpreter.globals[interpreter.global_slot(name)] = value
+    Resolver(interpreter).resolve_expression(expr)
+    return interpreter
+
+class Tree:
+    #Evaluates through MemoizingInterpreter.evaluate_tree, which outcome can't call
+    def __init__(self, interpreter: MemoizingInterpreter):
+        self.evaluate = interpreter.evaluate_tree
+
+def repetitive_expression(rng: random.Random, pieces: int, terms: int, piece=random_expression) -> str:
+    #A formula assembled from a few recurring subexpressions, like generated code tends to be
+    parts: list[str] = ["(" + piece(rng, 4) + ")" for _ in range(pieces)]
+    #Grouped in runs of 50 terms to stay within the recursive interpreter's depth
+    runs: list[str] = []
+    for start in range(0, terms, 50):
+        runs.append("(" + " + ".join(rng.choice(parts) for _ in range(min(50, terms - start))) + ")")
+    return " - ".join(runs)
+
+def nested_expression(levels: int) -> str:
+    #Every level repeats the previous one three times, so the source grows as 3^levels
+    source: str = "(1.5 * 2 + 3)"
+    for _ in range(levels):
+        source = f"({source} * {source} - {source} / 7)"
+    return source
+
+def check(rng: random.Random, cases: int):
+    for _ in range(cases):
+        piece = random_expression if rng.random() < 0.5 else variable_expression
+        source: str = repetitive_expression(rng, rng.randint(1, 4), rng.randint(1, 8), piece)
+        #Short-circuiting can skip the first occurrence of a piece and evaluate a later one
+        if rng.random() < 0.3:
+            source = f"({random_expression(rng, 3)})\n{rng.choice(['and', 'or'])} {source}\n{rng.choice(['and', 'or'])} {source}"
+        if rng.random() < 0.2: source = source[:rng.randint(0, len(source))]
+        tokens: list = FastScanner(source, ErrorCollector()).scan_tokens()
+        plain_errors: ErrorCollector = ErrorCollector()
+        shared_errors: ErrorCollector = ErrorCollector()
+        plain = Parser(tokens, plain_errors).parse()
+        HashConsParser(tokens, shared_errors).parse()
+
+        if plain_errors.errors != shared_errors.errors:
+            raise AssertionError(f"Parse errors differ on {source!r}")
+        if plain is None: continue
+        #Runtime errors must name the same token object, not just the same message
+        parser: HashConsParser = HashConsParser(tokens)
+        shared = parser.parse()
+        memoizing: MemoizingInterpreter = MemoizingInterpreter(parser)
+        if outcome(bind(Interpreter(), plain), plain) != outcome(Tree(bind(memoizing, shared)), shared):
+            raise AssertionError(f"Results differ on {source!r}")
+
+def check_error_line(source: str):
+    #The failing occurrence is on line 2, the one on line 1 is skipped or succeeds
+    parser: HashConsParser = HashConsParser(FastScanner(source, ErrorCollector()).scan_tokens())
+    shared: Expr = parser.parse()
+    try:
+        bind(MemoizingInterpreter(parser), shared).evaluate_tree(shared)
+    except LoxRuntimeError as error:
+        if error.token.line != 2:
+            raise AssertionError(f"Error reported on line {error.token.line} instead of 2 in {source!r}")
+    else:
+        raise AssertionError(f"Expected a runtime error in {source!r}")
+
+def retained(fn) -> tuple[object, int]:
+    tracemalloc.start()
+    result: object = fn()
+    size: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def compare(name: str, source: str):
+    tokens: list = FastScanner(source, ErrorCollector()).scan_tokens()
+    plain, plain_size = retained(lambda: Parser(tokens).parse())
+    parser: HashConsParser = HashConsParser(tokens)
+    shared, shared_size = retained(parser.parse)
+    requested, built = parser.sharing()
+
+    plain_parse: float = best_of(lambda: Parser(tokens).parse(), 3)
+    shared_parse: float = best_of(lambda: HashConsParser(tokens).parse(), 3)
+    interpreter: Interpreter = bind(Interpreter(), plain)
+    memoizing: MemoizingInterpreter = bind(MemoizingInterpreter(parser), shared)
+    if repr(interpreter.evaluate(plain)) != repr(memoizing.evaluate_tree(shared)):
+        raise AssertionError(f"{name}: results differ")
+    plain_eval: float = best_of(lambda: interpreter.evaluate(plain), 3)
+    shared_eval: float = best_of(lambda: memoizing.evaluate_tree(shared), 3)
+
+    print(f"{name}: {len(source)} chars, {requested} nodes -> {built} distinct ({requested / built:.0f}x)")
+    print(f"  tree memory  {plain_size / 1e6:8.2f} MB -> {shared_size / 1e6:8.2f} MB")
+    print(f"  parse        {plain_parse * 1000:8.2f} ms -> {shared_parse * 1000:8.2f} ms")
+    print(f"  evaluate     {plain_eval * 1000:8.2f} ms -> {shared_eval * 1000:8.2f} ms  ({plain_eval / shared_eval:.1f}x)")
+
+def main():
+    levels: int = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    check(random.Random(0), 2000)
+    check_error_line('false and ("a" - 1)\nor ("a" - 1)')
+    check_error_line('x * y and (x = s) and\nx * y')
+    print("Hash-consed trees evaluate like plain trees on 2000 random sources")
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+    compare("recurring pieces", repetitive_expression(random.Random(1), 20, 20000, numeric_expression))
+    compare("recurring pieces with variables", repetitive_expression(random.Random(1), 20, 20000, numeric_variable_expression))
+    compare(f"{levels} nested levels", nested_expression(levels))
+
+if __name__ == "__main__":
+    main()
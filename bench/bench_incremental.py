@@ -0,0 +1,116 @@
+import random
+import sys
+import time
+from common import best_of
+from bench_scanner import random_source, FRAGMENTS
+from bench_iterative import random_expression
+from pylox.lox_token import Token
+from token_type import TokenType
+from scanner import Scanner
+from parser import Parser
+from expr import *
+from incremental import IncrementalDocument
+
+class FullCollector:
+    #Errors in the form Lox reports them
+
+    def __init__(self):
+        self.errors: list[tuple[int, str, str]] = []
+
+    def error(self, token: Token|int, message: str):
+        if isinstance(token, Token):
+            where: str = "at end" if token.type == TokenType.EOF else f"at '{token.lexeme}'"
+            self.errors.append((token.line, where, message))
+        else:
+            self.errors.append((token, "", message))
+
+def shape(expr: Expr|None) -> list:
+    #Preorder description including operator lines, so shifted tokens are checked too
+    out: list = []
+    stack: list[Expr|None] = [expr]
+    while stack:
+        node: Expr|None = stack.pop()
+        if node is None:
+            out.append(None)
+        elif isinstance(node, Literal):
+            out.append(("literal", type(node.value), node.value))
+        elif isinstance(node, Grouping):
+            out.append(("grouping",))
+            stack.append(node.expression)
+        elif isinstance(node, Unary):
+            out.append(("unary", node.operator.type, node.operator.line))
+            stack.append(node.right)
+        elif isinstance(node, Variable):
+            out.append(("variable", node.name.lexeme, node.name.line))
+        elif isinstance(node, Assign):
+            out.append(("assign", node.name.lexeme, node.name.line))
+            stack.append(node.value)
+        else:
+            out.append((type(node).__name__, node.operator.type, node.operator.line))
+            stack.append(node.right)
+            stack.append(node.left)
+    return out
+
+def full_parse(source: str) -> tuple[list, list, list]:
+    collector: FullCollector = FullCollector()
+    tokens: list[Token] = Scanner(source, collector).scan_tokens()
+    scan_errors: list = list(collector.errors)
+    expression: Expr|None = Parser(tokens, collector).parse()
+    return [(t.type, t.lexeme, t.literal, t.line) for t in tokens], collector.errors, shape(expression)
+
+def random_edit(rng: random.Random, source: str) -> tuple[int, int, str]:
+    offset: int = rng.randint(0, len(source))
+    removed: int = rng.randint(0, min(len(source) - offset, 6))
+    inserted: str = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 3)))
+    return offset, removed, inserted
+
+def check(rng: random.Random, documents: int, edits: int):
+    for _ in range(documents):
+        if rng.random() < 0.5:
+            source: str = random_source(rng, rng.randint(0, 40))
+        else:
+            source = random_expression(rng, 5).replace(" ", rng.choice([" ", "\n", " // c\n"]))
+        document: IncrementalDocument = IncrementalDocument(source)
+        for _ in range(edits):
+            edit: tuple[int, int, str] = random_edit(rng, document.source)
+            document.edit(*edit)
+            tokens, errors, tree = full_parse(document.source)
+            actual: list = [(t.type, t.lexeme, t.literal, t.line) for t in document.tokens]
+            if actual != tokens:
+                raise AssertionError(f"Tokens differ after {edit!r} giving {document.source!r}")
+            if document.errors() != errors:
+                raise AssertionError(f"Errors differ after {edit!r} giving {document.source!r}: {document.errors()} != {errors}")
+            if shape(document.expression) != tree:
+                raise AssertionError(f"Trees differ after {edit!r} giving {document.source!r}")
+
+def large_source(terms: int) -> str:
+    #One expression spread over many lines, each term a parenthesised formula
+    rng: random.Random = random.Random(3)
+    return " +\n".join(f"(({rng.randint(1, 99)} * 2.5 - -{i % 7}) / (4 + {i % 13}) >= {rng.randint(0, 9)}) == !false" for i in range(terms))
+
+def main():
+    terms: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    check(random.Random(0), 300, 20)
+    print("Incremental edits match a full rescan and reparse on 300 documents x 20 edits")
+
+    source: str = large_source(terms)
+    document: IncrementalDocument = IncrementalDocument(source)
+    #Change one number in the middle line each time
+    middle: int = source.index("(", len(source) // 2) + 2
+    rng: random.Random = random.Random(4)
+
+    def incremental():
+        document.edit(middle, 1, str(rng.randint(1, 9)))
+
+    def full():
+        Parser(Scanner(document.source, None).scan_tokens()).parse()
+
+    edit_time: float = best_of(incremental, 5)
+    full_time: float = best_of(full, 3)
+    print(f"{len(source)} chars, {len(document.tokens)} tokens, {terms} lines")
+    print(f"full rescan + reparse: {full_time * 1000:8.2f} ms")
+    print(f"incremental edit:      {edit_time * 1000:8.2f} ms  ({full_time / edit_time:.1f}x), "
+          f"{document.rescanned} tokens rescanned, {document.reused} groupings reused")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import random
+import sys
+from typing import Any
+from common import parse, best_of
+from bench_iterative import random_expression, outcome
+from bench_hash_cons import numeric_expression
+from pylox.lox_token import Token
+from token_type import TokenType
+from expr import *
+from interpreter import Interpreter
+from ast_printer import AstPrinter
+
+class GenericInterpreter(Interpreter):
+    #Binary dispatch as it was before inline caches
+
+    def visit_binary_expr(self, expr: Binary) -> Any:
+        left: Any = self.evaluate(expr.left)
+        right: Any = self.evaluate(expr.right)
+        return self.binary_operation(expr.operator, left, right)
+
+def check(rng: random.Random, cases: int):
+    for _ in range(cases):
+        expression: Expr = parse(random_expression(rng, 6))
+        interpreter: Interpreter = Interpreter()
+        expected: tuple = outcome(GenericInterpreter(), expression)
+        #The second run goes through the handlers installed by the first
+        for _ in range(2):
+            if outcome(interpreter, expression) != expected:
+                raise AssertionError(f"Inline caches change the result of {AstPrinter().print(expression)}")
+
+    #Operand types only change when the tree does, so change a literal under a specialized node
+    values: list[Any] = [1.0, 2.0, "a", None, 3.0, "b", True]
+    for token_type, lexeme in ((TokenType.PLUS, "+"), (TokenType.EQUAL_EQUAL, "=="), (TokenType.LESS, "<")):
+        left: Literal = Literal(1.0)
+        right: Literal = Literal(2.0)
+        expression = Binary(left, Token(token_type, lexeme, None, 1), right)
+        interpreter = Interpreter()
+        for _ in range(50):
+            left.value = rng.choice(values)
+            right.value = rng.choice(values)
+            if outcome(interpreter, expression) != outcome(GenericInterpreter(), expression):
+                raise AssertionError(f"Guard failure changes {left.value!r} {lexeme} {right.value!r}")
+
+def formula(terms: int) -> str:
+    rng: random.Random = random.Random(5)
+    return " + ".join(f"({numeric_expression(rng, 4)})" for _ in range(terms))
+
+def mixed(terms: int) -> str:
+    #Strings and comparisons as well as numbers
+    parts: list[str] = ["(\"ab\" + \"cd\" == \"abcd\")", "(1.5 * 4 > 2 - 1)", "(\"x\" != \"y\")", "(true == !nil)"]
+    return " == ".join(parts[i % len(parts)] for i in range(terms))
+
+def main():
+    runs: int = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    check(random.Random(0), 2000)
+    print("Inline caches match the generic dispatch on 2000 random expressions and changing operand types")
+
+    for name, source in (("numeric formula", formula(60)), ("mixed types", mixed(200))):
+        expression: Expr = parse(source)
+        cached: Interpreter = Interpreter()
+        generic: GenericInterpreter = GenericInterpreter()
+        if repr(cached.evaluate(expression)) != repr(generic.evaluate(expression)):
+            raise AssertionError(f"{name}: results differ")
+
+        def run_cached():
+            for _ in range(runs):
+                cached.evaluate(expression)
+
+        def run_generic():
+            for _ in range(runs):
+                generic.evaluate(expression)
+
+        generic_time: float = best_of(run_generic, 3)
+        cached_time: float = best_of(run_cached, 3)
+        #Counting is off for the timings, a separate run collects the stats
+        counting: Interpreter = Interpreter()
+        counting.count_inline_caches = True
+        for _ in range(runs):
+            counting.evaluate(expression)
+        print(f"{name}: {runs} evaluations  generic {generic_time * 1000:8.2f} ms  "
+              f"inline caches {cached_time * 1000:8.2f} ms  ({generic_time / cached_time:.2f}x)  {counting.inline_cache_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import random
+import sys
+import time
+from typing import Any
+from common import ErrorCollector, best_of
+from scanner import Scanner
+from fast_scanner import FastScanner
+from parser import Parser
+from iterative_parser import IterativeParser
+from interpreter import Interpreter
+from iterative_interpreter import IterativeInterpreter
+from lox_runtime_error import LoxRuntimeError
+from expr import *
+
+class Walker(IterativeInterpreter):
+    #Walks every tree with the explicit stack, however shallow
+
+    def evaluate(self, expr: Expr) -> Any:
+        return self.walk(expr)
+
+def same_tree(a: Expr, b: Expr) -> bool:
+    stack: list[tuple[Expr, Expr]] = [(a, b)]
+    while stack:
+        x, y = stack.pop()
+        if type(x) is not type(y): return False
+        if isinstance(x, Literal):
+            if type(x.value) is not type(y.value) or x.value != y.value: return False
+        elif isinstance(x, Grouping):
+            stack.append((x.expression, y.expression))
+        elif isinstance(x, Unary):
+            if x.operator is not y.operator: return False
+            stack.append((x.right, y.right))
+        elif isinstance(x, Variable):
+            if x.name is not y.name: return False
+        elif isinstance(x, Assign):
+            if x.name is not y.name: return False
+            stack.append((x.value, y.value))
+        else:
+            if x.operator is not y.operator: return False
+            stack.append((x.left, y.left))
+            stack.append((x.right, y.right))
+    return True
+
+def random_expression(rng: random.Random, depth: int) -> str:
+    roll: float = rng.random()
+    if depth == 0 or roll < 0.2:
+        return rng.choice(["1", "2.5", "0", "\"a\"", "true", "false", "nil"])
+    if roll < 0.35: return rng.choice(["-", "!"]) + random_expression(rng, depth - 1)
+    if roll < 0.5: return "(" + random_expression(rng, depth - 1) + ")"
+    op: str = rng.choice(["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "!="])
+    return random_expression(rng, depth - 1) + f" {op} " + random_expression(rng, depth - 1)
+
+def random_logical(rng: random.Random, depth: int) -> str:
+    #and/or over random operands, so both short-circuit paths and both result sides are taken
+    if depth == 0 or rng.random() < 0.2: return random_expression(rng, 2)
+    source: str = f"{random_logical(rng, depth - 1)} {rng.choice(['and', 'or'])} {random_logical(rng, depth - 1)}"
+    return f"({source})" if rng.random() < 0.3 else source
+
+def outcome(interpreter: Interpreter, expr: Expr) -> tuple:
+    try:
+        return ("value", repr(interpreter.evaluate(expr)))
+    except LoxRuntimeError as error:
+        return ("error", error.message, id(error.token))
+    except ZeroDivisionError:
+        return ("zero division",)
+
+def check(rng: random.Random, cases: int):
+    for _ in range(cases):
+        source: str = random_expression(rng, 6) if rng.random() < 0.7 else random_logical(rng, 5)
+        #Variables, and/or and assignment, including invalid targets
+        if rng.random() < 0.3:
+            target: str = rng.choice(["x = ", "y = x = ", "1 = ", "x + y = ", ""])
+            source = target + source + rng.choice([" and ", " or "]) + rng.choice(["x", "y", random_expression(rng, 3)])
+        #Break some sources to compare error reporting too
+        if rng.random() < 0.2: source = source[:rng.randint(0, len(source))]
+        tokens: list = Scanner(source, ErrorCollector()).scan_tokens()
+        recursive_errors: ErrorCollector = ErrorCollector()
+        iterative_errors: ErrorCollector = ErrorCollector()
+        recursive = Parser(tokens, recursive_errors).parse()
+        iterative = IterativeParser(tokens, iterative_errors).parse()
+
+        if recursive_errors.errors != iterative_errors.errors:
+            raise AssertionError(f"Parse errors differ on {source!r}")
+        if recursive is None: continue
+        if not same_tree(recursive, iterative):
+            raise AssertionError(f"Trees differ on {source!r}")
+        if outcome(Interpreter(), recursive) != outcome(Walker(), recursive):
+            raise AssertionError(f"Results differ on {source!r}")
+
+def deep_sources(depth: int) -> dict[str, str]:
+    return {
+        "nested groupings": "(" * depth + "1" + ")" * depth,
+        "prefix operators": "-" * depth + "1",
+        "right-nested binary": "".join(f"{i % 9} + (" for i in range(depth)) + "1" + ")" * depth,
+        "left chain": " - ".join(str(i % 9) for i in range(depth)),
+        "or chain": " or ".join(["false"] * depth + ["1"]),
+        "and chain": " and ".join(["true"] * depth + ["1"]),
+        "right-nested or": "nil or (" * depth + "1" + ")" * depth
+    }
+
+def main():
+    check(random.Random(0), 3000)
+    print("IterativeParser and IterativeInterpreter match the recursive versions on 3000 random sources")
+
+    depth: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    deep: int = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    #Each nesting level costs the recursive parser one frame per precedence rule
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), depth * 20))
+
+    print(f"depth {depth}:")
+    for name, source in deep_sources(depth).items():
+        tokens: list = FastScanner(source, ErrorCollector()).scan_tokens()
+        expr = IterativeParser(tokens).parse()
+        if repr(Interpreter().evaluate(expr)) != repr(IterativeInterpreter().walk(expr)):
+            raise AssertionError(f"{name}: results differ")
+        recursive_parse: float = best_of(lambda: Parser(tokens).parse(), number=20)
+        iterative_parse: float = best_of(lambda: IterativeParser(tokens).parse(), number=20)
+        recursive_eval: float = best_of(lambda: Interpreter().evaluate(expr), number=20)
+        iterative_eval: float = best_of(lambda: IterativeInterpreter().walk(expr), number=20)
+        print(f"  {name:<20} parse {recursive_parse * 1e6:9.1f} -> {iterative_parse * 1e6:9.1f} us   "
+              f"evaluate {recursive_eval * 1e6:9.1f} -> {iterative_eval * 1e6:9.1f} us")
+
+    print(f"depth {deep} (recursive versions exceed the recursion limit):")
+    for name, source in deep_sources(deep).items():
+        tokens = FastScanner(source, ErrorCollector()).scan_tokens()
+        start: float = time.perf_counter()
+        expr = IterativeParser(tokens).parse()
+        value = IterativeInterpreter().walk(expr)
+        print(f"  {name:<20} {(time.perf_counter() - start) * 1e3:9.1f} ms  = {value}")
+
+if __name__ == "__main__":
+    main()
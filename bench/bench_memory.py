@@ -0,0 +1,42 @@
+import sys
+import tracemalloc
+from common import ErrorCollector
+from fast_scanner import FastScanner
+from parser import Parser
+
+class DictToken:
+    #The Token layout before __slots__, for comparison
+
+    def __init__(self, type, lexeme, literal, line):
+        self.type = type
+        self.lexeme = lexeme
+        self.literal = literal
+        self.line = line
+
+def synthetic_script(terms: int) -> str:
+    return "".join(f"({i} * 2.5 - -{i % 10}) / \"s{i % 50}\" == !true +\n" for i in range(terms)) + "0"
+
+def measure(fn):
+    tracemalloc.start()
+    result = fn()
+    size: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def main():
+    terms: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    source: str = synthetic_script(terms)
+
+    tokens, token_list = measure(lambda: FastScanner(source, ErrorCollector()).scan_tokens())
+    _, dict_tokens = measure(lambda: [DictToken(t.type, t.lexeme, t.literal, t.line) for t in FastScanner(source, ErrorCollector()).scan_tokens()])
+    buffer, token_buffer = measure(lambda: FastScanner(source, ErrorCollector()).scan_buffer())
+    _, tree = measure(lambda: Parser(buffer, ErrorCollector()).parse())
+
+    print(f"{len(source)} chars, {len(tokens)} tokens")
+    print(f"list of __dict__ tokens:  {dict_tokens / 1e6:8.2f} MB")
+    print(f"list of slotted Tokens:   {token_list / 1e6:8.2f} MB")
+    print(f"TokenBuffer:              {token_buffer / 1e6:8.2f} MB")
+    print(f"AST parsed from buffer:   {tree / 1e6:8.2f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import mmap
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from common import ErrorCollector
+from bench_scanner import random_source, large_source
+from fast_scanner import FastScanner
+from byte_scanner import ByteScanner
+
+MODES: list[str] = ["baseline", "read + scan_tokens", "read + scan_buffer", "mmap + ByteScanner"]
+
+def check(rng: random.Random, cases: int):
+    for _ in range(cases):
+        source: str = random_source(rng, rng.randint(0, 60))
+        if rng.random() < 0.1: source += '"open'
+        expected_errors: ErrorCollector = ErrorCollector()
+        actual_errors: ErrorCollector = ErrorCollector()
+        expected: list = [(t.type, t.lexeme, t.literal, t.line) for t in FastScanner(source, expected_errors).scan_tokens()]
+        actual: list = [(t.type, t.lexeme, t.literal, t.line) for t in ByteScanner(source.encode(), actual_errors).scan_buffer()]
+        if actual != expected or actual_errors.errors != expected_errors.errors:
+            raise AssertionError(f"ByteScanner differs from FastScanner on {source!r}")
+
+def child(mode: str, path: str):
+    #Runs in a fresh process so ru_maxrss is this mode's own peak
+    start: float = time.perf_counter()
+    tokens: int = 0
+    if mode == "read + scan_tokens":
+        with open(path) as f:
+            tokens = len(FastScanner(f.read(), ErrorCollector()).scan_tokens())
+    elif mode == "read + scan_buffer":
+        with open(path) as f:
+            tokens = len(FastScanner(f.read(), ErrorCollector()).scan_buffer())
+    elif mode == "mmap + ByteScanner":
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            tokens = len(ByteScanner(source, ErrorCollector()).scan_buffer())
+    elapsed: float = time.perf_counter() - start
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, elapsed, tokens)
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+        return
+
+    megabytes: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    check(random.Random(0), 2000)
+    print("ByteScanner matches FastScanner on 2000 random sources")
+
+    chunk: str = large_source(20000) + "\n"
+    fd, path = tempfile.mkstemp(suffix=".lox")
+    with os.fdopen(fd, "w") as f:
+        for _ in range(max(1, megabytes * 1000000 // len(chunk))):
+            f.write(chunk)
+    size: int = os.path.getsize(path)
+    print(f"{size / 1e6:.1f} MB source")
+
+    try:
+        for mode in MODES:
+            result = subprocess.run([sys.executable, __file__, "--child", mode, path], capture_output=True, text=True, check=True)
+            peak_kb, elapsed, tokens = result.stdout.split()
+            line: str = f"  {mode:<20} peak RSS {int(peak_kb) / 1000:8.1f} MB"
+            if mode != "baseline":
+                line += f"  {size / float(elapsed) / 1e6:6.2f} MB/s  {tokens} tokens"
+            print(line)
+    finally:
+        os.remove(path)
+
+if __name__ == "__main__":
+    main()
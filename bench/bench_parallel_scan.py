@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from common import ErrorCollector, best_of
+from bench_scanner import FRAGMENTS, random_source, large_source
+from scanner import Scanner
+from fast_scanner import FastScanner
+from parallel_scanner import ParallelScanner, split_points
+
+#Quotes inside comments and comment markers inside strings, around the split points
+TRICKY: list[str] = ['// say "hi\n', '"a // b"', '"\n\n"', '"', "//", "/", "\n", "\n"]
+
+def scan(scanner_inst) -> tuple[list[tuple], list[str]]:
+    tokens: list = scanner_inst.scan_tokens()
+    return [(t.type, t.lexeme, t.literal, t.line) for t in tokens], scanner_inst.lox_interp.errors
+
+def check(rng: random.Random, cases: int, executor: ProcessPoolExecutor):
+    fragments: list[str] = FRAGMENTS + TRICKY * 3
+    for _ in range(cases):
+        source: str = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 200)))
+        if rng.random() < 0.1: source += '"open'
+        workers: int = rng.randint(1, 8)
+
+        for point in split_points(source, workers):
+            if source[point - 1] != "\n":
+                raise AssertionError(f"Split at {point} does not follow a newline in {source!r}")
+
+        fast: bool = rng.random() < 0.5
+        expected = scan((FastScanner if fast else Scanner)(source, ErrorCollector()))
+        actual = scan(ParallelScanner(source, ErrorCollector(), workers, fast, executor, min_chunk=1))
+        if actual != expected:
+            raise AssertionError(f"ParallelScanner with {workers} workers differs on {source!r}")
+
+def program_source(lines: int) -> str:
+    #large_source plus strings spanning lines and quotes inside comments
+    rng: random.Random = random.Random(2)
+    out: list[str] = large_source(lines).split("\n")
+    for i in range(0, len(out), 50):
+        out[i] += f' // a "quote {rng.randint(0, 99)}\nvar text_{i} = "first\nsecond // not a comment\nthird";'
+    return "\n".join(out)
+
+def main():
+    lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with ProcessPoolExecutor(4) as executor:
+        check(random.Random(0), 2000, executor)
+    print("ParallelScanner matches Scanner and FastScanner on 2000 random sources")
+
+    source: str = program_source(lines)
+    expected: list = Scanner(source, ErrorCollector()).scan_tokens()
+    print(f"{len(source) / 1e6:.1f}M chars, {len(expected)} tokens, {os.cpu_count()} CPUs")
+
+    for fast in (False, True):
+        scanner_class = FastScanner if fast else Scanner
+        base: float = best_of(lambda: scanner_class(source, ErrorCollector()).scan_tokens(), 3)
+        print(f"{scanner_class.__name__}.scan_tokens: {base * 1000:9.1f} ms")
+
+        for workers in (1, 2, 4, 8):
+            #Pools are started and warmed up first, so only the scan itself is timed
+            with ProcessPoolExecutor(workers) as executor:
+                scanner_inst: ParallelScanner = ParallelScanner(source, ErrorCollector(), workers, fast, executor)
+                tokens: list = scanner_inst.scan_tokens()
+                if [(t.type, t.lexeme, t.line) for t in tokens] != [(t.type, t.lexeme, t.line) for t in expected]:
+                    raise AssertionError(f"{workers} workers: tokens differ")
+                elapsed: float = best_of(lambda: ParallelScanner(source, ErrorCollector(), workers, fast, executor).scan_tokens(), 3)
+            speedup: float = base / elapsed
+            oversubscribed: str = " (more workers than CPUs)" if workers > (os.cpu_count() or 1) else ""
+            print(f"  {workers} workers: {elapsed * 1000:9.1f} ms  {speedup:5.2f}x  efficiency {speedup / workers:5.1%}{oversubscribed}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import shutil
+import sys
+import tempfile
+import time
+from common import parse
+from bench_memory import synthetic_script
+from parse_cache import ParseCache
+
+def timed(fn) -> tuple[object, float]:
+    start: float = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    terms: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source: str = synthetic_script(terms)
+    cache_dir: str = tempfile.mkdtemp()
+
+    try:
+        cold: ParseCache = ParseCache(cache_dir)
+        _, miss_time = timed(lambda: cold.get(source, "interpreter"))
+        expr, parse_time = timed(lambda: parse(source))
+        _, put_time = timed(lambda: cold.put(source, "interpreter", (expr, None)))
+        _, memory_time = timed(lambda: cold.get(source, "interpreter"))
+
+        #A fresh cache over the same directory behaves like a new process
+        warm: ParseCache = ParseCache(cache_dir)
+        _, disk_time = timed(lambda: warm.get(source, "interpreter"))
+        assert warm.disk_hits == 1
+
+        print(f"{len(source)} chars")
+        print(f"miss (hash only):   {miss_time * 1e3:9.2f} ms")
+        print(f"scan + parse:       {parse_time * 1e3:9.2f} ms")
+        print(f"store to disk:      {put_time * 1e3:9.2f} ms")
+        print(f"warm, in memory:    {memory_time * 1e3:9.2f} ms")
+        print(f"warm, from disk:    {disk_time * 1e3:9.2f} ms")
+    finally:
+        shutil.rmtree(cache_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+from common import ErrorCollector, best_of
+from bench_iterative import random_expression
+from pylox.lox_token import Token
+from token_type import TokenType
+from scanner import Scanner
+from parser import Parser
+from expr import *
+from interpreter import Interpreter
+from resolver import Resolver
+from ast_printer import AstPrinter, StreamingAstPrinter
+from output_buffer import OutputBuffer
+
+PLUS: Token = Token(TokenType.PLUS, "+", None, 1)
+OR: Token = Token(TokenType.OR, "or", None, 1)
+MINUS: Token = Token(TokenType.MINUS, "-", None, 1)
+NAME: Token = Token(TokenType.IDENTIFIER, "x", None, 1)
+
+def check(rng: random.Random, cases: int):
+    for _ in range(cases):
+        source: str = random_expression(rng, 6)
+        if rng.random() < 0.3: source = f"x = {source} or y and -z"
+        expression: Expr = Parser(Scanner(source, ErrorCollector()).scan_tokens()).parse()
+        expected: str = AstPrinter().print(expression)
+        for chunk_size in (1, 3, 8192):
+            if StreamingAstPrinter(chunk_size).print(expression) != expected:
+                raise AssertionError(f"StreamingAstPrinter({chunk_size}) differs on {source!r}")
+
+def left_chain(nodes: int) -> Expr:
+    expr: Expr = Literal(1.0)
+    for _ in range(nodes // 2):
+        expr = Binary(expr, PLUS, Literal(2.0))
+    return expr
+
+def right_chain(nodes: int) -> Expr:
+    expr: Expr = Variable(NAME, None, None)
+    for _ in range(nodes // 3):
+        expr = Logical(Literal("s"), OR, Grouping(expr))
+    return expr
+
+def balanced(nodes: int) -> Expr:
+    level: list[Expr] = [Unary(MINUS, Literal(float(i))) for i in range(nodes // 3)]
+    while len(level) > 1:
+        level = [Binary(level[i], PLUS, level[i + 1]) if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)]
+    return level[0]
+
+SHAPES: dict = {"left chain": left_chain, "right chain": right_chain, "balanced": balanced}
+
+def bench_printers(nodes: int, recursive_limit: int):
+    for name, build in SHAPES.items():
+        expression: Expr = build(nodes)
+        streaming: float = best_of(lambda: StreamingAstPrinter().print(expression), 3)
+        with open(os.devnull, "w") as devnull:
+            to_file: float = best_of(lambda: StreamingAstPrinter().write(expression, devnull), 3)
+        line: str = f"{name:<12} {nodes:>8} nodes  streaming to StringIO {streaming * 1000:9.1f} ms  to a file {to_file * 1000:9.1f} ms"
+
+        #Only chains are quadratic, a balanced tree copies each character once per level
+        if nodes > recursive_limit and build is not balanced:
+            print(f"{line}  AstPrinter skipped, quadratic at this size")
+            continue
+        start: float = time.perf_counter()
+        expected: str = AstPrinter().print(expression)
+        recursive: float = time.perf_counter() - start
+        if StreamingAstPrinter().print(expression) != expected:
+            raise AssertionError(f"{name}: printers differ")
+        print(f"{line}  AstPrinter {recursive * 1000:9.1f} ms ({recursive / streaming:.1f}x)")
+
+def run_program(interpreter: Interpreter, source: str) -> float:
+    statements: list = Parser(Scanner(source, ErrorCollector()).scan_tokens()).parse_program()
+    Resolver(interpreter).resolve(statements)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start: float = time.perf_counter()
+        interpreter.interpret_program(statements)
+        return time.perf_counter() - start
+
+class PrintingInterpreter(Interpreter):
+    #The previous behaviour, one print() per value
+
+    def visit_print_stmt(self, stmt):
+        print(self.stringify(self.evaluate(stmt.expression)))
+
+def bench_output(lines: int):
+    values: list[str] = [Interpreter.stringify(float(i)) for i in range(lines)]
+    with open(os.devnull, "w") as devnull:
+        def printing():
+            for value in values: print(value, file=devnull)
+        base: float = best_of(printing, 3)
+        print(f"{lines} lines  print() per value {base * 1000:8.1f} ms")
+
+        for size in (0, 4096, 65536, 1 << 20):
+            def buffered():
+                output: OutputBuffer = OutputBuffer(devnull, size)
+                for value in values: output.write_line(value)
+                output.flush()
+            elapsed: float = best_of(buffered, 3)
+            print(f"  OutputBuffer size {size:>7} {elapsed * 1000:8.1f} ms  ({base / elapsed:.2f}x)")
+
+    #Whole programs, where evaluating each print statement costs far more than writing its line
+    source: str = f"for (var i = 0; i < {lines // 10}; i = i + 1) print i;"
+    expected: io.StringIO = io.StringIO()
+    interpreter: Interpreter = Interpreter()
+    statements: list = Parser(Scanner(source, ErrorCollector()).scan_tokens()).parse_program()
+    Resolver(interpreter).resolve(statements)
+    with contextlib.redirect_stdout(expected):
+        interpreter.interpret_program(statements)
+    if expected.getvalue() != "".join(f"{i}\n" for i in range(lines // 10)):
+        raise AssertionError("Buffered program output differs")
+    #Alternated so both see the same machine noise
+    printing_time: float = float("inf")
+    buffered_time: float = float("inf")
+    for _ in range(5):
+        printing_time = min(printing_time, run_program(PrintingInterpreter(), source))
+        buffered_time = min(buffered_time, run_program(Interpreter(), source))
+    print(f"print loop, {lines // 10} lines  print() {printing_time * 1000:8.1f} ms  "
+          f"OutputBuffer {buffered_time * 1000:8.1f} ms  ({printing_time / buffered_time:.2f}x)")
+
+def main():
+    nodes: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    #AstPrinter is only timed on chains up to this size, one of 10^6 nodes takes it minutes
+    recursive_limit: int = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), recursive_limit * 2))
+
+    check(random.Random(0), 2000)
+    print("StreamingAstPrinter matches AstPrinter on 2000 random expressions")
+
+    for size in (nodes // 100, nodes // 10, nodes):
+        bench_printers(size, recursive_limit)
+    bench_output(nodes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import contextlib
+import io
+import random
+import sys
+from typing import Any
+from common import ErrorCollector, best_of
+from bench_iterative import outcome
+from pylox.lox_token import Token
+from scanner import Scanner
+from parser import Parser
+from expr import *
+from stmt import *
+from lox_runtime_error import LoxRuntimeError
+from interpreter import Interpreter
+from resolver import Resolver
+from optimizer import Optimizer
+from closure_compiler import ClosureCompiler
+from python_compiler import PythonCompiler
+from compiler import Compiler
+from vm import VM
+from ast_printer import AstPrinter
+
+NAMES: list[str] = ["a", "b", "c", "d"]
+
+class NameEnvironment:
+    #The classic environment: one dict per scope, searched outwards by name on every access
+
+    def __init__(self, enclosing=None):
+        self.values: dict[str, Any] = {}
+        self.enclosing: NameEnvironment|None = enclosing
+
+    def get(self, name: Token) -> Any:
+        environment: NameEnvironment|None = self
+        while environment is not None:
+            if name.lexeme in environment.values: return environment.values[name.lexeme]
+            environment = environment.enclosing
+        raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'")
+
+    def assign(self, name: Token, value: Any):
+        environment: NameEnvironment|None = self
+        while environment is not None:
+            if name.lexeme in environment.values:
+                environment.values[name.lexeme] = value
+                return
+            environment = environment.enclosing
+        raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'")
+
+class NameInterpreter(Interpreter):
+    #Variables looked up by name through a dict chain, ignoring what Resolver assigned
+
+    def __init__(self, lox_interp=None):
+        super().__init__(lox_interp)
+        self.names: NameEnvironment = NameEnvironment()
+
+    def visit_block_stmt(self, stmt: Block):
+        previous: NameEnvironment = self.names
+        try:
+            self.names = NameEnvironment(previous)
+            for statement in stmt.statements:
+                self.execute(statement)
+        finally:
+            self.names = previous
+
+    def visit_var_stmt(self, stmt: Var):
+        value: Any = None
+        if stmt.initializer is not None:
+            value = self.evaluate(stmt.initializer)
+        self.names.values[stmt.name.lexeme] = value
+
+    def visit_variable_expr(self, expr: Variable) -> Any:
+        return self.names.get(expr.name)
+
+    def visit_assign_expr(self, expr: Assign) -> Any:
+        value: Any = self.evaluate(expr.value)
+        self.names.assign(expr.name, value)
+        return value
+
+def random_operand(rng: random.Random, visible: list[str], depth: int) -> str:
+    roll: float = rng.random()
+    if depth == 0 or roll < 0.3:
+        if visible and rng.random() < 0.7: return rng.choice(visible)
+        #Now and then a name nothing declares
+        if rng.random() < 0.05: return "zz"
+        return rng.choice(["1", "2", "0.5", "nil", "true", "false"])
+    if roll < 0.45: return "(" + random_operand(rng, visible, depth - 1) + ")"
+    if roll < 0.55: return "-" + random_operand(rng, visible, depth - 1)
+    op: str = rng.choice(["+", "-", "*", "<", "==", "and", "or", "and", "or"])
+    return random_operand(rng, visible, depth - 1) + f" {op} " + random_operand(rng, visible, depth - 1)
+
+def random_statements(rng: random.Random, scopes: list[set[str]], depth: int, count: int) -> list[str]:
+    lines: list[str] = []
+    for _ in range(count):
+        visible: list[str] = sorted(set().union(*scopes))
+        roll: float = rng.random()
+        if roll < 0.25:
+            name: str = rng.choice(NAMES)
+            if len(scopes) > 1 and name in scopes[-1]: continue
+            #A local may not read itself in its initializer
+            readable: list[str] = [n for n in visible if n != name or len(scopes) == 1]
+            lines.append(f"var {name} = {random_operand(rng, readable, 2)};")
+            scopes[-1].add(name)
+        elif roll < 0.45 and any(name in NAMES for name in visible):
+            #Loop counters are never assigned, so every loop ends
+            lines.append(f"{rng.choice([n for n in visible if n in NAMES])} = {random_operand(rng, visible, 2)};")
+        elif roll < 0.6:
+            lines.append(f"print {random_operand(rng, visible, 2)};")
+        elif roll < 0.7 and depth:
+            scopes.append(set())
+            lines += ["{"] + random_statements(rng, scopes, depth - 1, rng.randint(1, 4)) + ["}"]
+            scopes.pop()
+        elif roll < 0.8 and depth:
+            counter: str = f"i{depth}"
+            scopes.append({counter})
+            scopes.append(set())
+            body: list[str] = random_statements(rng, scopes, depth - 1, rng.randint(1, 4))
+            scopes.pop()
+            scopes.pop()
+            lines += [f"for (var {counter} = 0; {counter} < 3; {counter} = {counter} + 1) {{"] + body + ["}"]
+        elif roll < 0.9 and depth:
+            condition: str = random_operand(rng, visible, 1)
+            scopes.append(set())
+            then_branch: list[str] = random_statements(rng, scopes, depth - 1, rng.randint(1, 3))
+            scopes[-1] = set()
+            else_branch: list[str] = random_statements(rng, scopes, depth - 1, rng.randint(1, 3))
+            scopes.pop()
+            lines += [f"if ({condition}) {{"] + then_branch + ["} else {"] + else_branch + ["}"]
+        else:
+            lines.append(f"{random_operand(rng, visible, 2)};")
+    return lines
+
+def run_program(interpreter: Interpreter, source: str) -> tuple[str, list[str]]:
+    collector: ErrorCollector = ErrorCollector()
+    interpreter.lox_interp = collector
+    statements: list[Stmt] = Parser(Scanner(source, collector).scan_tokens(), collector).parse_program()
+    Resolver(interpreter, collector).resolve(statements)
+    if collector.errors: raise AssertionError(f"{collector.errors} in {source}")
+    out: io.StringIO = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        interpreter.interpret_program(statements)
+    return out.getvalue(), collector.errors
+
+def bound_outcomes(expression: Expr, values: dict[str, Any]) -> list[tuple]:
+    #Every backend evaluates the same expression with the same variables bound
+    interpreter: Interpreter = Interpreter()
+    for name, value in values.items():
+        interpreter.globals[interpreter.global_slot(name)] = value
+    Resolver(interpreter).resolve_expression(expression)
+
+    closures: ClosureCompiler = ClosureCompiler()
+    closures.globals.update(values)
+    python: PythonCompiler = PythonCompiler()
+    python.globals.update(values)
+    vm: VM = VM()
+    vm.globals.update(values)
+    #Assignments change the variables, so the optimized tree gets its own copy of the same slots
+    optimizing: Interpreter = Interpreter()
+    optimizing.globals = list(interpreter.globals)
+    optimizing.global_slots = dict(interpreter.global_slots)
+    optimized: Expr = Optimizer().optimize(expression)
+
+    class Compiled:
+        def __init__(self, evaluate):
+            self.evaluate = evaluate
+
+    return [
+        outcome(interpreter, expression),
+        outcome(optimizing, optimized),
+        outcome(Compiled(lambda expr: closures.compile(expr)()), expression),
+        outcome(python, expression),
+        outcome(Compiled(lambda expr: vm.run(Compiler().compile(expr))), expression)
+    ]
+
+def check(rng: random.Random, programs: int, expressions: int):
+    for _ in range(programs):
+        source: str = "\n".join(random_statements(rng, [set()], 3, rng.randint(3, 10)))
+        if run_program(Interpreter(), source) != run_program(NameInterpreter(), source):
+            raise AssertionError(f"Slot lookups differ from name lookups on\n{source}")
+
+    for _ in range(expressions):
+        source = random_operand(rng, NAMES, 5)
+        if rng.random() < 0.3:
+            source = f"{rng.choice(NAMES)} = {source}"
+        expression: Expr = Parser(Scanner(source, ErrorCollector()).scan_tokens()).parse()
+        values: dict[str, Any] = {name: rng.choice([1.0, 0.0, None, True, False, "s"]) for name in NAMES[:3]}
+        results: list[tuple] = bound_outcomes(expression, values)
+        #Optimizing rebuilds nodes, so only its error message is compared
+        if results[1][:2] != results[0][:2] or any(result != results[0] for result in results[2:]):
+            raise AssertionError(f"Backends differ on {AstPrinter().print(expression)} with {values}: {results}")
+
+LOOPS: dict[str, str] = {
+    "locals": """{
+  var sum = 0; var i = 0;
+  while (i < N) { var x = i * 2; { var y = x + 1; sum = sum + y - x; } i = i + 1; }
+  print sum;
+}""",
+    "outer scopes": """{ var a = 1; { var b = 2; { var c = 3; { var d = 0;
+  for (var i = 0; i < N; i = i + 1) { { d = d + a + b + c; } }
+  print d;
+} } } }""",
+    "globals": """var g = 0; var step = 1; var i = 0;
+while (i < N) { g = g + step * i; i = i + 1; }
+print g;"""
+}
+
+def main():
+    iterations: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    check(random.Random(0), 1000, 3000)
+    print("Slot lookups match name lookups on 1000 random programs, "
+          "and every backend agrees on 3000 expressions over bound variables")
+
+    for name, template in LOOPS.items():
+        source: str = template.replace("N", str(iterations))
+        expected: tuple[str, list[str]] = run_program(NameInterpreter(), source)
+        if run_program(Interpreter(), source) != expected:
+            raise AssertionError(f"{name}: results differ")
+
+        name_time: float = best_of(lambda: run_program(NameInterpreter(), source), 5)
+        slot_time: float = best_of(lambda: run_program(Interpreter(), source), 5)
+        print(f"{name:<13} {iterations} iterations  name lookup {name_time * 1000:8.2f} ms  "
+              f"resolved slots {slot_time * 1000:8.2f} ms  ({name_time / slot_time:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import random
+import sys
+import time
+from common import ErrorCollector
+from scanner import Scanner
+from fast_scanner import FastScanner
+
+FRAGMENTS: list[str] = [
+    "(", ")", "{", "}", ",", ".", "-", "+", ";", "*", "/", "!", "!=", "=", "==", "<", "<=", ">", ">=",
+    "1", "23.5", "7.", "foo", "_bar9", "and", "class", "nil", "true", "while",
+    '"str"', '"multi\nline"', "// comment\n", " ", "\t", "\r", "\n", "@", "#", "\0", "é"
+]
+
+def random_source(rng: random.Random, size: int) -> str:
+    return "".join(rng.choice(FRAGMENTS) for _ in range(size))
+
+def scan(scanner_class, source: str) -> tuple[list[tuple], list[str]]:
+    collector: ErrorCollector = ErrorCollector()
+    tokens: list = scanner_class(source, collector).scan_tokens()
+    return [(t.type, t.lexeme, t.literal, t.line) for t in tokens], collector.errors
+
+def check(rng: random.Random, cases: int):
+    for _ in range(cases):
+        source: str = random_source(rng, rng.randint(0, 60))
+        #Occasionally leave a string open at the end
+        if rng.random() < 0.1: source += '"open'
+        expected = scan(Scanner, source)
+        actual = scan(FastScanner, source)
+        if expected != actual:
+            raise AssertionError(f"FastScanner differs from Scanner on {source!r}")
+
+def large_source(lines: int) -> str:
+    rng: random.Random = random.Random(1)
+    out: list[str] = []
+    for i in range(lines):
+        out.append(f"var value_{i} = ({rng.randint(0, 999)}.{rng.randint(0, 99)} + count) * \"label {i}\" >= -total; // note {i}")
+    return "\n".join(out)
+
+def throughput(scanner_class, source: str) -> float:
+    best: float = float("inf")
+    for _ in range(3):
+        start: float = time.perf_counter()
+        scanner_class(source, ErrorCollector()).scan_tokens()
+        best = min(best, time.perf_counter() - start)
+    return len(source) / best
+
+def main():
+    lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    check(random.Random(0), 2000)
+    print("FastScanner matches Scanner on 2000 random sources")
+
+    source: str = large_source(lines)
+    slow: float = throughput(Scanner, source)
+    fast: float = throughput(FastScanner, source)
+    print(f"{len(source)} chars")
+    print(f"Scanner:     {slow / 1e6:8.2f} M chars/sec")
+    print(f"FastScanner: {fast / 1e6:8.2f} M chars/sec  ({fast / slow:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+from common import ROOT
+from bench_batch import sources
+from batch import Batch, BatchError
+from interpreter import Interpreter
+
+SERVER: str = os.path.join(ROOT, "pylox", "server.py")
+LOX: str = os.path.join(ROOT, "pylox", "lox.py")
+
+def environment() -> dict[str, str]:
+    env: dict[str, str] = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([ROOT, os.path.join(ROOT, "pylox")])
+    return env
+
+def start_server(workers: int) -> tuple[subprocess.Popen, str, int]:
+    process: subprocess.Popen = subprocess.Popen([sys.executable, SERVER, f"--workers={workers}"],
+                                                 env=environment(), stdout=subprocess.PIPE, text=True)
+    #"Listening on host:port with N workers"
+    address: str = process.stdout.readline().split()[2]
+    host, port = address.rsplit(":", 1)
+    return process, host, int(port)
+
+def expected(source: str, batch: Batch) -> dict[str, Any]:
+    value: Any = batch.evaluate_one(source)
+    if isinstance(value, BatchError):
+        return {"ok": False, "error": {"kind": value.kind, "line": value.line, "message": value.message}}
+    return {"ok": True, "value": Interpreter.stringify(value)}
+
+async def client(host: str, port: int, items: list[str], latencies: list[float], responses: dict[int, dict]):
+    #Closed loop: one request in flight per connection
+    reader, writer = await asyncio.open_connection(host, port)
+    for request_id, source in items:
+        start: float = time.perf_counter()
+        writer.write(json.dumps({"id": request_id, "source": source}).encode() + b"\n")
+        await writer.drain()
+        response: dict = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        responses[response["id"]] = response
+    writer.close()
+    await writer.wait_closed()
+
+async def pipelined(host: str, port: int, items: list[str]) -> dict[int, dict]:
+    #All requests written up front, which leans on the server's backpressure
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def send():
+        for request_id, source in enumerate(items):
+            writer.write(json.dumps({"id": request_id, "source": source}).encode() + b"\n")
+            await writer.drain()
+
+    sender: asyncio.Task = asyncio.create_task(send())
+    responses: dict[int, dict] = {}
+    while len(responses) < len(items):
+        response: dict = json.loads(await reader.readline())
+        responses[response["id"]] = response
+    await sender
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+async def load(host: str, port: int, items: list[str], connections: int) -> tuple[list[float], dict[int, dict], float]:
+    latencies: list[float] = []
+    responses: dict[int, dict] = {}
+    numbered: list[tuple[int, str]] = list(enumerate(items))
+    start: float = time.perf_counter()
+    await asyncio.gather(*(client(host, port, numbered[i::connections], latencies, responses) for i in range(connections)))
+    return latencies, responses, time.perf_counter() - start
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered: list[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def check(items: list[str], responses: dict[int, dict]):
+    batch: Batch = Batch()
+    for request_id, source in enumerate(items):
+        response: dict = responses[request_id]
+        want: dict[str, Any] = expected(source, batch)
+        got: dict[str, Any] = {key: response[key] for key in want}
+        if got != want:
+            raise AssertionError(f"Server answered {response!r} for {source!r}, expected {want!r}")
+
+def forked(items: list[str]) -> float:
+    #What the service did before: one python lox.py per request
+    start: float = time.perf_counter()
+    for source in items:
+        fd, path = tempfile.mkstemp(suffix=".lox")
+        with os.fdopen(fd, "w") as f:
+            f.write(source)
+        subprocess.run([sys.executable, LOX, path], env=environment(), capture_output=True)
+        os.remove(path)
+    return (time.perf_counter() - start) / len(items)
+
+def main():
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    workers: int = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    items: list[str] = sources(count)
+
+    process, host, port = start_server(workers)
+    try:
+        check(items[:500], asyncio.run(pipelined(host, port, items[:500])))
+        print("Pipelined responses match Batch on 500 requests")
+
+        for connections in (1, 8, 64):
+            latencies, responses, elapsed = asyncio.run(load(host, port, items, connections))
+            check(items, responses)
+            print(f"{connections:3d} connections: {count / elapsed:8.0f} req/s  "
+                  f"p50 {percentile(latencies, 0.5) * 1000:6.2f}ms  p99 {percentile(latencies, 0.99) * 1000:6.2f}ms")
+    finally:
+        process.terminate()
+        process.wait()
+
+    per_fork: float = forked(items[:10])
+    print(f"fork per request:  {1 / per_fork:8.0f} req/s  {per_fork * 1000:6.2f}ms each")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import time
+from common import ROOT
+
+LOX: str = os.path.join(ROOT, "pylox", "lox.py")
+SCRIPT: str = os.path.join(ROOT, "tests", "lox_test.lox")
+
+def environment() -> dict[str, str]:
+    env: dict[str, str] = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([ROOT, os.path.join(ROOT, "pylox")])
+    return env
+
+def import_times() -> list[tuple[int, str]]:
+    #Cumulative microseconds per top-level import of `import lox`, from -X importtime
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import lox"],
+                            env=environment(), capture_output=True, text=True, check=True)
+    #Children are printed before their parent, one level of indentation deeper
+    times: list[tuple[int, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"): continue
+        fields: list[str] = line[len("import time:"):].split("|")
+        if not fields[0].strip().isdigit(): continue
+        name: str = fields[2].rstrip()
+        depth: int = len(name) - len(name.lstrip())
+        if depth == 1:
+            if name.strip() == "lox": return [(int(fields[1]), "lox")] + times
+            times = []
+        elif depth == 3:
+            times.append((int(fields[1]), name.strip()))
+    return times
+
+def cold_runs(count: int) -> float:
+    start: float = time.perf_counter()
+    for _ in range(count):
+        subprocess.run([sys.executable, LOX, SCRIPT], env=environment(), capture_output=True, check=True)
+    return (time.perf_counter() - start) / count
+
+def served_runs(count: int) -> float:
+    with open(SCRIPT) as f:
+        source: str = f.read()
+
+    process = subprocess.Popen([sys.executable, LOX, "--serve"], env=environment(),
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+    #Warm up so process startup is not counted
+    latencies: list[float] = []
+    for i in range(count + 1):
+        start: float = time.perf_counter()
+        process.stdin.write(source.rstrip("\n") + "\n%%\n")
+        process.stdin.flush()
+        while not process.stdout.readline().startswith("%% "):
+            pass
+        if i > 0: latencies.append(time.perf_counter() - start)
+    process.stdin.close()
+    process.wait()
+    return sum(latencies) / len(latencies)
+
+def main():
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    times: list[tuple[int, str]] = import_times()
+    print(f"import lox: {times[0][0] / 1000:.1f}ms")
+    for us, name in sorted(times[1:], reverse=True)[:8]:
+        print(f"  {name:<24} {us / 1000:6.1f}ms")
+
+    cold: float = cold_runs(count)
+    served: float = served_runs(count)
+    print(f"python lox.py script: {cold * 1000:.1f}ms per run")
+    print(f"lox.py --serve:       {served * 1000:.3f}ms per script ({cold / served:.0f}x)")
+
+if __name__ == "__main__":
+    main()
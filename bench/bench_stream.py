@@ -0,0 +1,74 @@
+import io
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from common import ErrorCollector
+from bench_scanner import random_source, large_source
+from scanner import Scanner, StreamingScanner
+from parser import Parser
+
+def check(rng: random.Random, cases: int):
+    for _ in range(cases):
+        source: str = random_source(rng, rng.randint(0, 60))
+        expected_errors: ErrorCollector = ErrorCollector()
+        expected: list = [(t.type, t.lexeme, t.literal, t.line) for t in Scanner(source, expected_errors).scan_tokens()]
+
+        for chunk_size in (1, 2, 3, 7, 64):
+            errors: ErrorCollector = ErrorCollector()
+            streaming: StreamingScanner = StreamingScanner(io.StringIO(source), errors, chunk_size)
+            actual: list = [(t.type, t.lexeme, t.literal, t.line) for t in streaming.iter_tokens()]
+            if actual != expected or errors.errors != expected_errors.errors:
+                raise AssertionError(f"StreamingScanner({chunk_size}) differs from Scanner on {source!r}")
+
+def peak_memory(fn) -> int:
+    tracemalloc.start()
+    fn()
+    peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def main():
+    lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    check(random.Random(0), 1000)
+    print("StreamingScanner matches Scanner on 1000 random sources")
+
+    fd, path = tempfile.mkstemp(suffix=".lox")
+    with os.fdopen(fd, "w") as f:
+        f.write(large_source(lines))
+
+    def scan_whole():
+        with open(path) as f:
+            Scanner(f.read(), ErrorCollector()).scan_tokens()
+
+    def scan_streaming():
+        with open(path) as f:
+            for _ in StreamingScanner(f, ErrorCollector()).iter_tokens():
+                pass
+
+    fd, expr_path = tempfile.mkstemp(suffix=".lox")
+    with os.fdopen(fd, "w") as f:
+        f.write("".join(f"({i} * 2.5 - -1) + // term {i}\n" for i in range(lines)) + "0")
+
+    def parse_whole():
+        with open(expr_path) as f:
+            Parser(Scanner(f.read(), ErrorCollector()).scan_tokens(), ErrorCollector()).parse()
+
+    def parse_streaming():
+        with open(expr_path) as f:
+            Parser(StreamingScanner(f, ErrorCollector()).iter_tokens(), ErrorCollector()).parse()
+
+    try:
+        print(f"{os.path.getsize(path)} bytes")
+        print(f"read + scan_tokens:          peak {peak_memory(scan_whole) / 1e6:8.2f} MB")
+        print(f"StreamingScanner.iter_tokens: peak {peak_memory(scan_streaming) / 1e6:8.2f} MB")
+        print(f"{os.path.getsize(expr_path)} bytes of one long expression")
+        print(f"Parser over scan_tokens:      peak {peak_memory(parse_whole) / 1e6:8.2f} MB")
+        print(f"Parser over iter_tokens:      peak {peak_memory(parse_streaming) / 1e6:8.2f} MB")
+    finally:
+        os.remove(path)
+        os.remove(expr_path)
+
+if __name__ == "__main__":
+    main()
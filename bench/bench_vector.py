@@ -0,0 +1,96 @@
+import random
+import sys
+import time
+from typing import Any
+from common import parse
+from bench_resolver import random_operand
+from lox_runtime_error import LoxRuntimeError
+from interpreter import Interpreter
+from resolver import Resolver
+from vector_evaluator import VectorEvaluator
+
+SOURCE: str = "((3 * 2.5 - -1) / 4 + 7 * 7) >= 12 == !(1 < 2)"
+COLUMN_SOURCE: str = "((x * 2.5 - -y) / 4 + x * y) >= 12 == !(y < 2)"
+
+def check(rng: random.Random, cases: int, rows: int):
+    #Columns against one Interpreter run per row with the same variables bound
+    for _ in range(cases):
+        source: str = random_operand(rng, ["x", "y"], 4)
+        if rng.random() < 0.3: source = f"x = {source}"
+        columns: dict[str, list[Any]] = {name: [rng.choice([1.0, 0.0, 2.5, None, True, False]) for _ in range(rows)] for name in ("x", "y")}
+        evaluator: VectorEvaluator = VectorEvaluator(rows, columns)
+        values: list[Any] = evaluator.evaluate(parse(source)).tolist()
+
+        for row in range(rows):
+            interpreter: Interpreter = Interpreter()
+            for name, column in columns.items():
+                interpreter.globals[interpreter.global_slot(name)] = column[row]
+            expr = parse(source)
+            Resolver(interpreter).resolve_expression(expr)
+            error: LoxRuntimeError|None = evaluator.error_for(row)
+            try:
+                expected: Any = interpreter.evaluate(expr)
+                if error is not None or repr(values[row]) != repr(expected):
+                    raise AssertionError(f"Row {row} of {source} differs: {values[row]!r} != {expected!r}")
+            except LoxRuntimeError as expected_error:
+                if error is None or error.message != expected_error.message:
+                    raise AssertionError(f"Row {row} of {source} should fail with {expected_error.message}")
+
+def bench_columns(rows: int):
+    #The same expression over numeric input columns, passed as float64 arrays
+    import numpy as np
+    rng = np.random.default_rng(0)
+    x = rng.integers(-50, 50, rows).astype(np.float64)
+    y = rng.integers(-50, 50, rows).astype(np.float64)
+
+    start: float = time.perf_counter()
+    vector = VectorEvaluator(rows, {"x": x, "y": y}).evaluate(parse(COLUMN_SOURCE))
+    vector_time: float = time.perf_counter() - start
+    if vector.tolist() != VectorEvaluator(rows, {"x": x.tolist(), "y": y.tolist()}).evaluate(parse(COLUMN_SOURCE)).tolist():
+        raise AssertionError("Typed columns differ from columns of Lox values")
+
+    interpreter: Interpreter = Interpreter()
+    expr = parse(COLUMN_SOURCE)
+    Resolver(interpreter).resolve_expression(expr)
+    x_slot: int = interpreter.global_slot("x")
+    y_slot: int = interpreter.global_slot("y")
+    start = time.perf_counter()
+    scalar: list = []
+    for x_value, y_value in zip(x.tolist(), y.tolist()):
+        interpreter.globals[x_slot] = x_value
+        interpreter.globals[y_slot] = y_value
+        scalar.append(interpreter.evaluate(expr))
+    scalar_time: float = time.perf_counter() - start
+
+    assert vector.tolist() == scalar
+    print(f"{rows} rows of {COLUMN_SOURCE} over float64 columns")
+    print(f"Interpreter per row:     {scalar_time * 1e3:9.2f} ms")
+    print(f"VectorEvaluator:         {vector_time * 1e3:9.2f} ms  ({scalar_time / vector_time:.1f}x)")
+
+def main():
+    rows: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    check(random.Random(0), 300, 20)
+    print("Columns and and/or match the per-row Interpreter on 300 random expressions")
+
+    expr = parse(SOURCE)
+    interpreter: Interpreter = Interpreter()
+
+    start: float = time.perf_counter()
+    scalar: list = [interpreter.evaluate(expr) for _ in range(rows)]
+    scalar_time: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    evaluator: VectorEvaluator = VectorEvaluator(rows)
+    vector = evaluator.evaluate(expr)
+    vector_time: float = time.perf_counter() - start
+
+    assert vector.tolist() == scalar and len(evaluator.failed_rows()) == 0
+
+    print(f"{rows} rows of {SOURCE}")
+    print(f"Interpreter per row:     {scalar_time * 1e3:9.2f} ms")
+    print(f"VectorEvaluator:         {vector_time * 1e3:9.2f} ms  ({scalar_time / vector_time:.1f}x)")
+
+    bench_columns(rows * 10)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import sys
+from common import parse, best_of
+from interpreter import Interpreter
+from compiler import Compiler
+from vm import VM
+
+def arithmetic_source(terms: int) -> str:
+    parts: list[str] = []
+    for i in range(terms):
+        parts.append(f"({i} * 2 - -{i}) / 3")
+    return " + ".join(parts) + " > 0 == !false"
+
+def main():
+    terms: int = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    number: int = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    expr = parse(arithmetic_source(terms))
+    interpreter: Interpreter = Interpreter()
+    chunk = Compiler().compile(expr)
+    vm: VM = VM()
+
+    assert interpreter.evaluate(expr) == vm.run(chunk)
+
+    tree_time: float = best_of(lambda: interpreter.evaluate(expr), number=number)
+    vm_time: float = best_of(lambda: vm.run(chunk), number=number)
+    compile_time: float = best_of(lambda: Compiler().compile(expr), number=10)
+
+    print(f"{terms} terms, {len(chunk.code)} bytes of code, {len(chunk.constants)} constants")
+    print(f"Interpreter.evaluate: {tree_time * 1e6:10.1f} us")
+    print(f"VM.run:               {vm_time * 1e6:10.1f} us  ({tree_time / vm_time:.2f}x)")
+    print(f"Compiler.compile:     {compile_time * 1e6:10.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#pylox modules import each other both as top-level modules and through the pylox package
+for path in (os.path.join(ROOT, "pylox"), ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from scanner import Scanner
+from parser import Parser
+
+class ErrorCollector:
+
+    def __init__(self):
+        self.errors: list[str] = []
+
+    def error(self, token, message: str):
+        self.errors.append(message)
+
+    def runtime_error(self, error):
+        self.errors.append(error.message)
+
+def parse(source: str):
+    collector: ErrorCollector = ErrorCollector()
+    tokens: list = Scanner(source, collector).scan_tokens()
+    expr = Parser(tokens, collector).parse()
+    if collector.errors:
+        raise ValueError(collector.errors[0])
+    return expr
+
+def best_of(fn, repeat: int=5, number: int=1) -> float:
+    best: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / number
@@ -0,0 +1,124 @@
+import json
+import os
+import statistics
+import sys
+import time
+from common import ROOT, ErrorCollector
+from workloads import WORKLOADS
+from scanner import Scanner
+from parser import Parser
+from interpreter import Interpreter
+from ast_printer import AstPrinter
+
+USAGE: str = "Usage: harness [--repeat=N] [--scale=F] [--threshold=F] [--baseline=FILE] [--save] [workload...]"
+DEFAULT_BASELINE: str = os.path.join(ROOT, "bench", "baseline.json")
+
+def measure(fn, repeat: int, min_time: float=0.02) -> dict[str, float]:
+    #Calibrate how many calls make one sample, then take repeat samples of the per-call time
+    number: int = 1
+    while True:
+        start: float = time.perf_counter()
+        for _ in range(number): fn()
+        elapsed: float = time.perf_counter() - start
+        if elapsed >= min_time: break
+        number *= 2
+
+    samples: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number): fn()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "samples": len(samples)
+    }
+
+def run_workload(source: str, repeat: int) -> dict[str, dict[str, float]]:
+    collector: ErrorCollector = ErrorCollector()
+    tokens: list = Scanner(source, collector).scan_tokens()
+    expr = Parser(tokens, collector).parse()
+    if collector.errors:
+        raise ValueError(collector.errors[0])
+
+    interpreter: Interpreter = Interpreter()
+    printer: AstPrinter = AstPrinter()
+
+    return {
+        "scan": measure(lambda: Scanner(source, collector).scan_tokens(), repeat),
+        "parse": measure(lambda: Parser(tokens, collector).parse(), repeat),
+        "interpret": measure(lambda: interpreter.evaluate(expr), repeat),
+        "print": measure(lambda: printer.print(expr), repeat)
+    }
+
+def regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    found: list[str] = []
+    for workload, stages in results.items():
+        for stage, stats in stages.items():
+            previous: dict|None = baseline.get(workload, {}).get(stage)
+            if previous is None: continue
+            ratio: float = stats["median"] / previous["median"]
+            #Also require the slowdown to stand clear of the run-to-run noise of either measurement
+            noise: float = 2 * max(stats["stdev"], previous["stdev"])
+            if ratio > 1 + threshold and stats["median"] - previous["median"] > noise:
+                found.append(f"{workload}/{stage}: {previous['median'] * 1e3:.3f} ms -> {stats['median'] * 1e3:.3f} ms ({ratio:.2f}x)")
+    return found
+
+def main(argv: list[str]):
+    repeat: int = 7
+    scale: float = 1.0
+    threshold: float = 0.10
+    baseline_path: str = DEFAULT_BASELINE
+    save: bool = False
+    selected: list[str] = []
+
+    for arg in argv[1:]:
+        if arg.startswith("--repeat="):
+            repeat = int(arg[len("--repeat="):])
+        elif arg.startswith("--scale="):
+            scale = float(arg[len("--scale="):])
+        elif arg.startswith("--threshold="):
+            threshold = float(arg[len("--threshold="):])
+        elif arg.startswith("--baseline="):
+            baseline_path = arg[len("--baseline="):]
+        elif arg == "--save":
+            save = True
+        elif arg in WORKLOADS:
+            selected.append(arg)
+        else:
+            print(USAGE)
+            exit(64)
+
+    #Deep workloads recurse once per nesting level in every stage
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+
+    results: dict[str, dict] = {}
+    for name in selected or WORKLOADS:
+        generator, size = WORKLOADS[name]
+        source: str = generator(max(1, int(size * scale)))
+        results[name] = run_workload(source, repeat)
+        stages: str = "  ".join(f"{stage} {stats['median'] * 1e3:8.3f}±{stats['stdev'] * 1e3:.3f}" for stage, stats in results[name].items())
+        print(f"{name:<18} {len(source):8} chars  {stages} ms")
+
+    if save:
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {baseline_path}")
+        return
+
+    if not os.path.exists(baseline_path):
+        return
+
+    with open(baseline_path) as f:
+        baseline: dict = json.load(f)
+
+    found: list[str] = regressions(results, baseline, threshold)
+    for line in found:
+        print(f"REGRESSION {line}")
+    if found: exit(1)
+    print(f"No regressions above {threshold:.0%} against {baseline_path}")
+
+if __name__ == "__main__":
+    main(sys.argv)
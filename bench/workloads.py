@@ -0,0 +1,50 @@
+import random
+
+#Each generator returns Lox source for a single expression; size is the generator's natural unit
+
+def nested_groupings(size: int) -> str:
+    return "(" * size + "1" + ")" * size
+
+def plus_chain(size: int) -> str:
+    return " + ".join(str(i % 97) for i in range(size))
+
+def wide_comparisons(size: int) -> str:
+    #Balanced tree of == over size leaf comparisons
+    rng: random.Random = random.Random(size)
+    ops: list[str] = ["<", "<=", ">", ">="]
+    level: list[str] = [f"{rng.randint(0, 9)} {rng.choice(ops)} {rng.randint(0, 9)}" for _ in range(size)]
+    while len(level) > 1:
+        paired: list[str] = [f"({level[i]}) == ({level[i + 1]})" for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2: paired.append(level[-1])
+        level = paired
+    return level[0]
+
+def string_concat(size: int) -> str:
+    return " + ".join(f"\"s{i % 50}\"" for i in range(size))
+
+def comment_heavy(size: int) -> str:
+    lines: list[str] = []
+    for i in range(size):
+        lines.append(f"// comment line {i} with some text to skip over ... {'x' * (i % 40)}")
+        if i % 10 == 0: lines.append(f"{i} +")
+    lines.append("0")
+    return "\n".join(lines)
+
+def whitespace_heavy(size: int) -> str:
+    rng: random.Random = random.Random(size)
+    padding: list[str] = [" ", "\t", "\n", "\r\n", "    "]
+    parts: list[str] = []
+    for i in range(size):
+        parts.append("".join(rng.choice(padding) for _ in range(rng.randint(1, 12))))
+        parts.append(f"{i % 10} *" if i % 2 else f"{i % 10} -")
+    parts.append(" 1")
+    return "".join(parts)
+
+WORKLOADS: dict[str, tuple] = {
+    "nested_groupings": (nested_groupings, 300),
+    "plus_chain": (plus_chain, 1000),
+    "wide_comparisons": (wide_comparisons, 2048),
+    "string_concat": (string_concat, 1000),
+    "comment_heavy": (comment_heavy, 5000),
+    "whitespace_heavy": (whitespace_heavy, 2000)
+}
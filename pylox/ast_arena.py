@@ -0,0 +1,291 @@
+import marshal
+from array import array
+from enum import IntEnum, auto
+from typing import Any
+from pylox.lox_token import Token
+from token_type import TokenType
+from expr import *
+from parser import Parser
+from interpreter import Interpreter
+from lox_runtime_error import LoxRuntimeError
+
+class NodeOp(IntEnum):
+    LITERAL = auto()
+    GROUPING = auto()
+
+    # Unary operators.
+    NEGATE = auto()
+    NOT = auto()
+
+    # Binary operators.
+    ADD = auto()
+    SUBTRACT = auto()
+    MULTIPLY = auto()
+    DIVIDE = auto()
+    GREATER = auto()
+    GREATER_EQUAL = auto()
+    LESS = auto()
+    LESS_EQUAL = auto()
+    EQUAL = auto()
+    NOT_EQUAL = auto()
+
+UNARY_OPS: dict[TokenType, NodeOp] = {
+    TokenType.MINUS: NodeOp.NEGATE,
+    TokenType.BANG: NodeOp.NOT
+}
+
+BINARY_OPS: dict[TokenType, NodeOp] = {
+    TokenType.PLUS: NodeOp.ADD,
+    TokenType.MINUS: NodeOp.SUBTRACT,
+    TokenType.STAR: NodeOp.MULTIPLY,
+    TokenType.SLASH: NodeOp.DIVIDE,
+    TokenType.GREATER: NodeOp.GREATER,
+    TokenType.GREATER_EQUAL: NodeOp.GREATER_EQUAL,
+    TokenType.LESS: NodeOp.LESS,
+    TokenType.LESS_EQUAL: NodeOp.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: NodeOp.EQUAL,
+    TokenType.BANG_EQUAL: NodeOp.NOT_EQUAL
+}
+
+TOKEN_TYPES: list[TokenType] = list(TokenType)
+
+class AstArena:
+
+    def __init__(self):
+        #Node i is described by entry i of each array; children always come before their parent
+        self.ops: array = array("B")
+        self.lefts: array = array("i")
+        self.rights: array = array("i")
+        self.token_indexes: array = array("i")
+        self.constant_indexes: array = array("i")
+        self.tokens: list[Token] = []
+        self.constants: list[Any] = []
+        self.constant_pool: dict[tuple[type, Any], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    @property
+    def root(self) -> int:
+        return len(self.ops) - 1
+
+    def add(self, op: NodeOp, left: int=-1, right: int=-1, token: Token|None=None, constant: int=-1) -> int:
+        token_index: int = -1
+        if token is not None:
+            token_index = len(self.tokens)
+            self.tokens.append(token)
+
+        self.ops.append(op)
+        self.lefts.append(left)
+        self.rights.append(right)
+        self.token_indexes.append(token_index)
+        self.constant_indexes.append(constant)
+        return len(self.ops) - 1
+
+    def add_constant(self, value: Any) -> int:
+        key: tuple[type, Any] = (type(value), value)
+        index: int|None = self.constant_pool.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self.constant_pool[key] = index
+        return index
+
+    def binary(self, left: int, operator: Token, right: int) -> int:
+        return self.add(BINARY_OPS[operator.type], left, right, operator)
+
+    def grouping(self, expression: int) -> int:
+        return self.add(NodeOp.GROUPING, expression)
+
+    def literal(self, value: Any) -> int:
+        return self.add(NodeOp.LITERAL, constant=self.add_constant(value))
+
+    def unary(self, operator: Token, right: int) -> int:
+        return self.add(UNARY_OPS[operator.type], right=right, token=operator)
+
+    def evaluate(self) -> Any:
+        #Creation order is postorder, so one forward pass evaluates every node after its operands
+        ops: array = self.ops
+        lefts: array = self.lefts
+        rights: array = self.rights
+        token_indexes: array = self.token_indexes
+        constant_indexes: array = self.constant_indexes
+        constants: list[Any] = self.constants
+        tokens: list[Token] = self.tokens
+        values: list[Any] = [None] * len(ops)
+        LITERAL: int = NodeOp.LITERAL
+        GROUPING: int = NodeOp.GROUPING
+        NEGATE: int = NodeOp.NEGATE
+        NOT: int = NodeOp.NOT
+        ADD: int = NodeOp.ADD
+        EQUAL: int = NodeOp.EQUAL
+        NOT_EQUAL: int = NodeOp.NOT_EQUAL
+
+        for i in range(len(ops)):
+            op: int = ops[i]
+
+            if op == LITERAL:
+                values[i] = constants[constant_indexes[i]]
+            elif op == GROUPING:
+                values[i] = values[lefts[i]]
+            elif op == NEGATE:
+                right: Any = values[rights[i]]
+                if right.__class__ is not float:
+                    raise LoxRuntimeError(tokens[token_indexes[i]], "Operand must be a number")
+                values[i] = -right
+            elif op == NOT:
+                right = values[rights[i]]
+                values[i] = right is None or right is False
+            else:
+                left: Any = values[lefts[i]]
+                right = values[rights[i]]
+                if op == EQUAL:
+                    values[i] = Interpreter.is_equal(left, right)
+                elif op == NOT_EQUAL:
+                    values[i] = not Interpreter.is_equal(left, right)
+                elif op == ADD:
+                    if (left.__class__ is float and right.__class__ is float) or (left.__class__ is str and right.__class__ is str):
+                        values[i] = left + right
+                    else:
+                        raise LoxRuntimeError(tokens[token_indexes[i]], "Operands must be two numbers or two strings")
+                else:
+                    if left.__class__ is not float or right.__class__ is not float:
+                        raise LoxRuntimeError(tokens[token_indexes[i]], "Operands must be numbers")
+                    values[i] = self.numeric(op, left, right)
+
+        return values[-1]
+
+    @staticmethod
+    def numeric(op: int, left: float, right: float) -> Any:
+        match op:
+            case NodeOp.SUBTRACT: return left - right
+            case NodeOp.MULTIPLY: return left * right
+            case NodeOp.DIVIDE: return left / right
+            case NodeOp.GREATER: return left > right
+            case NodeOp.GREATER_EQUAL: return left >= right
+            case NodeOp.LESS: return left < right
+            case NodeOp.LESS_EQUAL: return left <= right
+
+    def print(self) -> str:
+        #Same output as AstPrinter; each child string is released once its parent is built
+        strings: list[str|None] = [None] * len(self.ops)
+
+        for i in range(len(self.ops)):
+            op: int = self.ops[i]
+            if op == NodeOp.LITERAL:
+                value: Any = self.constants[self.constant_indexes[i]]
+                strings[i] = "nil" if value is None else str(value)
+            elif op == NodeOp.GROUPING:
+                strings[i] = f"(group {strings[self.lefts[i]]})"
+                strings[self.lefts[i]] = None
+            elif op == NodeOp.NEGATE or op == NodeOp.NOT:
+                strings[i] = f"({self.tokens[self.token_indexes[i]].lexeme} {strings[self.rights[i]]})"
+                strings[self.rights[i]] = None
+            else:
+                strings[i] = f"({self.tokens[self.token_indexes[i]].lexeme} {strings[self.lefts[i]]} {strings[self.rights[i]]})"
+                strings[self.lefts[i]] = None
+                strings[self.rights[i]] = None
+
+        return strings[-1]
+
+    def dumps(self) -> bytes:
+        tokens: list[tuple[int, str, int]] = [(TOKEN_TYPES.index(token.type), token.lexeme, token.line) for token in self.tokens]
+        return marshal.dumps((
+            self.ops.tobytes(), self.lefts.tobytes(), self.rights.tobytes(),
+            self.token_indexes.tobytes(), self.constant_indexes.tobytes(),
+            self.constants, tokens
+        ))
+
+    @classmethod
+    def loads(cls, data: bytes) -> "AstArena":
+        ops, lefts, rights, token_indexes, constant_indexes, constants, tokens = marshal.loads(data)
+        arena: AstArena = cls()
+        arena.ops.frombytes(ops)
+        arena.lefts.frombytes(lefts)
+        arena.rights.frombytes(rights)
+        arena.token_indexes.frombytes(token_indexes)
+        arena.constant_indexes.frombytes(constant_indexes)
+        arena.constants = constants
+        arena.constant_pool = {(type(value), value): index for index, value in enumerate(constants)}
+        arena.tokens = [Token(TOKEN_TYPES[type], lexeme, None, line) for type, lexeme, line in tokens]
+        return arena
+
+    @classmethod
+    def from_expr(cls, root: Expr) -> "AstArena":
+        arena: AstArena = cls()
+        indexes: list[int] = []
+        stack: list[tuple[Expr, bool]] = [(root, False)]
+
+        while stack:
+            node, visited = stack.pop()
+            if isinstance(node, Literal):
+                indexes.append(arena.literal(node.value))
+            elif not visited:
+                stack.append((node, True))
+                if isinstance(node, Binary):
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                elif isinstance(node, Grouping):
+                    stack.append((node.expression, False))
+                elif isinstance(node, Unary):
+                    stack.append((node.right, False))
+                else:
+                    raise TypeError(f"{type(node).__name__} has no arena form")
+            elif isinstance(node, Binary):
+                right: int = indexes.pop()
+                left: int = indexes.pop()
+                indexes.append(arena.binary(left, node.operator, right))
+            elif isinstance(node, Grouping):
+                indexes.append(arena.grouping(indexes.pop()))
+            else:
+                indexes.append(arena.unary(node.operator, indexes.pop()))
+
+        return arena
+
+    def to_expr(self) -> Expr:
+        nodes: list[Expr|None] = [None] * len(self.ops)
+
+        for i in range(len(self.ops)):
+            op: int = self.ops[i]
+            if op == NodeOp.LITERAL:
+                nodes[i] = Literal(self.constants[self.constant_indexes[i]])
+            elif op == NodeOp.GROUPING:
+                nodes[i] = Grouping(nodes[self.lefts[i]])
+            elif op == NodeOp.NEGATE or op == NodeOp.NOT:
+                nodes[i] = Unary(self.tokens[self.token_indexes[i]], nodes[self.rights[i]])
+            else:
+                nodes[i] = Binary(nodes[self.lefts[i]], self.tokens[self.token_indexes[i]], nodes[self.rights[i]])
+
+        return nodes[-1]
+
+class ArenaParser(Parser):
+
+    def __init__(self, tokens, lox_interp=None):
+        super().__init__(tokens, lox_interp)
+        self.arena: AstArena = AstArena()
+
+    def parse_arena(self) -> AstArena|None:
+        if self.parse() is None: return None
+        return self.arena
+
+    def new_binary(self, left: int, operator: Token, right: int) -> int:
+        return self.arena.binary(left, operator, right)
+
+    def new_grouping(self, expression: int) -> int:
+        return self.arena.grouping(expression)
+
+    def new_literal(self, value: Any) -> int:
+        return self.arena.literal(value)
+
+    def new_unary(self, operator: Token, right: int) -> int:
+        return self.arena.unary(operator, right)
+
+    #The arena only holds operators and literals
+    def new_assign(self, name: Token, value: int) -> int:
+        raise self.error(name, "Expect expression.")
+
+    def new_logical(self, left: int, operator: Token, right: int) -> int:
+        raise self.error(operator, "Expect expression.")
+
+    def new_variable(self, name: Token) -> int:
+        raise self.error(name, "Expect expression.")
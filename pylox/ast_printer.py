@@ -1,3 +1,5 @@
+import io
+from typing import TextIO
 from expr import *
 
 class AstPrinter(Visitor):
@@ -5,6 +7,9 @@ class AstPrinter(Visitor):
     def print(self, expr: Expr) -> str:
         return expr.accept(self)
     
+    def visit_assign_expr(self, expr: Assign) -> str:
+        return self.parenthesize(f"= {expr.name.lexeme}", expr.value)
+
     def visit_binary_expr(self, expr: Binary) -> str:
         return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
     
@@ -15,8 +20,14 @@ class AstPrinter(Visitor):
         if expr.value == None: return "nil"
         return str(expr.value)
     
+    def visit_logical_expr(self, expr: Logical) -> str:
+        return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
+
     def visit_unary_expr(self, expr: Unary) -> None:
         return self.parenthesize(expr.operator.lexeme, expr.right)
+
+    def visit_variable_expr(self, expr: Variable) -> str:
+        return expr.name.lexeme
     
     def parenthesize(self, name: str, *exprs: tuple[Expr]) -> str:
         res: str = f"({name}"
@@ -26,4 +37,57 @@ class AstPrinter(Visitor):
             res += expr.accept(self)
         res += ")"
 
-        return res
\ No newline at end of file
+        return res
+
+class StreamingAstPrinter(AstPrinter):
+    #Writes the same text as AstPrinter into a sink. The tree is walked with an explicit stack
+    #holding nodes and the text between them, so no string is built per node and deep trees don't
+    #hit the recursion limit. Pieces are joined and written once chunk_size of them are pending.
+
+    def __init__(self, chunk_size: int=8192):
+        self.chunk_size: int = chunk_size
+
+    def print(self, expr: Expr) -> str:
+        sink: io.StringIO = io.StringIO()
+        self.write(expr, sink)
+        return sink.getvalue()
+
+    def write(self, expr: Expr, sink: TextIO):
+        pieces: list[str] = []
+        add = pieces.extend
+        chunk_size: int = self.chunk_size
+        #Next item last
+        stack: list[Expr|str] = [expr]
+        push = stack.extend
+        pop = stack.pop
+
+        while stack:
+            node: Expr|str = pop()
+            node_class: type = node.__class__
+
+            if node_class is str:
+                pieces.append(node)
+            elif node_class is Literal:
+                pieces.append("nil" if node.value is None else str(node.value))
+            elif node_class is Binary or node_class is Logical:
+                add(("(", node.operator.lexeme, " "))
+                push((")", node.right, " ", node.left))
+            elif node_class is Grouping:
+                pieces.append("(group ")
+                push((")", node.expression))
+            elif node_class is Unary:
+                add(("(", node.operator.lexeme, " "))
+                push((")", node.right))
+            elif node_class is Variable:
+                pieces.append(node.name.lexeme)
+            elif node_class is Assign:
+                add(("(= ", node.name.lexeme, " "))
+                push((")", node.value))
+            else:
+                pieces.append(node.accept(self))
+
+            if len(pieces) >= chunk_size:
+                sink.write("".join(pieces))
+                pieces.clear()
+
+        sink.write("".join(pieces))
@@ -0,0 +1,111 @@
+from typing import Any
+from pylox.lox_token import Token
+from token_type import TokenType
+from expr import Expr
+import scanner
+from fast_scanner import FastScanner
+from parser import Parser
+from interpreter import Interpreter
+from resolver import Resolver
+from environment import UNDEFINED
+from lox_runtime_error import LoxRuntimeError
+
+class BatchError:
+
+    def __init__(self, kind: str, line: int|None, message: str):
+        #kind is "static" for scan and parse errors, "runtime" for LoxRuntimeError and "internal",
+        #with no line, for any other exception raised while evaluating, such as division by zero
+        self.kind: str = kind
+        self.line: int|None = line
+        self.message: str = message
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, BatchError) and (self.kind, self.line, self.message) == (other.kind, other.line, other.message)
+
+    def __repr__(self) -> str:
+        return f"BatchError({self.kind!r}, {self.line}, {self.message!r})"
+
+class Batch:
+
+    def __init__(self, fast_scan: bool=True, max_trees: int=10000):
+        self.fast_scan: bool = fast_scan
+        self.max_trees: int = max_trees
+        self.interpreter: Interpreter = Interpreter(self)
+        #Parsed trees by source, so repeated sources are scanned and parsed once
+        self.trees: dict[str, Expr|BatchError] = {}
+        self.errors: list[BatchError] = []
+
+    def evaluate(self, sources: list[str]) -> list[Any]:
+        return [self.evaluate_one(source) for source in sources]
+
+    def evaluate_one(self, source: str) -> Any:
+        expression: Expr|BatchError = self.tree(source)
+        if isinstance(expression, BatchError):
+            return expression
+        return self.evaluate_tree(expression)
+
+    def evaluate_rows(self, source: str, rows: list[dict[str, Any]]) -> list[Any]:
+        #One expression over many inputs: each row binds global variables by name to Lox values
+        #(float, str, bool or None) for that row only. The source is scanned and parsed once.
+        expression: Expr|BatchError = self.tree(source)
+        if isinstance(expression, BatchError):
+            return [expression] * len(rows)
+
+        globals: list[Any] = self.interpreter.globals
+        results: list[Any] = []
+        for row in rows:
+            slots: list[int] = [self.interpreter.global_slot(name) for name in row]
+            for slot, value in zip(slots, row.values()):
+                globals[slot] = value
+            try:
+                results.append(self.evaluate_tree(expression))
+            finally:
+                #Bindings and assignments don't leak into the next row
+                for slot in slots:
+                    globals[slot] = UNDEFINED
+        return results
+
+    def tree(self, source: str) -> Expr|BatchError:
+        expression: Expr|BatchError = self.trees.get(source)
+        if expression is None:
+            expression = self.parse(source)
+            if len(self.trees) >= self.max_trees: self.trees.clear()
+            self.trees[source] = expression
+        return expression
+
+    def evaluate_tree(self, expression: Expr) -> Any:
+        #Each failure stays with its own item, so one bad input never aborts the batch
+        try:
+            return self.interpreter.evaluate(expression)
+        except LoxRuntimeError as error:
+            return BatchError("runtime", error.token.line, error.message)
+        except Exception as error:
+            return BatchError("internal", None, f"{type(error).__name__}: {error}")
+
+    def parse(self, source: str) -> Expr|BatchError:
+        self.errors = []
+        if self.fast_scan:
+            tokens: list[Token] = FastScanner(source, self).scan_tokens()
+        else:
+            tokens = scanner.Scanner(source, self).scan_tokens()
+        expression: Expr = Parser(tokens, self).parse()
+
+        #Later errors are usually cascades of the first one
+        if self.errors: return self.errors[0]
+        #Variables get slots in the interpreter's global table, bound per row by evaluate_rows
+        Resolver(self.interpreter, self).resolve_expression(expression)
+        return expression
+
+    def error(self, token: Token|int, message: str):
+        if isinstance(token, Token):
+            if token.type == TokenType.EOF:
+                message = f"at end: {message}"
+            else:
+                message = f"at '{token.lexeme}': {message}"
+            line: int = token.line
+        else:
+            line = token
+        self.errors.append(BatchError("static", line, message))
+
+    def runtime_error(self, error: LoxRuntimeError):
+        self.errors.append(BatchError("runtime", error.token.line, error.message))
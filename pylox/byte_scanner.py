@@ -0,0 +1,89 @@
+import re
+from typing import Any
+from token_type import TokenType
+from token_buffer import TokenBuffer, TOKEN_TYPES
+from scanner import KEYWORDS
+from fast_scanner import FastScanner
+
+#Lexemes every token of these types shares, so they never need decoding
+FIXED_LEXEMES: dict[TokenType, str] = {type: text for text, type in (FastScanner.operators | KEYWORDS).items()}
+FIXED_LEXEMES[TokenType.EOF] = ""
+
+class ByteTokenBuffer(TokenBuffer):
+    #TokenBuffer over UTF-8 bytes, an mmap or a memoryview. Lexemes are decoded when a token is
+    #read, once per distinct lexeme
+
+    def __init__(self, source):
+        super().__init__(source)
+        self.decoded: dict[bytes, str] = {}
+
+    def lexeme(self, index: int) -> str:
+        fixed: str|None = FIXED_LEXEMES.get(TOKEN_TYPES[self.types[index]])
+        if fixed is not None: return fixed
+
+        raw: bytes = bytes(self.source[self.starts[index]:self.ends[index]])
+        text: str|None = self.decoded.get(raw)
+        if text is None:
+            text = raw.decode("utf-8", "replace")
+            self.decoded[raw] = text
+        return text
+
+class ByteScanner:
+    #FastScanner's lexical rules over a bytes-like source, so a file can be scanned straight
+    #from an mmap without decoding it or holding it as a str
+
+    pattern: re.Pattern = re.compile(rb"""
+        (?P<newline>\n)
+        |(?P<whitespace>[ \r\t]+)
+        |(?P<comment>//[^\n]*)
+        |(?P<number>[0-9]+(?:\.[0-9]+)?)
+        |(?P<identifier>[A-Za-z_][A-Za-z_0-9]*)
+        |(?P<string>"[^"]*")
+        |(?P<unterminated>"[^"]*)
+        |(?P<operator>!=|==|<=|>=|[(){},.\-+;*!=<>/])
+        |(?P<unexpected>[\xc0-\xff][\x80-\xbf]*|.)
+    """, re.VERBOSE | re.DOTALL)
+
+    operators: dict[bytes, TokenType] = {text.encode(): type for text, type in FastScanner.operators.items()}
+    keywords: dict[bytes, TokenType] = {text.encode(): type for text, type in KEYWORDS.items()}
+
+    def __init__(self, source, lox_interp):
+        self.lox_interp = lox_interp
+        self.source = source
+        self.line: int = 1
+
+    def scan_buffer(self) -> ByteTokenBuffer:
+        buffer: ByteTokenBuffer = ByteTokenBuffer(self.source)
+        append = buffer.append
+        operators: dict[bytes, TokenType] = self.operators
+        keywords: dict[bytes, TokenType] = self.keywords
+        identifier_type: TokenType = TokenType.IDENTIFIER
+        line: int = self.line
+
+        for match in self.pattern.finditer(self.source):
+            kind: str = match.lastgroup
+
+            if kind == "whitespace":
+                continue
+            elif kind == "operator":
+                append(operators[match.group()], match.start(), match.end(), line)
+            elif kind == "identifier":
+                append(keywords.get(match.group(), identifier_type), match.start(), match.end(), line)
+            elif kind == "number":
+                append(TokenType.NUMBER, match.start(), match.end(), line)
+            elif kind == "newline":
+                line += 1
+            elif kind == "comment":
+                continue
+            elif kind == "string":
+                line += match.group().count(b"\n")
+                append(TokenType.STRING, match.start(), match.end(), line)
+            elif kind == "unterminated":
+                line += match.group().count(b"\n")
+                self.lox_interp.error(line, "Unterminated string.")
+            else:
+                self.lox_interp.error(line, "Unexpected character.")
+
+        self.line = line
+        append(TokenType.EOF, len(self.source), len(self.source), line)
+        return buffer
@@ -0,0 +1,234 @@
+import operator
+from weakref import WeakKeyDictionary, WeakSet
+from typing import Any, Callable
+from expr import *
+from token_type import TokenType
+from lox_runtime_error import LoxRuntimeError
+from interpreter import Interpreter
+from iterative_interpreter import IterativeInterpreter
+
+class ClosureCompiler(Visitor):
+
+    numeric_ops: dict[TokenType, Callable[[Any, Any], Any]] = {
+        TokenType.MINUS: operator.sub,
+        TokenType.STAR: operator.mul,
+        TokenType.SLASH: operator.truediv,
+        TokenType.GREATER: operator.gt,
+        TokenType.GREATER_EQUAL: operator.ge,
+        TokenType.LESS: operator.lt,
+        TokenType.LESS_EQUAL: operator.le
+    }
+
+    equality_ops: dict[TokenType, Callable[[Any, Any], Any]] = {
+        TokenType.EQUAL_EQUAL: operator.eq,
+        TokenType.BANG_EQUAL: operator.ne
+    }
+
+    def __init__(self, lox_interp=None, fold_constants: bool=True):
+        self.lox_interp = lox_interp
+        self.fold_constants: bool = fold_constants
+        self.cache: WeakKeyDictionary[Expr, Callable[[], Any]] = WeakKeyDictionary()
+        #Trees too deep to compile. Kept out of cache, whose values must not reference their key
+        self.uncompiled: WeakSet[Expr] = WeakSet()
+        #Value of every closure known to be a constant
+        self.constants: dict[Callable[[], Any], Any] = {}
+        #Captured by the variable and assignment closures, so names bound after compiling are seen
+        self.globals: dict[str, Any] = {}
+
+    def interpret(self, expression: Expr):
+        try:
+            value: Any = self.compile(expression)()
+            print(Interpreter.stringify(value))
+        except LoxRuntimeError as error:
+            if self.lox_interp is not None:
+                self.lox_interp.runtime_error(error)
+
+    def compile(self, expr: Expr) -> Callable[[], Any]:
+        fn: Callable[[], Any]|None = self.cache.get(expr)
+        if fn is not None: return fn
+        if expr in self.uncompiled: return self.tree_evaluation(expr)
+
+        try:
+            fn = expr.accept(self)
+        except RecursionError:
+            #Too deep to compile, evaluate as a tree instead
+            self.uncompiled.add(expr)
+            return self.tree_evaluation(expr)
+        finally:
+            self.constants.clear()
+
+        self.cache[expr] = fn
+        return fn
+
+    def tree_evaluation(self, expr: Expr) -> Callable[[], Any]:
+        lox_interp = self.lox_interp
+        return lambda: IterativeInterpreter(lox_interp).walk(expr)
+
+    def constant(self, value: Any) -> Callable[[], Any]:
+        def fn():
+            return value
+        self.constants[fn] = value
+        return fn
+
+    def fold(self, fn: Callable[[], Any], *operands: Callable[[], Any]) -> Callable[[], Any]:
+        if not self.fold_constants: return fn
+        if not all(operand in self.constants for operand in operands): return fn
+
+        #Anything that fails stays a closure so the error happens at runtime
+        try:
+            return self.constant(fn())
+        except (LoxRuntimeError, ArithmeticError):
+            return fn
+
+    def visit_literal_expr(self, expr: Literal) -> Callable[[], Any]:
+        return self.constant(expr.value)
+
+    def visit_grouping_expr(self, expr: Grouping) -> Callable[[], Any]:
+        return expr.expression.accept(self)
+
+    def visit_variable_expr(self, expr: Variable) -> Callable[[], Any]:
+        token: Token = expr.name
+        name: str = token.lexeme
+        globals: dict[str, Any] = self.globals
+
+        def fn():
+            try:
+                return globals[name]
+            except KeyError:
+                raise LoxRuntimeError(token, f"Undefined variable '{name}'") from None
+        return fn
+
+    def visit_assign_expr(self, expr: Assign) -> Callable[[], Any]:
+        value: Callable[[], Any] = expr.value.accept(self)
+        token: Token = expr.name
+        name: str = token.lexeme
+        globals: dict[str, Any] = self.globals
+
+        def fn():
+            result: Any = value()
+            if name not in globals:
+                raise LoxRuntimeError(token, f"Undefined variable '{name}'")
+            globals[name] = result
+            return result
+        return fn
+
+    def visit_logical_expr(self, expr: Logical) -> Callable[[], Any]:
+        left: Callable[[], Any] = expr.left.accept(self)
+        right: Callable[[], Any] = expr.right.accept(self)
+        is_or: bool = expr.operator.type == TokenType.OR
+
+        #A constant left operand decides which side is the result
+        if self.fold_constants and left in self.constants:
+            value: Any = self.constants[left]
+            truthy: bool = not (value is None or value is False)
+            return left if truthy == is_or else right
+
+        if is_or:
+            def fn():
+                value: Any = left()
+                if value is None or value is False: return right()
+                return value
+        else:
+            def fn():
+                value: Any = left()
+                if value is None or value is False: return value
+                return right()
+        return fn
+
+    def visit_unary_expr(self, expr: Unary) -> Callable[[], Any]:
+        right: Callable[[], Any] = expr.right.accept(self)
+        token: Token = expr.operator
+
+        match token.type:
+            case TokenType.MINUS:
+                def fn():
+                    value: Any = right()
+                    if value.__class__ is float: return -value
+                    raise LoxRuntimeError(token, "Operand must be a number")
+            case TokenType.BANG:
+                def fn():
+                    value: Any = right()
+                    return value is None or value is False
+            case _:
+                def fn():
+                    right()
+                    return None
+
+        return self.fold(fn, right)
+
+    def visit_binary_expr(self, expr: Binary) -> Callable[[], Any]:
+        left: Callable[[], Any] = expr.left.accept(self)
+        right: Callable[[], Any] = expr.right.accept(self)
+        token: Token = expr.operator
+
+        if token.type in self.equality_ops:
+            fn: Callable[[], Any] = self.equality(self.equality_ops[token.type], left, right)
+        elif token.type in self.numeric_ops:
+            fn = self.typed(self.numeric_ops[token.type], token, left, right, (float,), "Operands must be numbers")
+        elif token.type == TokenType.PLUS:
+            fn = self.typed(operator.add, token, left, right, (float, str), "Operands must be two numbers or two strings")
+        else:
+            def fn():
+                left()
+                right()
+                return None
+
+        return self.fold(fn, left, right)
+
+    def equality(self, op: Callable[[Any, Any], Any], left: Callable[[], Any], right: Callable[[], Any]) -> Callable[[], Any]:
+        if right in self.constants:
+            b: Any = self.constants[right]
+            def fn():
+                return op(left(), b)
+        else:
+            def fn():
+                return op(left(), right())
+        return fn
+
+    def typed(self, op: Callable[[Any, Any], Any], token: Token, left: Callable[[], Any], right: Callable[[], Any], types: tuple[type, ...], message: str) -> Callable[[], Any]:
+        #Operands of a literal are type checked here once instead of on every call
+        if right in self.constants:
+            b: Any = self.constants[right]
+            b_type: type = b.__class__
+            if b_type not in types:
+                def fn():
+                    left()
+                    raise LoxRuntimeError(token, message)
+                return fn
+
+            def fn():
+                a: Any = left()
+                if a.__class__ is b_type: return op(a, b)
+                raise LoxRuntimeError(token, message)
+            return fn
+
+        if left in self.constants:
+            a: Any = self.constants[left]
+            a_type: type = a.__class__
+            if a_type not in types:
+                def fn():
+                    right()
+                    raise LoxRuntimeError(token, message)
+                return fn
+
+            def fn():
+                b: Any = right()
+                if b.__class__ is a_type: return op(a, b)
+                raise LoxRuntimeError(token, message)
+            return fn
+
+        if len(types) == 1:
+            number: type = types[0]
+            def fn():
+                a: Any = left()
+                b: Any = right()
+                if a.__class__ is number and b.__class__ is number: return op(a, b)
+                raise LoxRuntimeError(token, message)
+            return fn
+
+        def fn():
+            a: Any = left()
+            b: Any = right()
+            if a.__class__ is b.__class__ and a.__class__ in types: return op(a, b)
+            raise LoxRuntimeError(token, message)
+        return fn
@@ -0,0 +1,96 @@
+from expr import *
+from token_type import TokenType
+from op_code import OpCode
+from lox_chunk import Chunk
+
+class Compiler(Visitor):
+
+    binary_ops: dict[TokenType, OpCode] = {
+        TokenType.PLUS: OpCode.ADD,
+        TokenType.MINUS: OpCode.SUBTRACT,
+        TokenType.STAR: OpCode.MULTIPLY,
+        TokenType.SLASH: OpCode.DIVIDE,
+        TokenType.GREATER: OpCode.GREATER,
+        TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+        TokenType.LESS: OpCode.LESS,
+        TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+        TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+        TokenType.BANG_EQUAL: OpCode.NOT_EQUAL
+    }
+
+    unary_ops: dict[TokenType, OpCode] = {
+        TokenType.MINUS: OpCode.NEGATE,
+        TokenType.BANG: OpCode.NOT
+    }
+
+    def __init__(self):
+        self.chunk: Chunk = Chunk()
+
+    def compile(self, expr: Expr) -> Chunk:
+        self.chunk = Chunk()
+        expr.accept(self)
+        self.chunk.write(OpCode.RETURN)
+        return self.chunk
+
+    def visit_assign_expr(self, expr: Assign):
+        expr.value.accept(self)
+        self.chunk.write(OpCode.SET_GLOBAL, expr.name)
+        self.chunk.write_long(self.chunk.add_constant(expr.name.lexeme), expr.name)
+
+    def visit_binary_expr(self, expr: Binary):
+        expr.left.accept(self)
+        expr.right.accept(self)
+        self.chunk.write(self.binary_ops[expr.operator.type], expr.operator)
+
+    def visit_grouping_expr(self, expr: Grouping):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr: Literal):
+        if expr.value is None:
+            self.chunk.write(OpCode.NIL)
+        elif expr.value is True:
+            self.chunk.write(OpCode.TRUE)
+        elif expr.value is False:
+            self.chunk.write(OpCode.FALSE)
+        else:
+            self.emit_constant(expr.value)
+
+    def visit_logical_expr(self, expr: Logical):
+        #The left value stays on the stack as the result when it decides
+        expr.left.accept(self)
+        if expr.operator.type == TokenType.OR:
+            else_jump: int = self.emit_jump(OpCode.JUMP_IF_FALSE)
+            end_jump: int = self.emit_jump(OpCode.JUMP)
+            self.patch_jump(else_jump)
+        else:
+            end_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.chunk.write(OpCode.POP)
+        expr.right.accept(self)
+        self.patch_jump(end_jump)
+
+    def visit_unary_expr(self, expr: Unary):
+        expr.right.accept(self)
+        self.chunk.write(self.unary_ops[expr.operator.type], expr.operator)
+
+    def visit_variable_expr(self, expr: Variable):
+        self.chunk.write(OpCode.GET_GLOBAL, expr.name)
+        self.chunk.write_long(self.chunk.add_constant(expr.name.lexeme), expr.name)
+
+    def emit_jump(self, op: OpCode) -> int:
+        self.chunk.write(op)
+        self.chunk.write_long(0)
+        return len(self.chunk.code) - 3
+
+    def patch_jump(self, offset: int):
+        self.chunk.patch_long(offset, len(self.chunk.code) - offset - 3)
+
+    def emit_constant(self, value: Any):
+        index: int = self.chunk.add_constant(value)
+        if index < 256:
+            self.chunk.write(OpCode.CONSTANT)
+            self.chunk.write(index)
+        else:
+            self.chunk.write(OpCode.CONSTANT_LONG)
+            self.chunk.write(index & 0xff)
+            self.chunk.write((index >> 8) & 0xff)
+            self.chunk.write((index >> 16) & 0xff)
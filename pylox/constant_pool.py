@@ -0,0 +1,36 @@
+class ConstantPool:
+    #Shares one object per distinct lexeme, string literal and number between the tokens of a run,
+    #so repeated identifiers and constants are stored once and Literal nodes point at the pooled value
+
+    def __init__(self):
+        self.lexemes: dict[str, str] = {}
+        self.strings: dict[str, str] = {}
+        #Keyed by the number's lexeme so float() runs once per distinct spelling
+        self.numbers: dict[str, float] = {}
+        self.lexeme_lookups: int = 0
+        self.string_lookups: int = 0
+        self.number_lookups: int = 0
+
+    def lexeme(self, text: str) -> str:
+        self.lexeme_lookups += 1
+        return self.lexemes.setdefault(text, text)
+
+    def string(self, value: str) -> str:
+        self.string_lookups += 1
+        return self.strings.setdefault(value, value)
+
+    def number(self, text: str) -> float:
+        self.number_lookups += 1
+        value: float|None = self.numbers.get(text)
+        if value is None:
+            value = float(text)
+            self.numbers[text] = value
+        return value
+
+    def stats(self) -> dict[str, tuple[int, int]]:
+        #(lookups, distinct values) per pool
+        return {
+            "lexemes": (self.lexeme_lookups, len(self.lexemes)),
+            "strings": (self.string_lookups, len(self.strings)),
+            "numbers": (self.number_lookups, len(self.numbers))
+        }
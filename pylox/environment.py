@@ -0,0 +1,20 @@
+from typing import Any
+
+#Value of a global that has a slot but has not been declared yet
+UNDEFINED: object = object()
+
+class Environment:
+    #One block scope. Resolver gives every local the index it is appended at, so lookups never
+    #touch the name.
+
+    __slots__ = ("values", "enclosing")
+
+    def __init__(self, enclosing=None):
+        self.values: list[Any] = []
+        self.enclosing: Environment|None = enclosing
+
+    def ancestor(self, depth: int):
+        environment: Environment = self
+        for _ in range(depth):
+            environment = environment.enclosing
+        return environment
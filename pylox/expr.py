@@ -3,11 +3,28 @@ from pylox.lox_token import Token
 from typing import Any
 
 class Expr(ABC):
+    __slots__ = ("__weakref__",)
+
     @abstractmethod
     def accept(self, visitor):
         pass
 
+class Assign(Expr):
+    __slots__ = ("name", "value", "depth", "slot")
+
+    def __init__(self, name, value, depth, slot):
+        self.name: Token = name
+        self.value: Expr = value
+        #Set by Resolver: scopes out from the innermost one, None for a global
+        self.depth: int|None = depth
+        self.slot: int|None = slot
+
+    def accept(self, visitor):
+        return visitor.visit_assign_expr(self)
+
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left, operator, right):
         self.left: Expr = left
         self.operator: Token = operator
@@ -17,6 +34,8 @@ class Binary(Expr):
         return visitor.visit_binary_expr(self)
 
 class Grouping(Expr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression: Expr = expression
 
@@ -24,13 +43,28 @@ class Grouping(Expr):
         return visitor.visit_grouping_expr(self)
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value: Any = value
 
     def accept(self, visitor):
         return visitor.visit_literal_expr(self)
 
+class Logical(Expr):
+    __slots__ = ("left", "operator", "right")
+
+    def __init__(self, left, operator, right):
+        self.left: Expr = left
+        self.operator: Token = operator
+        self.right: Expr = right
+
+    def accept(self, visitor):
+        return visitor.visit_logical_expr(self)
+
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+
     def __init__(self, operator, right):
         self.operator: Token = operator
         self.right: Expr = right
@@ -38,8 +72,22 @@ class Unary(Expr):
     def accept(self, visitor):
         return visitor.visit_unary_expr(self)
 
+class Variable(Expr):
+    __slots__ = ("name", "depth", "slot")
+
+    def __init__(self, name, depth, slot):
+        self.name: Token = name
+        self.depth: int|None = depth
+        self.slot: int|None = slot
+
+    def accept(self, visitor):
+        return visitor.visit_variable_expr(self)
+
 class Visitor(ABC):
     @abstractmethod
+    def visit_assign_expr(self, expr: Assign):
+        pass
+    @abstractmethod
     def visit_binary_expr(self, expr: Binary):
         pass
     @abstractmethod
@@ -49,5 +97,11 @@ class Visitor(ABC):
     def visit_literal_expr(self, expr: Literal):
         pass
     @abstractmethod
+    def visit_logical_expr(self, expr: Logical):
+        pass
+    @abstractmethod
     def visit_unary_expr(self, expr: Unary):
+        pass
+    @abstractmethod
+    def visit_variable_expr(self, expr: Variable):
         pass
\ No newline at end of file
@@ -0,0 +1,128 @@
+import re
+from pylox.lox_token import Token
+from token_type import TokenType
+from token_buffer import TokenBuffer
+from scanner import KEYWORDS
+from constant_pool import ConstantPool
+
+class FastScanner:
+
+    #One alternative per lexical class, tried in order at each position
+    pattern: re.Pattern = re.compile(r"""
+        (?P<newline>\n)
+        |(?P<whitespace>[ \r\t]+)
+        |(?P<comment>//[^\n]*)
+        |(?P<number>[0-9]+(?:\.[0-9]+)?)
+        |(?P<identifier>[A-Za-z_][A-Za-z_0-9]*)
+        |(?P<string>"[^"]*")
+        |(?P<unterminated>"[^"]*)
+        |(?P<operator>!=|==|<=|>=|[(){},.\-+;*!=<>/])
+        |(?P<unexpected>.)
+    """, re.VERBOSE | re.DOTALL)
+
+    operators: dict[str, TokenType] = {
+        "(": TokenType.LEFT_PAREN,
+        ")": TokenType.RIGHT_PAREN,
+        "{": TokenType.LEFT_BRACE,
+        "}": TokenType.RIGHT_BRACE,
+        ",": TokenType.COMMA,
+        ".": TokenType.DOT,
+        "-": TokenType.MINUS,
+        "+": TokenType.PLUS,
+        ";": TokenType.SEMICOLON,
+        "*": TokenType.STAR,
+        "/": TokenType.SLASH,
+        "!": TokenType.BANG,
+        "!=": TokenType.BANG_EQUAL,
+        "=": TokenType.EQUAL,
+        "==": TokenType.EQUAL_EQUAL,
+        "<": TokenType.LESS,
+        "<=": TokenType.LESS_EQUAL,
+        ">": TokenType.GREATER,
+        ">=": TokenType.GREATER_EQUAL
+    }
+
+    def __init__(self, source: str, lox_interp, pool: ConstantPool|None=None):
+        self.lox_interp = lox_interp
+        self.source: str = source
+        self.pool: ConstantPool = pool if pool is not None else ConstantPool()
+        self.tokens: list[Token] = []
+        self.line: int = 1
+        self.keywords: dict[str, TokenType] = KEYWORDS
+
+    def scan_tokens(self) -> list[Token]:
+        tokens: list[Token] = self.tokens
+        append = tokens.append
+        operators: dict[str, TokenType] = self.operators
+        keywords: dict[str, TokenType] = self.keywords
+        identifier_type: TokenType = TokenType.IDENTIFIER
+        lexeme = self.pool.lexeme
+        line: int = self.line
+
+        for match in self.pattern.finditer(self.source):
+            kind: str = match.lastgroup
+            text: str = match.group()
+
+            if kind == "whitespace":
+                continue
+            elif kind == "operator":
+                text = lexeme(text)
+                append(Token(operators[text], text, None, line))
+            elif kind == "identifier":
+                text = lexeme(text)
+                append(Token(keywords.get(text, identifier_type), text, None, line))
+            elif kind == "number":
+                text = lexeme(text)
+                append(Token(TokenType.NUMBER, text, self.pool.number(text), line))
+            elif kind == "newline":
+                line += 1
+            elif kind == "comment":
+                continue
+            elif kind == "string":
+                line += text.count("\n")
+                append(Token(TokenType.STRING, lexeme(text), self.pool.string(text[1:-1]), line))
+            elif kind == "unterminated":
+                line += text.count("\n")
+                self.lox_interp.error(line, "Unterminated string.")
+            else:
+                self.lox_interp.error(line, "Unexpected character.")
+
+        self.line = line
+        append(Token(TokenType.EOF, "", None, line))
+        return tokens
+
+    def scan_buffer(self) -> TokenBuffer:
+        buffer: TokenBuffer = TokenBuffer(self.source)
+        append = buffer.append
+        operators: dict[str, TokenType] = self.operators
+        keywords: dict[str, TokenType] = self.keywords
+        identifier_type: TokenType = TokenType.IDENTIFIER
+        line: int = self.line
+
+        for match in self.pattern.finditer(self.source):
+            kind: str = match.lastgroup
+
+            if kind == "whitespace":
+                continue
+            elif kind == "operator":
+                append(operators[match.group()], match.start(), match.end(), line)
+            elif kind == "identifier":
+                append(keywords.get(match.group(), identifier_type), match.start(), match.end(), line)
+            elif kind == "number":
+                append(TokenType.NUMBER, match.start(), match.end(), line)
+            elif kind == "newline":
+                line += 1
+            elif kind == "comment":
+                continue
+            elif kind == "string":
+                line += match.group().count("\n")
+                append(TokenType.STRING, match.start(), match.end(), line)
+            elif kind == "unterminated":
+                line += match.group().count("\n")
+                self.lox_interp.error(line, "Unterminated string.")
+            else:
+                self.lox_interp.error(line, "Unexpected character.")
+
+        self.line = line
+        append(TokenType.EOF, len(self.source), len(self.source), line)
+        return buffer
@@ -0,0 +1,169 @@
+from typing import Any, Callable, Iterable
+from pylox.lox_token import Token
+from expr import *
+from stmt import Stmt
+from parser import Parser
+from lox_runtime_error import LoxRuntimeError
+from interpreter import Interpreter
+
+class HashConsParser(Parser):
+    #Structurally identical subtrees are built once and shared, turning the tree into a DAG.
+    #Children are already shared when a parent is built, so a parent's key only needs their identity.
+    #Every subtree without an assignment is shared, variables included. Assignments and the nodes
+    #holding one are built by Parser as usual and never shared.
+    #A shared node keeps the tokens of its first occurrence. Each node's span in tokens is the same
+    #for all its occurrences, so the position of any occurrence follows from its parent's, and
+    #consumed gives the token at that position.
+    #A name can resolve to another variable in another declaration, so nodes are only shared within one.
+
+    def __init__(self, tokens: Iterable[Token], lox_interp=None):
+        super().__init__(tokens, lox_interp)
+        self.nodes: dict[tuple, Expr] = {}
+        #Interned nodes requested more than once
+        self.shared: set[Expr] = set()
+        #Assignments and the nodes holding one
+        self.unshared: set[Expr] = set()
+        #Number of tokens each node covers
+        self.spans: dict[Expr, int] = {}
+        #Every token consumed, by position
+        self.consumed: list[Token] = []
+        #Position of the first token of each tree returned by parse
+        self.starts: dict[Expr, int] = {}
+        self.requested: int = 0
+        self.built: int = 0
+
+    def parse(self) -> Expr:
+        start: int = len(self.consumed)
+        expr: Expr|None = super().parse()
+        if expr is not None: self.starts[expr] = start
+        return expr
+
+    def declaration(self) -> Stmt|None:
+        self.nodes.clear()
+        return super().declaration()
+
+    def advance(self) -> Token:
+        if not self.is_at_end(): self.consumed.append(self.lookahead)
+        return super().advance()
+
+    def new_assign(self, name: Token, value: Expr) -> Expr:
+        return self.unshared_node(super().new_assign(name, value), self.spans[value] + 2)
+
+    def new_binary(self, left: Expr, operator: Token, right: Expr) -> Expr:
+        return self.combine(Binary, left, operator, right, super().new_binary)
+
+    def new_grouping(self, expression: Expr) -> Expr:
+        span: int = self.spans[expression] + 2
+        if expression in self.unshared: return self.unshared_node(super().new_grouping(expression), span)
+        return self.intern((Grouping, expression), span, lambda: Grouping(expression))
+
+    def new_literal(self, value: Any) -> Expr:
+        #true and 1 are equal in Python, so the type is part of the key
+        return self.intern((Literal, type(value), value), 1, lambda: Literal(value))
+
+    def new_logical(self, left: Expr, operator: Token, right: Expr) -> Expr:
+        return self.combine(Logical, left, operator, right, super().new_logical)
+
+    def new_unary(self, operator: Token, right: Expr) -> Expr:
+        span: int = self.spans[right] + 1
+        if right in self.unshared: return self.unshared_node(super().new_unary(operator, right), span)
+        return self.intern((Unary, operator.type, right), span, lambda: Unary(operator, right))
+
+    def new_variable(self, name: Token) -> Expr:
+        return self.intern((Variable, name.lexeme), 1, lambda: Variable(name, None, None))
+
+    def combine(self, node_class: type, left: Expr, operator: Token, right: Expr, build: Callable[[Expr, Token, Expr], Expr]) -> Expr:
+        span: int = self.spans[left] + 1 + self.spans[right]
+        if left in self.unshared or right in self.unshared: return self.unshared_node(build(left, operator, right), span)
+        return self.intern((node_class, left, operator.type, right), span, lambda: build(left, operator, right))
+
+    def unshared_node(self, node: Expr, span: int) -> Expr:
+        self.unshared.add(node)
+        self.spans[node] = span
+        return node
+
+    def intern(self, key: tuple, span: int, build) -> Expr:
+        self.requested += 1
+        node: Expr|None = self.nodes.get(key)
+        if node is None:
+            node = build()
+            self.nodes[key] = node
+            self.spans[node] = span
+            self.built += 1
+        else:
+            self.shared.add(node)
+        return node
+
+    def occurrence_token(self, path: list[Expr]) -> Token|None:
+        #Token of the last node of path, a chain of children down from a tree returned by parse.
+        #None for trees parse did not return
+        position: int|None = self.starts.get(path[0])
+        if position is None: return None
+
+        for parent, child in zip(path, path[1:]):
+            parent_class: type = parent.__class__
+            if parent_class is Binary or parent_class is Logical:
+                #With the same node on both sides only the left one can fail, the right one reuses its value
+                if parent.left is not child: position += self.spans[parent.left] + 1
+            elif parent_class is Assign:
+                position += 2
+            else:
+                position += 1
+
+        node: Expr = path[-1]
+        if node.__class__ is Binary or node.__class__ is Logical:
+            position += self.spans[node.left]
+        return self.consumed[position]
+
+    def sharing(self) -> tuple[int, int]:
+        #(interned nodes the plain parser would have built, distinct interned nodes built)
+        return self.requested, self.built
+
+#Marks a node that has not been evaluated yet in this evaluation
+MISSING: object = object()
+
+class MemoizingInterpreter(Interpreter):
+    #Evaluates each shared node once per top-level evaluation; other nodes are evaluated as usual
+    #without touching the memo. Shared nodes hold no assignment, so their value can only change when
+    #an assignment elsewhere runs, which clears the memo.
+    #A runtime error unwinds through the path to the occurrence that failed, and is raised again
+    #with that occurrence's token instead of the shared node's.
+
+    def __init__(self, parser: HashConsParser, lox_interp=None):
+        super().__init__(lox_interp)
+        #Parser of the trees this interpreter evaluates
+        self.parser: HashConsParser = parser
+        self.shared: set[Expr] = parser.shared
+        self.memo: dict[Expr, Any] = {}
+        #Nodes the current runtime error has unwound through, innermost first
+        self.failed: list[Expr] = []
+
+    def evaluate_tree(self, expression: Expr) -> Any:
+        return self.evaluate_root(expression)
+
+    def evaluate_root(self, expression: Expr) -> Any:
+        self.memo = {}
+        self.failed = []
+        try:
+            return self.evaluate(expression)
+        except LoxRuntimeError as error:
+            token: Token|None = self.parser.occurrence_token(self.failed[::-1])
+            if token is None or token is error.token: raise
+            raise LoxRuntimeError(token, error.message) from None
+
+    def evaluate(self, expr: Expr) -> Any:
+        try:
+            if expr not in self.shared: return expr.accept(self)
+
+            value: Any = self.memo.get(expr, MISSING)
+            if value is MISSING:
+                value = expr.accept(self)
+                self.memo[expr] = value
+            return value
+        except LoxRuntimeError:
+            self.failed.append(expr)
+            raise
+
+    def assign(self, expr: Assign, value: Any) -> Any:
+        self.memo.clear()
+        return super().assign(expr, value)
@@ -0,0 +1,203 @@
+from bisect import bisect_left
+from pylox.lox_token import Token
+from token_type import TokenType
+from expr import *
+from scanner import Scanner
+from parser import Parser
+from constant_pool import ConstantPool
+
+class OffsetScanner(Scanner):
+    #Scanner that records where each token starts, so an edit can be mapped onto the token list
+
+    def __init__(self, source: str, lox_interp, pool: ConstantPool|None=None):
+        super().__init__(source, lox_interp, pool)
+        self.starts: list[int] = []
+
+    def add_token(self, type: TokenType, literal: Any|None=None):
+        super().add_token(type, literal)
+        self.starts.append(self.start)
+
+class IncrementalParser(Parser):
+    #Parser that takes a Grouping from the previous tree instead of parsing it again when its
+    #opening parenthesis token was kept by the edit together with every token up to its closing one
+
+    def __init__(self, tokens: list[Token], reusable: dict[int, tuple[int, int, Expr]]|None=None,
+                 kept_groupings: list[tuple[int, int, Expr]]|None=None, lox_interp=None):
+        super().__init__(tokens, lox_interp)
+        self.token_list: list[Token] = tokens
+        #id of a kept "(" token -> (first and past-the-end index of its tokens, Grouping)
+        self.reusable: dict[int, tuple[int, int, Expr]] = reusable or {}
+        #Groupings of the previous tree whose tokens were all kept, sorted by start
+        self.kept_groupings: list[tuple[int, int, Expr]] = kept_groupings or []
+        self.kept_starts: list[int] = [start for start, _, _ in self.kept_groupings]
+        #(first token index, past-the-end token index, node) of every Grouping in the new tree, sorted by start
+        self.groupings: list[tuple[int, int, Expr]] = []
+        self.reused: int = 0
+        self.reported: int = 0
+
+    def parse(self) -> Expr:
+        expression: Expr = super().parse()
+        self.groupings.sort(key=lambda grouping: grouping[0])
+        return expression
+
+    def primary(self) -> Expr:
+        if not self.check(TokenType.LEFT_PAREN): return super().primary()
+
+        start: int = self.current
+        entry: tuple[int, int, Expr]|None = self.reusable.get(id(self.peek()))
+        if entry is not None:
+            _, end, node = entry
+            self.skip_to(end)
+            self.reused += 1
+            #Bring along the groupings nested inside, so later edits can still reuse them
+            i: int = bisect_left(self.kept_starts, start)
+            while i < len(self.kept_groupings) and self.kept_groupings[i][0] < end:
+                self.groupings.append(self.kept_groupings[i])
+                i += 1
+            return node
+
+        reported: int = self.reported
+        node: Expr = super().primary()
+        #A grouping that reported an error without failing must be parsed again to report it again
+        if self.reported == reported:
+            self.groupings.append((start, self.current, node))
+        return node
+
+    def error(self, token: Token, message: str) -> Parser.ParseError:
+        self.reported += 1
+        return super().error(token, message)
+
+    def skip_to(self, index: int):
+        tokens: list[Token] = self.token_list
+        self.current = index
+        self.last = tokens[index - 1]
+        self.lookahead = tokens[index]
+        self.tokens = map(tokens.__getitem__, range(index + 1, len(tokens)))
+
+class IncrementalDocument:
+    #Source text with its tokens and tree, updated by edits. An edit rescans from the last token
+    #ending before it until the scanner reaches a token start it had before, keeps the remaining
+    #tokens with their lines shifted, and reparses reusing Groupings whose tokens were all kept.
+
+    def __init__(self, source: str):
+        self.source: str = ""
+        self.pool: ConstantPool = ConstantPool()
+        self.tokens: list[Token] = []
+        self.starts: list[int] = []
+        #(offset, line, where, message) for scan errors, (line, where, message) for parse errors
+        self.scan_errors: list[tuple[int, int, str, str]] = []
+        self.parse_errors: list[tuple[int, str, str]] = []
+        self.groupings: list[tuple[int, int, Expr]] = []
+        self.expression: Expr|None = None
+        self.scanner: OffsetScanner|None = None
+        #Work done by the last edit
+        self.rescanned: int = 0
+        self.reused: int = 0
+
+        self.edit(0, 0, source)
+
+    def edit(self, offset: int, removed: int, inserted: str) -> Expr|None:
+        if offset < 0 or removed < 0 or offset + removed > len(self.source):
+            raise ValueError(f"Edit ({offset}, {removed}) is outside the source")
+
+        old_tokens: list[Token] = self.tokens
+        old_starts: list[int] = self.starts
+        source: str = self.source[:offset] + inserted + self.source[offset + removed:]
+        delta: int = len(inserted) - removed
+        edit_end: int = offset + len(inserted)
+
+        #Restart at the last token ending before the edit; it may grow into the edited text,
+        #and nothing before it looks further ahead than its first character
+        restart: int = bisect_left(old_starts, offset, 0, max(len(old_tokens) - 1, 0)) - 1
+        while restart >= 0 and old_starts[restart] + len(old_tokens[restart].lexeme) >= offset:
+            restart -= 1
+        if restart < 0:
+            restart = 0
+            position: int = 0
+            line: int = 1
+        else:
+            position = old_starts[restart]
+            line = old_tokens[restart].line - old_tokens[restart].lexeme.count("\n")
+
+        scanner: OffsetScanner = OffsetScanner(source, self, self.pool)
+        scanner.current = position
+        scanner.line = line
+        self.scanner = scanner
+        old_scan_errors: list[tuple[int, int, str, str]] = self.scan_errors
+        self.scan_errors = [error for error in old_scan_errors if error[0] < position]
+
+        #Old token index where scanning fell back in step, or None when it ran to the end
+        resync: int|None = None
+        while not scanner.is_at_end():
+            scanner.start = scanner.current
+            if scanner.start >= edit_end:
+                j: int = bisect_left(old_starts, scanner.start - delta)
+                if j < len(old_tokens) - 1 and old_starts[j] == scanner.start - delta:
+                    resync = j
+                    break
+            scanner.scan_token()
+
+        kept: list[Token] = old_tokens[:restart]
+        tokens: list[Token] = kept + scanner.tokens
+        starts: list[int] = old_starts[:restart] + scanner.starts
+        self.rescanned = len(scanner.tokens)
+
+        if resync is None:
+            tokens.append(Token(TokenType.EOF, "", None, scanner.line))
+            starts.append(len(source))
+            old_resync: int = len(old_tokens)
+        else:
+            old_line: int = old_tokens[resync].line - old_tokens[resync].lexeme.count("\n")
+            line_shift: int = scanner.line - old_line
+            resync_offset: int = old_starts[resync]
+            #Kept tokens are shifted in place, so reused subtrees see the new lines too
+            if line_shift:
+                for token in old_tokens[resync:]:
+                    token.line += line_shift
+            tokens.extend(old_tokens[resync:])
+            starts.extend(start + delta for start in old_starts[resync:])
+            self.scan_errors.extend((error_offset + delta, error_line + line_shift, where, message)
+                                    for error_offset, error_line, where, message in old_scan_errors
+                                    if error_offset >= resync_offset)
+            old_resync = resync
+
+        self.source = source
+        self.tokens = tokens
+        self.starts = starts
+        self.scanner = None
+        self.reparse(restart, old_resync, len(tokens) - len(old_tokens))
+        return self.expression
+
+    def reparse(self, restart: int, old_resync: int, shift: int):
+        #Groupings whose tokens all lie before the restart or after the resync point are unchanged,
+        #shift moves the ones after it to their index in the new token list
+        reusable: dict[int, tuple[int, int, Expr]] = {}
+        kept: list[tuple[int, int, Expr]] = []
+        for start, end, node in self.groupings:
+            if end <= restart:
+                kept.append((start, end, node))
+            elif start >= old_resync:
+                kept.append((start + shift, end + shift, node))
+            else:
+                continue
+            #Keyed on the opening token, which is the same object in the new token list
+            reusable[id(self.tokens[kept[-1][0]])] = kept[-1]
+
+        self.parse_errors = []
+        parser: IncrementalParser = IncrementalParser(self.tokens, reusable, kept, self)
+        self.expression = parser.parse()
+        self.groupings = parser.groupings
+        self.reused = parser.reused
+
+    def errors(self) -> list[tuple[int, str, str]]:
+        #(line, where, message) in the order a full run reports them
+        return [(line, where, message) for _, line, where, message in self.scan_errors] + self.parse_errors
+
+    def error(self, token: Token|int, message: str):
+        if isinstance(token, Token):
+            if token.type == TokenType.EOF:
+                self.parse_errors.append((token.line, "at end", message))
+            else:
+                self.parse_errors.append((token.line, f"at '{token.lexeme}'", message))
+        else:
+            self.scan_errors.append((self.scanner.start, token, "", message))
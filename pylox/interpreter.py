@@ -1,31 +1,175 @@
+import operator
 from expr import *
-from abc import abstractmethod
-from typing import Any
+from stmt import *
+from typing import Any, Callable
 from token_type import TokenType
 from lox_runtime_error import LoxRuntimeError
+from environment import Environment, UNDEFINED
+from output_buffer import OutputBuffer
 
-class Interpreter(Visitor):
+#Binary nodes with an inline cache before the caches are cleared
+MAX_INLINE_CACHES: int = 65536
+
+#Operators specialized for two number operands, and for two strings or two booleans apart from +
+FLOAT_OPS: dict[TokenType, Callable[[Any, Any], Any]] = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.SLASH: operator.truediv,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.EQUAL_EQUAL: operator.eq,
+    TokenType.BANG_EQUAL: operator.ne
+}
+
+EQUALITY_OPS: dict[TokenType, Callable[[Any, Any], Any]] = {
+    TokenType.EQUAL_EQUAL: operator.eq,
+    TokenType.BANG_EQUAL: operator.ne
+}
+
+class Interpreter(Visitor, StmtVisitor):
+
+    def __init__(self, lox_interp=None):
+        self.lox_interp = lox_interp
+        #Values printed by interpret and print statements, flushed when a run ends
+        self.output: OutputBuffer = OutputBuffer()
+        #Globals live in one flat list, indexed by the slot Resolver gives each name
+        self.globals: list[Any] = []
+        self.global_slots: dict[str, int] = {}
+        #Innermost block scope, None at the top level
+        self.environment: Environment|None = None
+        #Handler installed for each Binary node the first time it runs, specialized to the operand types seen
+        self.inline_caches: dict[Binary, Callable[[Any, Any], Any]] = {}
+        #Set before evaluating to count hits and generic evaluations, off by default as they sit on the hot path
+        self.count_inline_caches: bool = False
+        self.inline_cache_hits: int = 0
+        self.inline_cache_misses: int = 0
+        self.inline_cache_generic: int = 0
 
     def interpret(self, expression: Expr):
         try:
-            value: Any = self.evaluate(expression)
-            print(self.stringify(value))
+            value: Any = self.evaluate_root(expression)
+            self.output.write_line(self.stringify(value))
+        except LoxRuntimeError as error:
+            if self.lox_interp is not None:
+                self.lox_interp.runtime_error(error)
+        finally:
+            self.output.flush()
+
+    def interpret_program(self, statements: list[Stmt]):
+        try:
+            for statement in statements:
+                self.execute(statement)
         except LoxRuntimeError as error:
-            #Lox.runtimerror(error)
-            pass
+            #What printed before the error comes out ahead of it
+            self.output.flush()
+            if self.lox_interp is not None:
+                self.lox_interp.runtime_error(error)
+        finally:
+            self.output.flush()
+
+    def execute(self, stmt: Stmt):
+        stmt.accept(self)
+
+    def execute_block(self, statements: list[Stmt], environment: Environment):
+        previous: Environment|None = self.environment
+        try:
+            self.environment = environment
+            for statement in statements:
+                self.execute(statement)
+        finally:
+            self.environment = previous
+
+    def global_slot(self, name: str) -> int:
+        slot: int|None = self.global_slots.get(name)
+        if slot is None:
+            slot = len(self.globals)
+            self.global_slots[name] = slot
+            self.globals.append(UNDEFINED)
+        return slot
+
+    def visit_block_stmt(self, stmt: Block):
+        self.execute_block(stmt.statements, Environment(self.environment))
+
+    def visit_expression_stmt(self, stmt: Expression):
+        self.evaluate_root(stmt.expression)
+
+    def visit_if_stmt(self, stmt: If):
+        if self.is_truthy(self.evaluate_root(stmt.condition)):
+            self.execute(stmt.then_branch)
+        elif stmt.else_branch is not None:
+            self.execute(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: Print):
+        value: Any = self.evaluate_root(stmt.expression)
+        self.output.write_line(self.stringify(value))
+
+    def visit_var_stmt(self, stmt: Var):
+        value: Any = None
+        if stmt.initializer is not None:
+            value = self.evaluate_root(stmt.initializer)
+
+        if self.environment is None:
+            self.globals[self.global_slot(stmt.name.lexeme)] = value
+        else:
+            self.environment.values.append(value)
+
+    def visit_while_stmt(self, stmt: While):
+        while self.is_truthy(self.evaluate_root(stmt.condition)):
+            self.execute(stmt.body)
+
+    def visit_variable_expr(self, expr: Variable) -> Any:
+        depth: int|None = expr.depth
+        if depth is None:
+            slot: int|None = expr.slot
+            value: Any = self.globals[slot] if slot is not None else UNDEFINED
+            if value is UNDEFINED:
+                raise LoxRuntimeError(expr.name, f"Undefined variable '{expr.name.lexeme}'")
+            return value
+
+        environment: Environment = self.environment
+        while depth:
+            environment = environment.enclosing
+            depth -= 1
+        return environment.values[expr.slot]
+
+    def visit_assign_expr(self, expr: Assign) -> Any:
+        return self.assign(expr, self.evaluate(expr.value))
+
+    def assign(self, expr: Assign, value: Any) -> Any:
+        if expr.depth is None:
+            slot: int|None = expr.slot
+            if slot is None or self.globals[slot] is UNDEFINED:
+                raise LoxRuntimeError(expr.name, f"Undefined variable '{expr.name.lexeme}'")
+            self.globals[slot] = value
+        else:
+            self.environment.ancestor(expr.depth).values[expr.slot] = value
+        return value
+
+    def visit_logical_expr(self, expr: Logical) -> Any:
+        left: Any = self.evaluate(expr.left)
+
+        if expr.operator.type == TokenType.OR:
+            if self.is_truthy(left): return left
+        elif not self.is_truthy(left):
+            return left
+
+        return self.evaluate(expr.right)
 
-    @abstractmethod
     @staticmethod
     def visit_literal_expr(expr: Expr) -> Any:
         return expr.value
     
-    @abstractmethod
     def visit_unary_expr(self, expr: Unary) -> Any:
         right: Any = self.evaluate(expr.right)
+        return self.unary_operation(expr.operator, right)
 
-        match expr.operator.type:
+    def unary_operation(self, operator: Token, right: Any) -> Any:
+        match operator.type:
             case TokenType.MINUS:
-                self.check_number_operand(expr.operator, right)
+                self.check_number_operand(operator, right)
                 return -float(right)
             case TokenType.BANG:
                 return not self.is_truthy(right)
@@ -56,7 +200,8 @@ class Interpreter(Visitor):
 
         return a == b
     
-    def stringify(self, object: Any) -> str:
+    @staticmethod
+    def stringify(object: Any) -> str:
         if object == None: return "nil"
 
         if isinstance(object, float):
@@ -68,49 +213,116 @@ class Interpreter(Visitor):
         
         return str(object)
 
-    @abstractmethod
     def visit_grouping_expr(self, expr: Expr) -> Any:
         return self.evaluate(expr.expression)
     
     def evaluate(self, expr: Expr) -> Any:
         return expr.accept(self)
+
+    def evaluate_root(self, expr: Expr) -> Any:
+        #The whole expression of a statement or of interpret, subexpressions go through evaluate
+        return self.evaluate(expr)
     
-    @abstractmethod
     def visit_binary_expr(self, expr: Binary) -> Any:
-        left: Any = self.evaluate(expr.right)
-        right: Any = self.evaluate(expr.left)
+        left: Any = self.evaluate(expr.left)
+        right: Any = self.evaluate(expr.right)
+        handler: Callable[[Any, Any], Any]|None = self.inline_caches.get(expr)
+        if handler is None:
+            handler = self.specialize(expr, left, right)
+        return handler(left, right)
+
+    def specialize(self, expr: Binary, left: Any, right: Any) -> Callable[[Any, Any], Any]:
+        type: TokenType = expr.operator.type
+        if left.__class__ is float and right.__class__ is float and type in FLOAT_OPS:
+            handler: Callable[[Any, Any], Any] = self.guarded(expr, float, FLOAT_OPS[type])
+        elif left.__class__ is str and right.__class__ is str and type == TokenType.PLUS:
+            handler = self.guarded(expr, str, operator.add)
+        elif left.__class__ is right.__class__ and left.__class__ in (str, bool) and type in EQUALITY_OPS:
+            handler = self.guarded(expr, left.__class__, EQUALITY_OPS[type])
+        else:
+            handler = self.generic(expr)
+
+        if len(self.inline_caches) >= MAX_INLINE_CACHES: self.inline_caches.clear()
+        self.inline_caches[expr] = handler
+        return handler
+
+    def guarded(self, expr: Binary, operand_type: type, fn: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+        interpreter: Interpreter = self
+
+        def miss(left: Any, right: Any) -> Any:
+            #The guard failed, this node sees more than one type so it stays on the generic path
+            interpreter.inline_cache_misses += 1
+            interpreter.inline_caches[expr] = interpreter.generic(expr)
+            return interpreter.binary_operation(expr.operator, left, right)
+
+        def handler(left: Any, right: Any) -> Any:
+            if left.__class__ is operand_type and right.__class__ is operand_type:
+                return fn(left, right)
+            return miss(left, right)
+
+        def counted(left: Any, right: Any) -> Any:
+            if left.__class__ is operand_type and right.__class__ is operand_type:
+                interpreter.inline_cache_hits += 1
+                return fn(left, right)
+            return miss(left, right)
+
+        return counted if self.count_inline_caches else handler
+
+    def generic(self, expr: Binary) -> Callable[[Any, Any], Any]:
+        interpreter: Interpreter = self
+        token: Token = expr.operator
+
+        def handler(left: Any, right: Any) -> Any:
+            return interpreter.binary_operation(token, left, right)
+
+        def counted(left: Any, right: Any) -> Any:
+            interpreter.inline_cache_generic += 1
+            return interpreter.binary_operation(token, left, right)
+
+        return counted if self.count_inline_caches else handler
+
+    def inline_cache_stats(self) -> dict[str, int]:
+        #hits and misses are guard checks on specialized nodes, generic counts evaluations of unspecialized ones.
+        #hits and generic stay 0 unless count_inline_caches is set
+        return {
+            "nodes": len(self.inline_caches),
+            "hits": self.inline_cache_hits,
+            "misses": self.inline_cache_misses,
+            "generic": self.inline_cache_generic
+        }
 
-        match expr.operator.type:
+    def binary_operation(self, operator: Token, left: Any, right: Any) -> Any:
+        match operator.type:
             case TokenType.GREATER:
-                self.check_number_operands(expr.operator, left, right)
+                self.check_number_operands(operator, left, right)
                 return float(left) > float(right)
             case TokenType.GREATER_EQUAL:
-                self.check_number_operands(expr.operator, left, right)
+                self.check_number_operands(operator, left, right)
                 return float(left) >= float(right)
             case TokenType.LESS:
-                self.check_number_operands(expr.operator, left, right)
+                self.check_number_operands(operator, left, right)
                 return float(left) < float(right)
             case TokenType.LESS_EQUAL:
-                self.check_number_operands(expr.operator, left, right)
+                self.check_number_operands(operator, left, right)
                 return float(left) <= float(right)
             case TokenType.BANG_EQUAL: return not self.is_equal(left, right)
             case TokenType.EQUAL_EQUAL: return self.is_equal(left, right)
             case TokenType.MINUS:
-                self.check_number_operands(expr.operator, left, right)
+                self.check_number_operands(operator, left, right)
                 return float(left) - float(right)
             case TokenType.PLUS:
                 if isinstance(left, float) and isinstance(right, float):
                     return float(left) + float(right)
                 
                 if isinstance(left, str) and isinstance(right, str):
-                    return str(left) + str(right)
+                    return left + right
                 
-                raise LoxRuntimeError(expr.operator, "Operands must be two numbers or two strings")
+                raise LoxRuntimeError(operator, "Operands must be two numbers or two strings")
             case TokenType.SLASH:
-                self.check_number_operands(expr.operator, left, right)
+                self.check_number_operands(operator, left, right)
                 return float(left) / float(right)
             case TokenType.STAR:
-                self.check_number_operands(expr.operator, left, right)
+                self.check_number_operands(operator, left, right)
                 return float(left) * float(right)
             
         return None
\ No newline at end of file
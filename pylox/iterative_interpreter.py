@@ -0,0 +1,99 @@
+from typing import Any, Callable
+from expr import *
+from token_type import TokenType
+from interpreter import Interpreter
+
+#Roots with a remembered height before the record is cleared
+MAX_ROOTS: int = 65536
+
+class IterativeInterpreter(Interpreter):
+
+    #Roots taller than this are evaluated by walk, which has no depth limit. Shorter ones recurse,
+    #which is cheaper per node
+    max_recursion: int = 100
+
+    def __init__(self, lox_interp=None):
+        super().__init__(lox_interp)
+        #Whether each root evaluated so far is too tall to recurse, decided the first time it runs
+        self.tall: dict[Expr, bool] = {}
+
+    def evaluate_root(self, expr: Expr) -> Any:
+        tall: bool|None = self.tall.get(expr)
+        if tall is None:
+            if len(self.tall) >= MAX_ROOTS: self.tall.clear()
+            tall = self.tall[expr] = self.too_tall(expr)
+        if tall: return self.walk(expr)
+        return expr.accept(self)
+
+    def too_tall(self, expr: Expr) -> bool:
+        stack: list[tuple[Expr, int]] = [(expr, 1)]
+        push = stack.append
+
+        while stack:
+            node, height = stack.pop()
+            if height > self.max_recursion: return True
+            node_class: type = node.__class__
+            if node_class is Binary or node_class is Logical:
+                push((node.left, height + 1))
+                push((node.right, height + 1))
+            elif node_class is Grouping:
+                push((node.expression, height + 1))
+            elif node_class is Unary:
+                push((node.right, height + 1))
+            elif node_class is Assign:
+                push((node.value, height + 1))
+        return False
+
+    def walk(self, expr: Expr) -> Any:
+        #Postorder walk with an explicit stack; a node is pushed again with visited=True once its children are queued
+        values: list[Any] = []
+        stack: list[tuple[Expr, bool]] = [(expr, False)]
+        push = stack.append
+        pop = stack.pop
+
+        while stack:
+            node, visited = pop()
+            node_class: type = node.__class__
+
+            if node_class is Literal:
+                values.append(node.value)
+            elif node_class is Grouping:
+                push((node.expression, False))
+            elif node_class is Binary:
+                if visited:
+                    right: Any = values.pop()
+                    handler: Callable[[Any, Any], Any]|None = self.inline_caches.get(node)
+                    if handler is None:
+                        handler = self.specialize(node, values[-1], right)
+                    values[-1] = handler(values[-1], right)
+                else:
+                    push((node, True))
+                    push((node.right, False))
+                    push((node.left, False))
+            elif node_class is Unary:
+                if visited:
+                    values[-1] = self.unary_operation(node.operator, values[-1])
+                else:
+                    push((node, True))
+                    push((node.right, False))
+            elif node_class is Logical:
+                if visited:
+                    #The left value is the result when it decides the outcome, otherwise the right one replaces it
+                    if self.is_truthy(values[-1]) == (node.operator.type == TokenType.OR): continue
+                    values.pop()
+                    push((node.right, False))
+                else:
+                    push((node, True))
+                    push((node.left, False))
+            elif node_class is Assign:
+                if visited:
+                    self.assign(node, values[-1])
+                else:
+                    push((node, True))
+                    push((node.value, False))
+            elif node_class is Variable:
+                values.append(self.visit_variable_expr(node))
+            else:
+                values.append(node.accept(self))
+
+        return values[0]
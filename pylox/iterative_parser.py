@@ -0,0 +1,104 @@
+from pylox.lox_token import Token
+from token_type import TokenType
+from expr import *
+from parser import Parser
+
+GROUP: int = 0
+ASSIGN: int = 1
+UNARY: int = 8
+
+class IterativeParser(Parser):
+
+    #Binding power of each binary operator, matching the assignment < or < and < equality < comparison
+    #< term < factor rules
+    precedence: dict[TokenType, int] = {
+        TokenType.EQUAL: ASSIGN,
+        TokenType.OR: 2,
+        TokenType.AND: 3,
+        TokenType.BANG_EQUAL: 4,
+        TokenType.EQUAL_EQUAL: 4,
+        TokenType.GREATER: 5,
+        TokenType.GREATER_EQUAL: 5,
+        TokenType.LESS: 5,
+        TokenType.LESS_EQUAL: 5,
+        TokenType.MINUS: 6,
+        TokenType.PLUS: 6,
+        TokenType.SLASH: 7,
+        TokenType.STAR: 7
+    }
+
+    def expression(self) -> Expr:
+        operands: list[Expr] = []
+        #(binding power, token) for pending prefix operators, binary operators and open groups
+        operators: list[tuple[int, Token]] = []
+        open_groups: int = 0
+
+        while True:
+            #Prefix position: unary operators and "(" until a primary turns up
+            while True:
+                if self.match(TokenType.BANG, TokenType.MINUS):
+                    operators.append((UNARY, self.previous()))
+                elif self.match(TokenType.LEFT_PAREN):
+                    operators.append((GROUP, self.previous()))
+                    open_groups += 1
+                else:
+                    break
+
+            operands.append(self.primary())
+
+            #Infix position: close groups until a binary operator or the end of the expression
+            while True:
+                #Unary binds tighter than any binary operator, so it applies as soon as its operand is complete
+                while operators and operators[-1][0] == UNARY:
+                    operands.append(self.new_unary(operators.pop()[1], operands.pop()))
+
+                if not self.is_at_end() and self.peek().type in self.precedence:
+                    power: int = self.precedence[self.peek().type]
+                    #Assignment is right-associative, so an earlier = stays pending
+                    self.reduce(operators, operands, power + 1 if power == ASSIGN else power)
+                    operator: Token = self.advance()
+                    operators.append((self.precedence[operator.type], operator))
+                    break
+
+                self.reduce(operators, operands, 1)
+                if open_groups == 0:
+                    return operands.pop()
+
+                self.consume(TokenType.RIGHT_PAREN, "Expect ) after expression.")
+                operators.pop()
+                open_groups -= 1
+                operands.append(self.new_grouping(operands.pop()))
+
+    def primary(self) -> Expr:
+        if self.match(TokenType.FALSE): return self.new_literal(False)
+        if self.match(TokenType.TRUE): return self.new_literal(True)
+        if self.match(TokenType.NIL): return self.new_literal(None)
+
+        if self.match(TokenType.NUMBER, TokenType.STRING):
+            return self.new_literal(self.previous().literal)
+
+        if self.match(TokenType.IDENTIFIER):
+            return self.new_variable(self.previous())
+
+        raise self.error(self.peek(), "Expect expression.")
+
+    def reduce(self, operators: list[tuple[int, Token]], operands: list[Expr], min_precedence: int):
+        #Binary operators are left-associative, so equal binding power reduces too
+        while operators and UNARY > operators[-1][0] >= min_precedence:
+            operator: Token = operators.pop()[1]
+            right: Expr = operands.pop()
+            left: Expr = operands.pop()
+            if operator.type == TokenType.EQUAL:
+                operands.append(self.assign(left, operator, right))
+            elif operator.type == TokenType.AND or operator.type == TokenType.OR:
+                operands.append(self.new_logical(left, operator, right))
+            else:
+                operands.append(self.new_binary(left, operator, right))
+
+    def assign(self, target: Expr, equals: Token, value: Expr) -> Expr:
+        if isinstance(target, Variable):
+            return self.new_assign(target.name, value)
+
+        #Reported without unwinding, as Parser.assignment does
+        self.error(equals, "Invalid assignment target.")
+        return target
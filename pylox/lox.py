@@ -1,53 +1,388 @@
+from __future__ import annotations
+import itertools
+import os
 import sys
+from typing import Iterable, Iterator, TextIO, TYPE_CHECKING
 import scanner
 from pylox.lox_token import Token
 from token_type import TokenType
 from parser import Parser
+from iterative_parser import IterativeParser
 from expr import Expr
-from ast_printer import AstPrinter
 from lox_runtime_error import LoxRuntimeError
 from interpreter import Interpreter
+from iterative_interpreter import IterativeInterpreter
+
+#Everything optional is imported where it is first used, to keep startup short
+if TYPE_CHECKING:
+    from vm import VM
+    from closure_compiler import ClosureCompiler
+    from python_compiler import PythonCompiler
+    from optimizer import Optimizer
+    from parse_cache import ParseCache
+    from parallel_scanner import ParallelScanner
+    from lox_chunk import Chunk
+    from profiler import Profiler
+    from incremental import IncrementalDocument
+    from resolver import Resolver
+    from stmt import Stmt
+
+USAGE: str = "Usage: pylox [--backend=interpreter|vm|closure|python] [--optimize] [--fast-scan] [--scan-workers=N] [--output-buffer=N] [--stream] [--mmap] [--cache|--cache-dir=DIR] [--profile] [--profile-json=FILE] [--profile-collapsed=FILE] [--serve] [script]"
+
+#Script separator for --serve
+SERVE_END: str = "%%"
+
+class NoPhase:
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+NO_PHASE: NoPhase = NoPhase()
 
 class Lox:
     
-    def __init__(self):
+    def __init__(self, argv: list[str]|None=None):
         self.had_error: bool = False
         self.had_runtime_error: bool = False
-        self.interpreter: Interpreter = Interpreter()
+        #A program given to a backend that only runs expressions
+        self.had_usage_error: bool = False
+        #Parses and evaluates deep expressions with explicit stacks, so nesting depth is not limited by recursion
+        self.interpreter: Interpreter = IterativeInterpreter(self)
+        self.vm: VM|None = None
+        self.closure_compiler: ClosureCompiler|None = None
+        self.python_compiler: PythonCompiler|None = None
+        self.backend: str = "interpreter"
+        self.optimizer: Optimizer|None = None
+        self.resolver: Resolver|None = None
+        self.fast_scan: bool = False
+        self.scan_workers: int = 0
+        self.stream: bool = False
+        self.mmap: bool = False
+        self.parse_cache: ParseCache|None = None
+        self.profiler: Profiler|None = None
+        self.profile_outputs: dict[str, str] = {}
+        self.output_buffer: int|None = None
+        serve: bool = False
 
-        args: list = sys.argv
+        if argv is None: argv = sys.argv
+        args: list = [arg for arg in argv if not arg.startswith("--")]
+        options: list = [arg for arg in argv if arg.startswith("--")]
 
-        if len(args) > 2:
-            print("Usage: pylox [script]")
+        for option in options:
+            if option.startswith("--backend="):
+                self.backend = option[len("--backend="):]
+            elif option == "--optimize":
+                from optimizer import Optimizer
+                self.optimizer = Optimizer()
+            elif option == "--fast-scan":
+                self.fast_scan = True
+            elif option.startswith("--scan-workers="):
+                self.scan_workers = int(option[len("--scan-workers="):])
+            elif option.startswith("--output-buffer="):
+                self.output_buffer = int(option[len("--output-buffer="):])
+            elif option == "--stream":
+                self.stream = True
+            elif option == "--mmap":
+                self.mmap = True
+            elif option == "--cache":
+                from parse_cache import ParseCache
+                self.parse_cache = ParseCache()
+            elif option.startswith("--cache-dir="):
+                from parse_cache import ParseCache
+                self.parse_cache = ParseCache(option[len("--cache-dir="):])
+            elif option == "--profile":
+                self.profile_outputs["summary"] = ""
+            elif option.startswith("--profile-json="):
+                self.profile_outputs["json"] = option[len("--profile-json="):]
+            elif option.startswith("--profile-collapsed="):
+                self.profile_outputs["collapsed"] = option[len("--profile-collapsed="):]
+            elif option == "--serve":
+                serve = True
+            else:
+                print(f"Unknown option {option}")
+                exit(64)
+
+        if self.profile_outputs:
+            from profiler import Profiler
+            self.profiler = Profiler()
+
+        if self.profiler is not None or self.output_buffer is not None:
+            self.interpreter = self.new_interpreter()
+
+        if self.backend not in ("interpreter", "vm", "closure", "python"):
+            print(USAGE)
+            exit(64)
+
+        if len(args) > 2 or (serve and len(args) == 2):
+            print(USAGE)
             exit()
         elif len(args) == 2:
             self.run_file(args[1])
+        elif serve:
+            self.serve(sys.stdin)
+
+    def new_interpreter(self) -> Interpreter:
+        if self.profiler is not None:
+            from profiler import ProfilingInterpreter
+            interpreter: Interpreter = ProfilingInterpreter(self, self.profiler)
+        else:
+            interpreter = IterativeInterpreter(self)
+
+        if self.output_buffer is not None:
+            from output_buffer import OutputBuffer
+            interpreter.output = OutputBuffer(size=self.output_buffer)
+        return interpreter
+
+    def reset(self):
+        #Clears the errors and global scope left by a previous script, for callers that run several
+        self.had_error = False
+        self.had_runtime_error = False
+        self.had_usage_error = False
+        self.interpreter = self.new_interpreter()
+        self.resolver = None
 
     def run_file(self, path: str):
-        with open(path) as f:
-            source: str = f.read()
-        self.run(source)
+        if self.parse_cache is not None and self.parse_cache.cache_dir is None:
+            self.parse_cache.cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), "__loxcache__")
+
+        if self.mmap:
+            self.run_mapped(path)
+        else:
+            with open(path) as f:
+                if self.stream:
+                    self.run_stream(scanner.StreamingScanner(f, self).iter_tokens())
+                else:
+                    self.run(f.read())
+        self.report_profile()
+        if self.had_usage_error: exit(64)
         if self.had_error: exit(65)
         if self.had_runtime_error: exit(70)
     
+    def run_mapped(self, path: str):
+        #Scans the file's bytes in place, the source is never held as a str
+        import mmap
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                self.run_bytes(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                self.run_bytes(source)
+
+    def run_bytes(self, source):
+        from byte_scanner import ByteScanner
+        with self.phase("scan"):
+            tokens = ByteScanner(source, self).scan_buffer()
+        if self.profiler is not None: self.profiler.count_tokens(tokens)
+        self.run_tokens(tokens)
+
+    def serve(self, reader: TextIO):
+        #Run each script as it arrives and follow its output with the exit code it would have had
+        lines: list[str] = []
+        for line in reader:
+            if line.rstrip("\r\n") != SERVE_END:
+                lines.append(line)
+                continue
+            self.serve_script("".join(lines))
+            lines = []
+
+        if lines: self.serve_script("".join(lines))
+
+    def serve_script(self, source: str):
+        self.reset()
+        self.run(source)
+
+        code: int = 0
+        if self.had_usage_error: code = 64
+        elif self.had_error: code = 65
+        elif self.had_runtime_error: code = 70
+        print(f"{SERVE_END} {code}", flush=True)
+
+    def phase(self, name: str):
+        if self.profiler is None: return NO_PHASE
+        return self.profiler.phase(name)
+
     def run(self, source: str):
-        scanner_inst: scanner.Scanner = scanner.Scanner(source, self)
-        tokens: list[Token] = scanner_inst.scan_tokens()
-        parser: Parser = Parser(tokens)
-        expression: Expr = parser.parse()
+        if self.parse_cache is not None:
+            with self.phase("cache"):
+                cached: tuple[Expr, Chunk|None]|list[Stmt]|None = self.parse_cache.get(source, self.cache_kind())
+            if isinstance(cached, list):
+                self.run_program(cached)
+                return
+            if cached is not None:
+                self.execute(*cached)
+                return
 
+        if self.scan_workers:
+            from parallel_scanner import ParallelScanner
+            scanner_inst: ParallelScanner = ParallelScanner(source, self, self.scan_workers, self.fast_scan)
+        elif self.fast_scan:
+            from fast_scanner import FastScanner
+            scanner_inst: FastScanner = FastScanner(source, self)
+        else:
+            scanner_inst: scanner.Scanner = scanner.Scanner(source, self)
+        with self.phase("scan"):
+            tokens: list[Token] = scanner_inst.scan_tokens()
+        if self.profiler is not None: self.profiler.count_tokens(tokens)
+        self.run_tokens(tokens, source)
+
+    def run_tokens(self, tokens: Iterable[Token], source: str|None=None):
+        parser: Parser = IterativeParser(tokens, self)
+        with self.phase("parse"):
+            script: Expr|list[Stmt]|None = parser.parse_script()
+
+        if self.had_error: return
+        if isinstance(script, list):
+            self.run_program(script, source)
+        else:
+            self.run_expression(script, source)
+
+    def run_stream(self, tokens: Iterable[Token]):
+        #Each statement is parsed, resolved and run before the next one is read, so memory does not
+        #grow with the script. Statements ahead of a syntax error have run by the time it is found
+        parser: Parser = IterativeParser(tokens, self)
+        with self.phase("parse"):
+            script: Expr|list[Stmt] = parser.script_start()
+
+        if not isinstance(script, list):
+            if not self.had_error: self.run_expression(script)
+            return
+        if not self.interpreter_backend(): return
+
+        statements: Iterator[Stmt] = itertools.chain(script, parser.declarations())
+        while True:
+            with self.phase("parse"):
+                statement: Stmt|None = next(statements, None)
+            if statement is None: break
+            #Parsing goes on after an error, so every syntax error is reported
+            if self.had_error or self.had_runtime_error: continue
+
+            if self.profiler is not None: self.profiler.count_nodes([statement])
+            with self.phase("resolve"):
+                self.lazy_resolver().resolve([statement])
+            if self.had_error: continue
+
+            with self.phase("interpret"):
+                self.interpreter.interpret_program([statement])
+
+    def lazy_resolver(self) -> Resolver:
+        if self.resolver is None:
+            from resolver import Resolver
+            self.resolver = Resolver(self.interpreter, self)
+        return self.resolver
+
+    def run_program(self, statements: list[Stmt], source: str|None=None):
+        if not self.interpreter_backend(): return
+        if self.profiler is not None: self.profiler.count_nodes(statements)
+
+        #Global slots belong to this interpreter, so cached programs are resolved again too
+        with self.phase("resolve"):
+            self.lazy_resolver().resolve(statements)
         if self.had_error: return
 
-        self.interpreter.interpret(expression)
+        if self.parse_cache is not None and source is not None:
+            self.parse_cache.put(source, self.cache_kind(), statements)
+
+        with self.phase("interpret"):
+            self.interpreter.interpret_program(statements)
+
+    def interpreter_backend(self) -> bool:
+        #Statements only run on the tree-walking interpreter
+        if self.backend == "interpreter": return True
+        print(f"The {self.backend} backend runs a single expression, programs need --backend=interpreter")
+        self.had_usage_error = True
+        return False
+
+    def run_document(self, document: IncrementalDocument):
+        #Runs the current state of an incrementally edited source, as run() would run its text
+        for line, where, message in document.errors():
+            self.report(line, where, message)
+        if self.had_error: return
+        self.run_expression(document.expression, document.source)
+
+    def run_expression(self, expression: Expr, source: str|None=None):
+        if self.profiler is not None: self.profiler.count_nodes(expression)
+
+        if self.optimizer is not None:
+            with self.phase("optimize"):
+                try:
+                    expression = self.optimizer.optimize(expression)
+                except RecursionError:
+                    #Too deep for the optimizer's recursive walk, run the tree as parsed
+                    pass
+
+        chunk: Chunk|None = None
+        if self.backend == "vm":
+            from compiler import Compiler
+            with self.phase("compile"):
+                try:
+                    chunk = Compiler().compile(expression)
+                except RecursionError:
+                    #Too deep to compile, execute() evaluates the tree instead
+                    pass
+
+        if self.parse_cache is not None and source is not None:
+            self.parse_cache.put(source, self.cache_kind(), (expression, chunk))
+
+        self.execute(expression, chunk)
+
+    def cache_kind(self) -> str:
+        kind: str = self.backend
+        if self.optimizer is not None: kind += "-optimized"
+        return kind
+
+    def execute(self, expression: Expr, chunk: Chunk|None):
+        #A tree too deep for the bytecode compiler has no chunk and runs on the interpreter
+        backend: str = "interpreter" if self.backend == "vm" and chunk is None else self.backend
+        if backend == "vm" and self.vm is None:
+            from vm import VM
+            self.vm = VM(self)
+        elif backend == "closure" and self.closure_compiler is None:
+            from closure_compiler import ClosureCompiler
+            self.closure_compiler = ClosureCompiler(self)
+        elif backend == "python" and self.python_compiler is None:
+            from python_compiler import PythonCompiler
+            self.python_compiler = PythonCompiler(self)
+        elif backend == "interpreter":
+            #Global slots belong to this interpreter, so cached trees are resolved again too
+            with self.phase("resolve"):
+                self.lazy_resolver().resolve_expression(expression)
+
+        with self.phase("interpret"):
+            if backend == "vm":
+                self.vm.interpret(chunk)
+            elif backend == "closure":
+                self.closure_compiler.interpret(expression)
+            elif backend == "python":
+                self.python_compiler.interpret(expression)
+            else:
+                self.interpreter.interpret(expression)
+
+        from ast_printer import StreamingAstPrinter
+        with self.phase("print"):
+            StreamingAstPrinter().write(expression, sys.stdout)
+            sys.stdout.write("\n")
+
+    def report_profile(self):
+        if self.profiler is None: return
 
-        print(AstPrinter().print(expression))
+        if "summary" in self.profile_outputs:
+            print(self.profiler.summary(), file=sys.stderr)
+        if "json" in self.profile_outputs:
+            with open(self.profile_outputs["json"], "w") as f:
+                f.write(self.profiler.to_json())
+        if "collapsed" in self.profile_outputs:
+            with open(self.profile_outputs["collapsed"], "w") as f:
+                f.write(self.profiler.to_collapsed())
     
     def error(self, token: Token, message: str):
         if isinstance(token, Token):
             if token.type == TokenType.EOF:
                 self.report(token.line, "at end", message)
             else:
-                self.report(token.line, f" at '{token.lexeme}'{message}")
+                self.report(token.line, f"at '{token.lexeme}'", message)
         else:
             line: int = token
             self.report(line, "", message)
@@ -0,0 +1,64 @@
+from array import array
+from typing import Any
+from pylox.lox_token import Token
+from op_code import OpCode
+
+class Chunk:
+
+    def __init__(self):
+        self.code: array = array("B")
+        self.constants: list[Any] = []
+        #Token that produced each byte of code, used for runtime error reporting
+        self.tokens: list[Token|None] = []
+        self.constant_indexes: dict[tuple[type, Any], int] = {}
+
+    def write(self, byte: int, token: Token|None=None):
+        self.code.append(byte)
+        self.tokens.append(token)
+
+    def add_constant(self, value: Any) -> int:
+        #bool and float compare equal (True == 1.0), so key on the type as well
+        key: tuple[type, Any] = (type(value), value)
+        index: int|None = self.constant_indexes.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self.constant_indexes[key] = index
+        return index
+
+    def write_long(self, operand: int, token: Token|None=None):
+        #Three bytes, low byte first
+        self.write(operand & 0xff, token)
+        self.write((operand >> 8) & 0xff, token)
+        self.write((operand >> 16) & 0xff, token)
+
+    def read_long(self, offset: int) -> int:
+        return self.code[offset] | (self.code[offset + 1] << 8) | (self.code[offset + 2] << 16)
+
+    def patch_long(self, offset: int, operand: int):
+        self.code[offset] = operand & 0xff
+        self.code[offset + 1] = (operand >> 8) & 0xff
+        self.code[offset + 2] = (operand >> 16) & 0xff
+
+    def disassemble(self) -> str:
+        lines: list[str] = []
+        offset: int = 0
+
+        while offset < len(self.code):
+            op: OpCode = OpCode(self.code[offset])
+            if op == OpCode.CONSTANT:
+                index: int = self.code[offset + 1]
+                lines.append(f"{offset:04} {op.name} {index} '{self.constants[index]}'")
+                offset += 2
+            elif op in (OpCode.CONSTANT_LONG, OpCode.GET_GLOBAL, OpCode.SET_GLOBAL):
+                index: int = self.read_long(offset + 1)
+                lines.append(f"{offset:04} {op.name} {index} '{self.constants[index]}'")
+                offset += 4
+            elif op in (OpCode.JUMP, OpCode.JUMP_IF_FALSE):
+                lines.append(f"{offset:04} {op.name} -> {offset + 4 + self.read_long(offset + 1):04}")
+                offset += 4
+            else:
+                lines.append(f"{offset:04} {op.name}")
+                offset += 1
+
+        return "\n".join(lines)
@@ -2,6 +2,7 @@ from token_type import TokenType
 from typing import Any
 
 class Token:
+    __slots__ = ("type", "lexeme", "literal", "line")
 
     def __init__(self, type: TokenType, lexeme: str, literal: Any, line: int):
         self.type: TokenType = type
@@ -9,5 +10,8 @@ class Token:
         self.literal: Any = literal
         self.line: int = line
     
+    def __reduce__(self):
+        return Token, (self.type, self.lexeme, self.literal, self.line)
+
     def to_string(self) -> str:
         return f"{self.type} {self.lexeme} {self.literal}"
\ No newline at end of file
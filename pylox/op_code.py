@@ -0,0 +1,37 @@
+from enum import IntEnum, auto
+
+class OpCode(IntEnum):
+    # Constants.
+    CONSTANT = auto()
+    CONSTANT_LONG = auto()
+    NIL = auto()
+    TRUE = auto()
+    FALSE = auto()
+
+    # Unary operators.
+    NEGATE = auto()
+    NOT = auto()
+
+    # Binary operators.
+    ADD = auto()
+    SUBTRACT = auto()
+    MULTIPLY = auto()
+    DIVIDE = auto()
+    GREATER = auto()
+    GREATER_EQUAL = auto()
+    LESS = auto()
+    LESS_EQUAL = auto()
+    EQUAL = auto()
+    NOT_EQUAL = auto()
+
+    # Variables, the operand is the constant index of the name.
+    GET_GLOBAL = auto()
+    SET_GLOBAL = auto()
+
+    # Control flow, the operand is a forward offset from the end of the instruction.
+    JUMP = auto()
+    JUMP_IF_FALSE = auto()
+    POP = auto()
+
+    #End of chunk
+    RETURN = auto()
@@ -0,0 +1,127 @@
+from typing import Any
+from expr import *
+from token_type import TokenType
+from lox_runtime_error import LoxRuntimeError
+from interpreter import Interpreter
+
+class Optimizer(Visitor):
+
+    #Operators whose result is always a number when evaluation succeeds
+    numeric_ops: set[TokenType] = {TokenType.MINUS, TokenType.STAR, TokenType.SLASH}
+
+    #Operators whose result is always a boolean
+    boolean_ops: set[TokenType] = {
+        TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL,
+        TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL
+    }
+
+    def __init__(self):
+        self.interpreter: Interpreter = Interpreter()
+        self.removed: int = 0
+
+    def optimize(self, expr: Expr) -> Expr:
+        result: Expr = expr.accept(self)
+        self.removed = self.count_nodes(expr) - self.count_nodes(result)
+        return result
+
+    @staticmethod
+    def count_nodes(expr: Expr) -> int:
+        count: int = 0
+        stack: list[Expr] = [expr]
+
+        while stack:
+            node: Expr = stack.pop()
+            count += 1
+            if isinstance(node, (Binary, Logical)):
+                stack.append(node.left)
+                stack.append(node.right)
+            elif isinstance(node, Assign):
+                stack.append(node.value)
+            elif isinstance(node, Grouping):
+                stack.append(node.expression)
+            elif isinstance(node, Unary):
+                stack.append(node.right)
+
+        return count
+
+    @classmethod
+    def static_type(cls, expr: Expr) -> type|None:
+        if isinstance(expr, Literal):
+            return type(expr.value)
+        if isinstance(expr, Grouping):
+            return cls.static_type(expr.expression)
+        if isinstance(expr, Unary):
+            return float if expr.operator.type == TokenType.MINUS else bool
+        if isinstance(expr, Binary):
+            if expr.operator.type in cls.numeric_ops: return float
+            if expr.operator.type in cls.boolean_ops: return bool
+            if expr.operator.type == TokenType.PLUS:
+                left: type|None = cls.static_type(expr.left)
+                if left is not None and left == cls.static_type(expr.right): return left
+        return None
+
+    def fold(self, expr: Expr) -> Expr:
+        #Leave anything that fails alone so the error still happens at runtime
+        try:
+            return Literal(self.interpreter.evaluate(expr))
+        except (LoxRuntimeError, ArithmeticError):
+            return expr
+
+    def visit_assign_expr(self, expr: Assign) -> Expr:
+        value: Expr = expr.value.accept(self)
+        if value is not expr.value:
+            return Assign(expr.name, value, expr.depth, expr.slot)
+        return expr
+
+    def visit_binary_expr(self, expr: Binary) -> Expr:
+        left: Expr = expr.left.accept(self)
+        right: Expr = expr.right.accept(self)
+        if left is not expr.left or right is not expr.right:
+            expr = Binary(left, expr.operator, right)
+
+        if isinstance(left, Literal) and isinstance(right, Literal):
+            return self.fold(expr)
+
+        return expr
+
+    def visit_grouping_expr(self, expr: Grouping) -> Expr:
+        #The tree shape already encodes the grouping
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr: Literal) -> Expr:
+        return expr
+
+    def visit_logical_expr(self, expr: Logical) -> Expr:
+        left: Expr = expr.left.accept(self)
+        right: Expr = expr.right.accept(self)
+
+        #A literal left operand decides which side is the result
+        if isinstance(left, Literal):
+            truthy: bool = Interpreter.is_truthy(left.value)
+            if truthy == (expr.operator.type == TokenType.OR): return left
+            return right
+
+        if left is not expr.left or right is not expr.right:
+            return Logical(left, expr.operator, right)
+        return expr
+
+    def visit_unary_expr(self, expr: Unary) -> Expr:
+        right: Expr = expr.right.accept(self)
+
+        if isinstance(right, Literal):
+            return self.fold(Unary(expr.operator, right))
+
+        #!!x is x and -(-x) is x only when x already has the type the operators produce
+        if isinstance(right, Unary) and right.operator.type == expr.operator.type:
+            inner: Expr = right.right
+            if expr.operator.type == TokenType.BANG and self.static_type(inner) is bool:
+                return inner
+            if expr.operator.type == TokenType.MINUS and self.static_type(inner) is float:
+                return inner
+
+        if right is not expr.right:
+            return Unary(expr.operator, right)
+        return expr
+
+    def visit_variable_expr(self, expr: Variable) -> Expr:
+        return expr
@@ -0,0 +1,31 @@
+import sys
+from typing import TextIO
+
+#Characters held back before a bulk write
+DEFAULT_SIZE: int = 1 << 16
+
+class OutputBuffer:
+    #Lines a program prints, joined and written to the sink in one call once size characters are
+    #pending. With no sink they go to whatever sys.stdout is at flush time, so redirect_stdout
+    #around a run still captures them. A size of 0 writes every line as it comes.
+
+    def __init__(self, sink: TextIO|None=None, size: int=DEFAULT_SIZE):
+        self.sink: TextIO|None = sink
+        self.size: int = size
+        self.lines: list[str] = []
+        self.pending: int = 0
+
+    def write_line(self, text: str):
+        self.lines.append(text)
+        self.pending += len(text) + 1
+        if self.pending >= self.size: self.flush()
+
+    def flush(self):
+        if not self.lines: return
+
+        sink: TextIO = self.sink if self.sink is not None else sys.stdout
+        #Trailing "" so the join ends with a newline
+        self.lines.append("")
+        sink.write("\n".join(self.lines))
+        self.lines.clear()
+        self.pending = 0
@@ -0,0 +1,106 @@
+import os
+import re
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any
+from pylox.lox_token import Token
+from token_type import TokenType
+from token_buffer import TOKEN_TYPES, TYPE_IDS
+from scanner import Scanner
+from fast_scanner import FastScanner
+
+#Code with every string and comment closed. Matching up to a newline stops early only at the quote
+#of a string that is still open there; a comment running into the newline ends at it anyway
+SETTLED: re.Pattern = re.compile(r'(?:[^"/]+|"[^"]*"|//[^\n]*|/)*')
+
+#Below this many characters per chunk the pool costs more than it saves
+MIN_CHUNK: int = 1 << 16
+
+def split_points(source: str, parts: int) -> list[int]:
+    #Offsets just past newlines that lie outside strings, near len(source) * i / parts
+    points: list[int] = []
+    settled: int = 0
+    for part in range(1, parts):
+        target: int = max(len(source) * part // parts, settled)
+        while True:
+            newline: int = source.find("\n", target)
+            if newline == -1: return points
+            end: int = SETTLED.match(source, settled, newline).end()
+            if end == newline: break
+            #The string opened at end spans the newline, so look again past its closing quote
+            close: int = source.find('"', end + 1)
+            if close == -1: return points
+            settled = target = close + 1
+
+        settled = newline + 1
+        if settled >= len(source): break
+        points.append(settled)
+    return points
+
+class ChunkErrors:
+    #Stands in for Lox in a worker, errors are replayed on the real one in source order
+
+    def __init__(self):
+        self.errors: list[tuple[int, str]] = []
+
+    def error(self, line: int, message: str):
+        self.errors.append((line, message))
+
+def scan_chunk(chunk: tuple[str, int, bool]) -> tuple[bytes, list[str], list[Any], array, list[tuple[int, str]]]:
+    source, line, fast = chunk
+    errors: ChunkErrors = ChunkErrors()
+    scanner_inst: Scanner|FastScanner = FastScanner(source, errors) if fast else Scanner(source, errors)
+    #Lines are counted from the chunk's first line, so tokens come back with absolute lines
+    scanner_inst.line = line
+    tokens: list[Token] = scanner_inst.scan_tokens()
+    tokens.pop()
+    #Sent back as columns, which pickle several times faster than Token objects
+    return (bytes([TYPE_IDS[token.type] for token in tokens]), [token.lexeme for token in tokens],
+            [token.literal for token in tokens], array("q", [token.line for token in tokens]), errors.errors)
+
+class ParallelScanner:
+    #Splits the source at newlines outside string literals and scans the pieces in a process pool.
+    #Produces the same tokens and errors as Scanner, or FastScanner when fast is set
+
+    def __init__(self, source: str, lox_interp, workers: int|None=None, fast: bool=False, executor: Executor|None=None,
+                 min_chunk: int=MIN_CHUNK):
+        self.lox_interp = lox_interp
+        self.source: str = source
+        self.workers: int = workers or os.cpu_count() or 1
+        self.fast: bool = fast
+        #A pool shared across scans, otherwise one is started for this scan
+        self.executor: Executor|None = executor
+        self.min_chunk: int = min_chunk
+
+    def chunks(self) -> list[tuple[str, int, bool]]:
+        parts: int = max(1, min(self.workers, len(self.source) // self.min_chunk))
+        starts: list[int] = [0] + split_points(self.source, parts)
+        ends: list[int] = starts[1:] + [len(self.source)]
+
+        chunks: list[tuple[str, int, bool]] = []
+        line: int = 1
+        for start, end in zip(starts, ends):
+            chunks.append((self.source[start:end], line, self.fast))
+            line += self.source.count("\n", start, end)
+        return chunks
+
+    def scan_tokens(self) -> list[Token]:
+        chunks: list[tuple[str, int, bool]] = self.chunks()
+        if len(chunks) == 1:
+            if self.fast: return FastScanner(self.source, self.lox_interp).scan_tokens()
+            return Scanner(self.source, self.lox_interp).scan_tokens()
+
+        if self.executor is not None:
+            results = self.executor.map(scan_chunk, chunks)
+        else:
+            with ProcessPoolExecutor(len(chunks)) as executor:
+                results = list(executor.map(scan_chunk, chunks))
+
+        tokens: list[Token] = []
+        for types, lexemes, literals, lines, errors in results:
+            tokens += map(Token, map(TOKEN_TYPES.__getitem__, types), lexemes, literals, lines)
+            for line, message in errors:
+                self.lox_interp.error(line, message)
+
+        tokens.append(Token(TokenType.EOF, "", None, self.source.count("\n") + 1))
+        return tokens
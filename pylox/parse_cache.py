@@ -0,0 +1,166 @@
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+import zlib
+from collections import OrderedDict
+from typing import Any
+from version import __version__
+from expr import Expr
+from stmt import Stmt
+
+PYLOX_DIR: str = os.path.dirname(os.path.abspath(__file__))
+
+#Modules other than the node definitions whose changes can change the tree or bytecode produced
+#for a source
+GRAMMAR_MODULES: list[str] = [
+    "scanner", "fast_scanner", "parser", "iterative_parser", "hash_cons", "resolver", "optimizer", "compiler",
+    "op_code", "lox_chunk", "lox_token", "token_type"
+]
+
+def grammar_files() -> list[str]:
+    #Node modules are found through the node base classes, so a file that defines new nodes is
+    #covered without being listed
+    modules: set[str] = set(GRAMMAR_MODULES)
+    for base in (Expr, Stmt):
+        modules.add(base.__module__)
+        modules.update(node.__module__ for node in base.__subclasses__())
+    paths: list[str] = [os.path.join(PYLOX_DIR, module.rpartition(".")[2] + ".py") for module in sorted(modules)]
+    return paths + [os.path.join(PYLOX_DIR, "..", "tool", "generate_ast.py")]
+
+def grammar_fingerprint() -> str:
+    digest = hashlib.sha256()
+    for path in grammar_files():
+        digest.update(os.path.basename(path).encode())
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+def flatten(root: Expr) -> list[tuple[type, tuple, tuple[int, ...]]]:
+    #Postorder records (class, field values, indexes of child fields), so deep trees serialize without recursion
+    records: list[tuple[type, tuple, tuple[int, ...]]] = []
+    stack: list[tuple[Expr, bool]] = [(root, False)]
+
+    while stack:
+        node, visited = stack.pop()
+        values: list[Any] = [getattr(node, name) for name in type(node).__slots__]
+        children: tuple[int, ...] = tuple(i for i, value in enumerate(values) if isinstance(value, Expr))
+
+        if visited:
+            for i in children: values[i] = None
+            records.append((type(node), tuple(values), children))
+            continue
+
+        stack.append((node, True))
+        for i in reversed(children): stack.append((values[i], False))
+
+    return records
+
+def unflatten(records: list[tuple[type, tuple, tuple[int, ...]]]) -> Expr:
+    built: list[Expr] = []
+
+    for node_class, values, children in records:
+        if not children:
+            built.append(node_class(*values))
+            continue
+
+        args: list[Any] = list(values)
+        start: int = len(built) - len(children)
+        for i, child in zip(children, built[start:]):
+            args[i] = child
+        del built[start:]
+        built.append(node_class(*args))
+
+    return built[0]
+
+class TreePickler(pickle.Pickler):
+
+    def reducer_override(self, obj: Any):
+        if isinstance(obj, Expr):
+            return unflatten, (flatten(obj),)
+        return NotImplemented
+
+class ParseCache:
+
+    def __init__(self, cache_dir: str|None=None, max_entries: int=128):
+        self.cache_dir: str|None = cache_dir
+        self.max_entries: int = max_entries
+        self.entries: OrderedDict[str, Any] = OrderedDict()
+        self.fingerprint: str = f"{__version__}-{grammar_fingerprint()}"
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+
+    def key(self, source: str, kind: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(self.fingerprint.encode())
+        digest.update(kind.encode())
+        digest.update(b"\0")
+        digest.update(source.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.loxc")
+
+    def get(self, source: str, kind: str) -> Any|None:
+        key: str = self.key(source, kind)
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        artifact: Any|None = self.load(key)
+        if artifact is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self.remember(key, artifact)
+        return artifact
+
+    def put(self, source: str, kind: str, artifact: Any):
+        key: str = self.key(source, kind)
+        self.remember(key, artifact)
+        self.store(key, artifact)
+
+    def remember(self, key: str, artifact: Any):
+        self.entries[key] = artifact
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def load(self, key: str) -> Any|None:
+        if self.cache_dir is None: return None
+
+        path: str = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                return pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            #A corrupt or stale entry is just a miss
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def store(self, key: str, artifact: Any):
+        if self.cache_dir is None: return
+
+        buffer: io.BytesIO = io.BytesIO()
+        TreePickler(buffer, pickle.HIGHEST_PROTOCOL).dump(artifact)
+        data: bytes = zlib.compress(buffer.getvalue())
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(key))
+        except OSError:
+            pass
@@ -1,15 +1,26 @@
+from typing import Any, Iterable, Iterator
 from pylox.lox_token import Token
 from token_type import TokenType
 from expr import *
+from stmt import *
 
 class Parser:
 
     class ParseError(Exception):
         pass
 
-    def __init__(self, tokens: list[Token]):
-        self.tokens = tokens
-        self.current = 0
+    #Tokens that can only begin a statement
+    statement_starts: frozenset[TokenType] = frozenset({
+        TokenType.VAR, TokenType.PRINT, TokenType.IF, TokenType.WHILE, TokenType.FOR, TokenType.LEFT_BRACE
+    })
+
+    def __init__(self, tokens: Iterable[Token], lox_interp=None):
+        #Tokens are pulled one at a time, so a generator can feed the parser
+        self.tokens: Iterator[Token] = iter(tokens)
+        self.current: int = 0
+        self.lookahead: Token = next(self.tokens)
+        self.last: Token|None = None
+        self.lox_interp = lox_interp
 
     def parse(self) -> Expr:
         try:
@@ -17,8 +28,170 @@ class Parser:
         except self.ParseError:
             return None
 
+    def parse_program(self) -> list[Stmt]:
+        return list(self.declarations())
+
+    def declarations(self) -> Iterator[Stmt]:
+        #Parses each statement when the next one is asked for, so it can run before the rest is read
+        while not self.is_at_end():
+            statement: Stmt|None = self.declaration()
+            if statement is not None: yield statement
+
+    def parse_script(self) -> Expr|list[Stmt]|None:
+        script: Expr|list[Stmt] = self.script_start()
+        if isinstance(script, list): return script + self.parse_program()
+        return script
+
+    def script_start(self) -> Expr|list[Stmt]:
+        #A script that is one expression, with or without a closing ';', is evaluated and printed as
+        #before statements existed, anything else is a program. For a program this returns the
+        #statements read to tell them apart, declarations gives the rest
+        if self.is_at_end() or self.peek().type in self.statement_starts: return []
+
+        try:
+            expr: Expr = self.expression()
+            if self.is_at_end(): return expr
+            self.consume(TokenType.SEMICOLON, "Expect ';' after expression.")
+            if self.is_at_end(): return expr
+            return [Expression(expr)]
+        except self.ParseError:
+            self.synchronize()
+            return []
+
+    def declaration(self) -> Stmt|None:
+        try:
+            if self.match(TokenType.VAR): return self.var_declaration()
+            return self.statement()
+        except self.ParseError:
+            self.synchronize()
+            return None
+
+    def var_declaration(self) -> Stmt:
+        name: Token = self.consume(TokenType.IDENTIFIER, "Expect variable name.")
+
+        initializer: Expr|None = None
+        if self.match(TokenType.EQUAL):
+            initializer = self.expression()
+
+        self.consume(TokenType.SEMICOLON, "Expect ';' after variable declaration.")
+        return Var(name, initializer)
+
+    def statement(self) -> Stmt:
+        if self.match(TokenType.FOR): return self.for_statement()
+        if self.match(TokenType.IF): return self.if_statement()
+        if self.match(TokenType.PRINT): return self.print_statement()
+        if self.match(TokenType.WHILE): return self.while_statement()
+        if self.match(TokenType.LEFT_BRACE): return Block(self.block())
+
+        return self.expression_statement()
+
+    def for_statement(self) -> Stmt:
+        #Desugared into a while loop inside a block that scopes the initializer
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
+
+        initializer: Stmt|None
+        if self.match(TokenType.SEMICOLON):
+            initializer = None
+        elif self.match(TokenType.VAR):
+            initializer = self.var_declaration()
+        else:
+            initializer = self.expression_statement()
+
+        condition: Expr|None = None
+        if not self.check(TokenType.SEMICOLON):
+            condition = self.expression()
+        self.consume(TokenType.SEMICOLON, "Expect ';' after loop condition.")
+
+        increment: Expr|None = None
+        if not self.check(TokenType.RIGHT_PAREN):
+            increment = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after for clauses.")
+
+        body: Stmt = self.statement()
+        if increment is not None:
+            body = Block([body, Expression(increment)])
+        if condition is None:
+            condition = self.new_literal(True)
+        body = While(condition, body)
+        if initializer is not None:
+            body = Block([initializer, body])
+
+        return body
+
+    def if_statement(self) -> Stmt:
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
+        condition: Expr = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after if condition.")
+
+        then_branch: Stmt = self.statement()
+        else_branch: Stmt|None = None
+        if self.match(TokenType.ELSE):
+            else_branch = self.statement()
+
+        return If(condition, then_branch, else_branch)
+
+    def print_statement(self) -> Stmt:
+        value: Expr = self.expression()
+        self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
+        return Print(value)
+
+    def while_statement(self) -> Stmt:
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
+        condition: Expr = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after condition.")
+        return While(condition, self.statement())
+
+    def block(self) -> list[Stmt]:
+        statements: list[Stmt] = []
+
+        while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
+            statement: Stmt|None = self.declaration()
+            if statement is not None: statements.append(statement)
+
+        self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
+        return statements
+
+    def expression_statement(self) -> Stmt:
+        expr: Expr = self.expression()
+        self.consume(TokenType.SEMICOLON, "Expect ';' after expression.")
+        return Expression(expr)
+
     def expression(self) -> Expr:
-        return self.equality()
+        return self.assignment()
+
+    def assignment(self) -> Expr:
+        expr: Expr = self.logic_or()
+
+        if self.match(TokenType.EQUAL):
+            equals: Token = self.previous()
+            value: Expr = self.assignment()
+
+            if isinstance(expr, Variable):
+                return self.new_assign(expr.name, value)
+
+            self.error(equals, "Invalid assignment target.")
+
+        return expr
+
+    def logic_or(self) -> Expr:
+        expr: Expr = self.logic_and()
+
+        while self.match(TokenType.OR):
+            operator: Token = self.previous()
+            right: Expr = self.logic_and()
+            expr = self.new_logical(expr, operator, right)
+
+        return expr
+
+    def logic_and(self) -> Expr:
+        expr: Expr = self.equality()
+
+        while self.match(TokenType.AND):
+            operator: Token = self.previous()
+            right: Expr = self.equality()
+            expr = self.new_logical(expr, operator, right)
+
+        return expr
     
     def equality(self) -> Expr:
         expr: Expr = self.comparison()
@@ -26,7 +199,7 @@ class Parser:
         while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
             operator: Token = self.previous()
             right: Expr = self.comparison()
-            expr = Binary(expr, operator, right)
+            expr = self.new_binary(expr, operator, right)
         
         return expr
     
@@ -36,7 +209,7 @@ class Parser:
         while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
             operator: Token = self.previous()
             right: Expr = self.term()
-            expr = Binary(expr, operator, right)
+            expr = self.new_binary(expr, operator, right)
         
         return expr
     
@@ -46,7 +219,7 @@ class Parser:
         while self.match(TokenType.MINUS, TokenType.PLUS):
             operator: Token = self.previous()
             right: Expr = self.factor()
-            expr = Binary(expr, operator, right)
+            expr = self.new_binary(expr, operator, right)
         
         return expr
     
@@ -56,7 +229,7 @@ class Parser:
         while self.match(TokenType.SLASH, TokenType.STAR):
             operator: Token = self.previous()
             right: Expr = self.unary()
-            expr = Binary(expr, operator, right)
+            expr = self.new_binary(expr, operator, right)
         
         return expr
 
@@ -64,25 +237,50 @@ class Parser:
         if self.match(TokenType.BANG, TokenType.MINUS):
             operator: Token = self.previous()
             right: Expr = self.unary()
-            return Unary(operator, right)
+            return self.new_unary(operator, right)
 
         return self.primary()
 
     def primary(self) -> Expr:
-        if self.match(TokenType.FALSE): return Literal(False)
-        if self.match(TokenType.TRUE): return Literal(True)
-        if self.match(TokenType.NIL): return Literal(None)
+        if self.match(TokenType.FALSE): return self.new_literal(False)
+        if self.match(TokenType.TRUE): return self.new_literal(True)
+        if self.match(TokenType.NIL): return self.new_literal(None)
 
         if self.match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.previous().literal)
+            return self.new_literal(self.previous().literal)
         
+        if self.match(TokenType.IDENTIFIER):
+            return self.new_variable(self.previous())
+
         if self.match(TokenType.LEFT_PAREN):
             expr: Expr = self.expression()
             self.consume(TokenType.RIGHT_PAREN, "Expect ) after expression.")
-            return Grouping(expr)
+            return self.new_grouping(expr)
         
         raise self.error(self.peek(), "Expect expression.")
     
+    #Node construction goes through these so subclasses can build other representations
+    def new_assign(self, name: Token, value: Expr) -> Expr:
+        return Assign(name, value, None, None)
+
+    def new_binary(self, left: Expr, operator: Token, right: Expr) -> Expr:
+        return Binary(left, operator, right)
+
+    def new_grouping(self, expression: Expr) -> Expr:
+        return Grouping(expression)
+
+    def new_literal(self, value: Any) -> Expr:
+        return Literal(value)
+
+    def new_logical(self, left: Expr, operator: Token, right: Expr) -> Expr:
+        return Logical(left, operator, right)
+
+    def new_unary(self, operator: Token, right: Expr) -> Expr:
+        return Unary(operator, right)
+
+    def new_variable(self, name: Token) -> Expr:
+        return Variable(name, None, None)
+
     def match(self, *types: TokenType) -> bool:
         for type in types:
             if self.check(type):
@@ -97,7 +295,8 @@ class Parser:
         raise self.error(self.peek(), message)
     
     def error(self, token: Token, message: str) -> ParseError:
-        #lox.error(token, message)
+        if self.lox_interp is not None:
+            self.lox_interp.error(token, message)
         return self.ParseError()
     
     def synchronize(self):
@@ -116,14 +315,17 @@ class Parser:
         return self.peek().type == type
     
     def advance(self) -> Token:
-        if not self.is_at_end(): self.current += 1
+        if not self.is_at_end():
+            self.current += 1
+            self.last = self.lookahead
+            self.lookahead = next(self.tokens)
         return self.previous()
     
     def is_at_end(self) -> bool:
         return self.peek().type == TokenType.EOF
     
     def peek(self) -> Token:
-        return self.tokens[self.current]
+        return self.lookahead
     
     def previous(self) -> Token:
-        return self.tokens[self.current - 1]
\ No newline at end of file
+        return self.last
\ No newline at end of file
@@ -0,0 +1,205 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+from expr import *
+from stmt import Stmt
+from token_type import TokenType
+from iterative_interpreter import IterativeInterpreter
+
+class Profiler:
+
+    def __init__(self):
+        self.phase_times: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self.visits: dict[str, int] = {}
+        self.visit_times: dict[str, float] = {}
+        #Exclusive time per call stack, the input for flamegraph.pl and speedscope
+        self.stack_times: dict[str, float] = {}
+        self.stack: list[str] = ["lox"]
+        self.child_times: list[float] = [0.0]
+        #How many frames of each name are on the stack, so recursion is not counted twice
+        self.active: dict[str, int] = {}
+
+    def enter(self, name: str):
+        self.stack.append(name)
+        self.child_times.append(0.0)
+        self.active[name] = self.active.get(name, 0) + 1
+
+    def exit(self, elapsed: float):
+        children: float = self.child_times.pop()
+        path: str = ";".join(self.stack)
+        name: str = self.stack.pop()
+        self.active[name] -= 1
+        self.stack_times[path] = self.stack_times.get(path, 0.0) + elapsed - children
+        self.child_times[-1] += elapsed
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.enter(name)
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed: float = time.perf_counter() - start
+            self.exit(elapsed)
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + elapsed
+
+    def count(self, name: str, amount: int=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def count_tokens(self, tokens: list[Token]):
+        self.count("tokens", len(tokens))
+        for token in tokens:
+            self.count(f"tokens.{token.type.name}")
+
+    def count_nodes(self, root: Expr|list[Stmt]):
+        stack: list[Expr|Stmt] = list(root) if isinstance(root, list) else [root]
+        while stack:
+            node: Expr|Stmt = stack.pop()
+            self.count("nodes")
+            self.count(f"nodes.{type(node).__name__}")
+            for name in type(node).__slots__:
+                child: Any = getattr(node, name)
+                if isinstance(child, (Expr, Stmt)):
+                    stack.append(child)
+                elif isinstance(child, list):
+                    #The statements of a Block
+                    stack.extend(child)
+
+    def record_visit(self, name: str, elapsed: float):
+        self.visits[name] = self.visits.get(name, 0) + 1
+        if self.active.get(name, 0) == 0:
+            self.visit_times[name] = self.visit_times.get(name, 0.0) + elapsed
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "phases": self.phase_times,
+            "counters": self.counters,
+            "visits": {name: {"count": count, "seconds": self.visit_times.get(name, 0.0)} for name, count in self.visits.items()}
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, sort_keys=True)
+
+    def to_collapsed(self) -> str:
+        #One "frame;frame;frame microseconds" line per stack
+        lines: list[str] = [f"{path} {round(seconds * 1e6)}" for path, seconds in sorted(self.stack_times.items())]
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        lines: list[str] = ["Phase          ms"]
+        for name, seconds in self.phase_times.items():
+            lines.append(f"{name:<12} {seconds * 1e3:8.3f}")
+
+        lines.append("")
+        lines.append(f"{self.counters.get('tokens', 0)} tokens, {self.counters.get('nodes', 0)} nodes")
+
+        if self.visits:
+            lines.append("")
+            lines.append("Node          visits   cumulative ms")
+            for name, count in sorted(self.visits.items(), key=lambda item: -self.visit_times.get(item[0], 0.0)):
+                lines.append(f"{name:<12} {count:7} {self.visit_times.get(name, 0.0) * 1e3:15.3f}")
+
+        return "\n".join(lines)
+
+class ProfilingInterpreter(IterativeInterpreter):
+
+    def __init__(self, lox_interp, profiler: Profiler):
+        super().__init__(lox_interp)
+        self.profiler: Profiler = profiler
+
+    def evaluate(self, expr: Expr) -> Any:
+        #The same explicit-stack walk as IterativeInterpreter. Each node is entered in the profiler
+        #when it is first popped and exited once its value is complete; a step of 1 means the node's
+        #children are done, 2 that the right operand of and/or is. Frames still open when an error
+        #unwinds are exited as the recursive walk's finally blocks would
+        profiler: Profiler = self.profiler
+        values: list[Any] = []
+        stack: list[tuple[Expr, int]] = [(expr, 0)]
+        push = stack.append
+        #(node name, start time) of every entered node, innermost last
+        frames: list[tuple[str, float]] = []
+
+        try:
+            while stack:
+                node, step = stack.pop()
+                node_class: type = node.__class__
+                if step == 0:
+                    name: str = node_class.__name__
+                    profiler.enter(name)
+                    frames.append((name, time.perf_counter()))
+
+                if node_class is Literal:
+                    values.append(node.value)
+                elif node_class is Variable:
+                    values.append(self.visit_variable_expr(node))
+                elif node_class is Grouping:
+                    if step == 0:
+                        push((node, 1))
+                        push((node.expression, 0))
+                        continue
+                elif node_class is Binary:
+                    if step == 0:
+                        push((node, 1))
+                        push((node.right, 0))
+                        push((node.left, 0))
+                        continue
+                    right: Any = values.pop()
+                    handler: Callable[[Any, Any], Any]|None = self.inline_caches.get(node)
+                    if handler is None:
+                        handler = self.specialize(node, values[-1], right)
+                    values[-1] = handler(values[-1], right)
+                elif node_class is Unary:
+                    if step == 0:
+                        push((node, 1))
+                        push((node.right, 0))
+                        continue
+                    values[-1] = self.unary_operation(node.operator, values[-1])
+                elif node_class is Logical:
+                    if step == 0:
+                        push((node, 1))
+                        push((node.left, 0))
+                        continue
+                    if step == 1 and self.is_truthy(values[-1]) != (node.operator.type == TokenType.OR):
+                        values.pop()
+                        push((node, 2))
+                        push((node.right, 0))
+                        continue
+                elif node_class is Assign:
+                    if step == 0:
+                        push((node, 1))
+                        push((node.value, 0))
+                        continue
+                    self.assign(node, values[-1])
+                else:
+                    values.append(node.accept(self))
+
+                self.finish(frames.pop())
+        finally:
+            while frames:
+                self.finish(frames.pop())
+
+        return values[0]
+
+    def evaluate_root(self, expr: Expr) -> Any:
+        #evaluate already walks with an explicit stack, and profiles the root too
+        return self.evaluate(expr)
+
+    def execute(self, stmt: Stmt):
+        name: str = type(stmt).__name__
+        profiler: Profiler = self.profiler
+        profiler.enter(name)
+        start: float = time.perf_counter()
+        try:
+            stmt.accept(self)
+        finally:
+            elapsed: float = time.perf_counter() - start
+            profiler.exit(elapsed)
+            profiler.record_visit(name, elapsed)
+
+    def finish(self, frame: tuple[str, float]):
+        name, start = frame
+        elapsed: float = time.perf_counter() - start
+        self.profiler.exit(elapsed)
+        self.profiler.record_visit(name, elapsed)
@@ -0,0 +1,223 @@
+from collections import OrderedDict
+from weakref import WeakKeyDictionary, WeakSet
+from typing import Any, Callable
+from expr import *
+from token_type import TokenType
+from lox_runtime_error import LoxRuntimeError
+from interpreter import Interpreter
+from iterative_interpreter import IterativeInterpreter
+
+def numbers_error(token: Token):
+    raise LoxRuntimeError(token, "Operands must be numbers")
+
+def plus_error(token: Token):
+    raise LoxRuntimeError(token, "Operands must be two numbers or two strings")
+
+def number_error(token: Token):
+    raise LoxRuntimeError(token, "Operand must be a number")
+
+def get_global(globals: dict[str, Any], token: Token) -> Any:
+    try:
+        return globals[token.lexeme]
+    except KeyError:
+        raise LoxRuntimeError(token, f"Undefined variable '{token.lexeme}'") from None
+
+def set_global(globals: dict[str, Any], token: Token, value: Any) -> Any:
+    if token.lexeme not in globals:
+        raise LoxRuntimeError(token, f"Undefined variable '{token.lexeme}'")
+    globals[token.lexeme] = value
+    return value
+
+#Everything generated code can see; it gets no builtins
+GLOBALS: dict[str, Any] = {
+    "__builtins__": {},
+    "_float": float,
+    "_str": str,
+    "_numbers_error": numbers_error,
+    "_plus_error": plus_error,
+    "_number_error": number_error,
+    "_get": get_global,
+    "_set": set_global
+}
+
+NUMERIC_OPS: dict[TokenType, str] = {
+    TokenType.MINUS: "-",
+    TokenType.STAR: "*",
+    TokenType.SLASH: "/",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<="
+}
+
+class SourceGenerator(Visitor):
+    #Translates a tree into the body of a Python function. Literal values and operator tokens are
+    #read from the k and t parameters, variables from the g table, so trees of the same shape produce the same source.
+    #Operands are bound with := in a chained "is" so both are evaluated before any type check,
+    #in the same order as Interpreter.
+
+    #Nesting past this is assigned to a local first, CPython's parser stops at 200 levels
+    MAX_NESTING: int = 50
+
+    def __init__(self):
+        self.constants: list[Any] = []
+        self.tokens: list[Token] = []
+        self.statements: list[str] = []
+        self.temporaries: int = 0
+
+    def generate(self, expr: Expr) -> str:
+        source, _ = expr.accept(self)
+        self.statements.append(f"return {source}")
+        return "".join(f"    {statement}\n" for statement in self.statements)
+
+    def temporary(self) -> str:
+        self.temporaries += 1
+        return f"_{self.temporaries}"
+
+    def token(self, token: Token) -> str:
+        self.tokens.append(token)
+        return f"t[{len(self.tokens) - 1}]"
+
+    def spill(self, source: str, depth: int, at: int|None=None) -> tuple[str, int]:
+        if depth < self.MAX_NESTING and at is None: return source, depth
+        name: str = self.temporary()
+        self.statements.insert(len(self.statements) if at is None else at, f"{name} = {source}")
+        return name, 0
+
+    def visit_literal_expr(self, expr: Literal) -> tuple[str, int]:
+        if expr.value is None or expr.value is True or expr.value is False: return repr(expr.value), 0
+        self.constants.append(expr.value)
+        return f"k[{len(self.constants) - 1}]", 0
+
+    def visit_grouping_expr(self, expr: Grouping) -> tuple[str, int]:
+        return expr.expression.accept(self)
+
+    def visit_variable_expr(self, expr: Variable) -> tuple[str, int]:
+        return f"_get(g, {self.token(expr.name)})", 1
+
+    def visit_assign_expr(self, expr: Assign) -> tuple[str, int]:
+        value, depth = expr.value.accept(self)
+        return self.spill(f"_set(g, {self.token(expr.name)}, {value})", depth + 1)
+
+    def visit_logical_expr(self, expr: Logical) -> tuple[str, int]:
+        left, left_depth = expr.left.accept(self)
+        mark: int = len(self.statements)
+        right, right_depth = expr.right.accept(self)
+        value: str = self.temporary()
+        falsey: str = f"{value} is None or {value} is False"
+
+        if len(self.statements) == mark:
+            depth: int = max(left_depth, right_depth) + 1
+            if expr.operator.type == TokenType.OR:
+                return self.spill(f"({right} if ({value} := {left}) is None or {value} is False else {value})", depth)
+            return self.spill(f"({value} if ({value} := {left}) is None or {value} is False else {right})", depth)
+
+        #The right operand spilled, so its statements only run when the left one does not decide
+        spilled: list[str] = self.statements[mark:]
+        del self.statements[mark:]
+        self.statements.append(f"{value} = {left}")
+        self.statements.append(f"if {falsey}:" if expr.operator.type == TokenType.OR else f"if not ({falsey}):")
+        self.statements.extend(f"    {statement}" for statement in spilled)
+        self.statements.append(f"    {value} = {right}")
+        return value, 0
+
+    def visit_unary_expr(self, expr: Unary) -> tuple[str, int]:
+        right, depth = expr.right.accept(self)
+        value: str = self.temporary()
+
+        if expr.operator.type == TokenType.MINUS:
+            return self.spill(f"(-{value} if ({value} := {right}).__class__ is _float else _number_error({self.token(expr.operator)}))", depth + 1)
+        #Falsey values are exactly nil and false
+        return self.spill(f"(({value} := {right}) is None or {value} is False)", depth + 1)
+
+    def visit_binary_expr(self, expr: Binary) -> tuple[str, int]:
+        left, left_depth = expr.left.accept(self)
+        mark: int = len(self.statements)
+        right, right_depth = expr.right.accept(self)
+        #The right operand spilled, so the left one has to be evaluated ahead of it
+        if len(self.statements) > mark and left_depth > 0:
+            left, left_depth = self.spill(left, left_depth, mark)
+        depth: int = max(left_depth, right_depth) + 1
+        type: TokenType = expr.operator.type
+
+        #Python's == agrees with Interpreter.is_equal on every Lox value
+        if type == TokenType.EQUAL_EQUAL: return self.spill(f"({left} == {right})", depth)
+        if type == TokenType.BANG_EQUAL: return self.spill(f"({left} != {right})", depth)
+
+        a: str = self.temporary()
+        b: str = self.temporary()
+        both: str = f"({a} := {left}).__class__ is ({b} := {right}).__class__"
+        token: str = self.token(expr.operator)
+
+        if type == TokenType.PLUS:
+            return self.spill(f"({a} + {b} if {both} and ({a}.__class__ is _float or {a}.__class__ is _str) else _plus_error({token}))", depth)
+        return self.spill(f"({a} {NUMERIC_OPS[type]} {b} if {both} is _float else _numbers_error({token}))", depth)
+
+class PythonCompiler:
+
+    def __init__(self, lox_interp=None, max_entries: int=256):
+        self.lox_interp = lox_interp
+        self.max_entries: int = max_entries
+        #Compiled function by generated body, least recently used first
+        self.functions: OrderedDict[str, Callable[[list[Any], list[Token], dict[str, Any]], Any]] = OrderedDict()
+        #Passed to every generated function as g, read and written through get_global and set_global
+        self.globals: dict[str, Any] = {}
+        #Ready-to-call evaluation of each tree seen
+        self.compiled: WeakKeyDictionary[Expr, Callable[[], Any]] = WeakKeyDictionary()
+        #Trees too deep to generate. Kept out of compiled, whose values must not reference their key
+        self.uncompiled: WeakSet[Expr] = WeakSet()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def interpret(self, expression: Expr):
+        try:
+            value: Any = self.evaluate(expression)
+            print(Interpreter.stringify(value))
+        except LoxRuntimeError as error:
+            if self.lox_interp is not None:
+                self.lox_interp.runtime_error(error)
+
+    def evaluate(self, expression: Expr) -> Any:
+        return self.compile(expression)()
+
+    def compile(self, expression: Expr) -> Callable[[], Any]:
+        evaluate: Callable[[], Any]|None = self.compiled.get(expression)
+        if evaluate is not None: return evaluate
+        if expression in self.uncompiled: return self.tree_evaluation(expression)
+
+        try:
+            generator: SourceGenerator = SourceGenerator()
+            source: str = generator.generate(expression)
+            function: Callable[[list[Any], list[Token], dict[str, Any]], Any] = self.function(source)
+            constants: list[Any] = generator.constants
+            tokens: list[Token] = generator.tokens
+            globals: dict[str, Any] = self.globals
+            evaluate = lambda: function(constants, tokens, globals)
+        except (RecursionError, SyntaxError, MemoryError):
+            #Too deep to generate, evaluate as a tree instead
+            self.uncompiled.add(expression)
+            return self.tree_evaluation(expression)
+
+        self.compiled[expression] = evaluate
+        return evaluate
+
+    def tree_evaluation(self, expression: Expr) -> Callable[[], Any]:
+        lox_interp = self.lox_interp
+        return lambda: IterativeInterpreter(lox_interp).walk(expression)
+
+    def function(self, source: str) -> Callable[[list[Any], list[Token], dict[str, Any]], Any]:
+        function: Callable[[list[Any], list[Token], dict[str, Any]], Any]|None = self.functions.get(source)
+        if function is not None:
+            self.hits += 1
+            self.functions.move_to_end(source)
+            return function
+
+        self.misses += 1
+        namespace: dict[str, Any] = {}
+        exec(compile(f"def lox_expression(k, t, g):\n{source}", "<lox>", "exec"), GLOBALS, namespace)
+        function = namespace["lox_expression"]
+
+        self.functions[source] = function
+        if len(self.functions) > self.max_entries:
+            self.functions.popitem(last=False)
+        return function
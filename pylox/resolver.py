@@ -0,0 +1,139 @@
+from pylox.lox_token import Token
+from expr import *
+from stmt import *
+
+class Resolver(Visitor, StmtVisitor):
+    #Static pass run before a program executes. Each variable gets the number of scopes between
+    #its use and its declaration and its index in that scope, or a slot in the interpreter's
+    #global table when it is not a local.
+
+    def __init__(self, interpreter, lox_interp=None):
+        self.interpreter = interpreter
+        self.lox_interp = lox_interp
+        #Slot of each local by name, innermost scope last
+        self.scopes: list[dict[str, int]] = []
+        #Locals whose initializer is being resolved, per scope
+        self.initializing: list[set[str]] = []
+
+    def resolve(self, statements: list[Stmt]):
+        for statement in statements:
+            statement.accept(self)
+
+    def resolve_expression(self, expr: Expr):
+        #Explicit stack, so deep expressions don't hit the recursion limit. An Assign is pushed again
+        #with visited=True below its value, so names resolve in the same order as a recursive walk
+        stack: list[tuple[Expr, bool]] = [(expr, False)]
+        push = stack.append
+
+        while stack:
+            node, visited = stack.pop()
+            node_class: type = node.__class__
+
+            if node_class is Binary or node_class is Logical:
+                push((node.right, False))
+                push((node.left, False))
+            elif node_class is Grouping:
+                push((node.expression, False))
+            elif node_class is Unary:
+                push((node.right, False))
+            elif node_class is Variable:
+                self.visit_variable_expr(node)
+            elif node_class is Assign:
+                if visited:
+                    self.resolve_local(node)
+                else:
+                    push((node, True))
+                    push((node.value, False))
+            elif node_class is not Literal:
+                node.accept(self)
+
+    def begin_scope(self):
+        self.scopes.append({})
+        self.initializing.append(set())
+
+    def end_scope(self):
+        self.scopes.pop()
+        self.initializing.pop()
+
+    def declare(self, name: Token):
+        if not self.scopes: return
+
+        scope: dict[str, int] = self.scopes[-1]
+        if name.lexeme in scope:
+            self.error(name, "Already a variable with this name in this scope.")
+            return
+        #Locals are appended to their Environment in declaration order
+        scope[name.lexeme] = len(scope)
+        self.initializing[-1].add(name.lexeme)
+
+    def define(self, name: Token):
+        if not self.scopes: return
+        self.initializing[-1].discard(name.lexeme)
+
+    def resolve_local(self, expr: Variable|Assign):
+        name: str = expr.name.lexeme
+        for depth, scope in enumerate(reversed(self.scopes)):
+            slot: int|None = scope.get(name)
+            if slot is not None:
+                expr.depth = depth
+                expr.slot = slot
+                return
+
+        expr.depth = None
+        expr.slot = self.interpreter.global_slot(name)
+
+    def error(self, token: Token, message: str):
+        if self.lox_interp is not None:
+            self.lox_interp.error(token, message)
+
+    def visit_block_stmt(self, stmt: Block):
+        self.begin_scope()
+        self.resolve(stmt.statements)
+        self.end_scope()
+
+    def visit_expression_stmt(self, stmt: Expression):
+        self.resolve_expression(stmt.expression)
+
+    def visit_if_stmt(self, stmt: If):
+        self.resolve_expression(stmt.condition)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is not None: stmt.else_branch.accept(self)
+
+    def visit_print_stmt(self, stmt: Print):
+        self.resolve_expression(stmt.expression)
+
+    def visit_var_stmt(self, stmt: Var):
+        self.declare(stmt.name)
+        if stmt.initializer is not None:
+            self.resolve_expression(stmt.initializer)
+        self.define(stmt.name)
+
+    def visit_while_stmt(self, stmt: While):
+        self.resolve_expression(stmt.condition)
+        stmt.body.accept(self)
+
+    def visit_variable_expr(self, expr: Variable):
+        if self.initializing and expr.name.lexeme in self.initializing[-1]:
+            self.error(expr.name, "Can't read local variable in its own initializer.")
+        self.resolve_local(expr)
+
+    def visit_assign_expr(self, expr: Assign):
+        expr.value.accept(self)
+        self.resolve_local(expr)
+
+    def visit_binary_expr(self, expr: Binary):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_grouping_expr(self, expr: Grouping):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr: Literal):
+        pass
+
+    def visit_logical_expr(self, expr: Logical):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_unary_expr(self, expr: Unary):
+        expr.right.accept(self)
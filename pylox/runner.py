@@ -0,0 +1,115 @@
+import contextlib
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from lox import Lox
+
+USAGE: str = "Usage: runner [--workers=N] [--chunksize=N] [--quiet] [lox options] <file or directory>..."
+
+#Per-process Lox, built once by the pool initializer and reused for every file the worker runs
+worker_lox: Lox|None = None
+
+def init_worker(options: list[str]):
+    global worker_lox
+    worker_lox = Lox(["pylox", *options])
+
+def run_script(path: str) -> tuple[str, int, str]:
+    lox: Lox = worker_lox
+    lox.reset()
+    output: io.StringIO = io.StringIO()
+
+    with contextlib.redirect_stdout(output):
+        try:
+            with open(path) as f:
+                source: str = f.read()
+        except OSError as error:
+            print(error)
+            return path, 66, output.getvalue()
+
+        try:
+            lox.run(source)
+        except Exception as error:
+            print(f"{type(error).__name__}: {error}")
+            return path, 1, output.getvalue()
+
+    if lox.had_usage_error: return path, 64, output.getvalue()
+    if lox.had_error: return path, 65, output.getvalue()
+    if lox.had_runtime_error: return path, 70, output.getvalue()
+    return path, 0, output.getvalue()
+
+def collect_scripts(paths: list[str]) -> list[str]:
+    scripts: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, files in sorted(os.walk(path)):
+                scripts.extend(os.path.join(directory, name) for name in sorted(files) if name.endswith(".lox"))
+        else:
+            scripts.append(path)
+    return scripts
+
+class Runner:
+
+    def __init__(self, workers: int|None=None, chunksize: int|None=None, options: list[str]|None=None):
+        self.workers: int = workers or os.cpu_count() or 1
+        self.chunksize: int|None = chunksize
+        self.options: list[str] = options or []
+
+    def run(self, scripts: list[str]):
+        #Several files per task keeps pickling and queue traffic low for small scripts
+        chunksize: int = self.chunksize or max(1, len(scripts) // (self.workers * 4))
+
+        with ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.options,)) as executor:
+            yield from executor.map(run_script, scripts, chunksize=chunksize)
+
+def main(argv: list[str]):
+    workers: int|None = None
+    chunksize: int|None = None
+    quiet: bool = False
+    options: list[str] = []
+    paths: list[str] = []
+
+    for arg in argv[1:]:
+        if arg.startswith("--workers="):
+            workers = int(arg[len("--workers="):])
+        elif arg.startswith("--chunksize="):
+            chunksize = int(arg[len("--chunksize="):])
+        elif arg == "--quiet":
+            quiet = True
+        elif arg.startswith("--"):
+            options.append(arg)
+        else:
+            paths.append(arg)
+
+    if not paths or "--serve" in options:
+        print(USAGE)
+        exit(64)
+
+    #Checked here, a bad option would otherwise exit inside each pool initializer and break the pool
+    try:
+        Lox(["pylox", *options])
+    except SystemExit:
+        print(USAGE)
+        exit(64)
+
+    scripts: list[str] = collect_scripts(paths)
+    counts: dict[int, int] = {}
+
+    for path, code, output in Runner(workers, chunksize, options).run(scripts):
+        counts[code] = counts.get(code, 0) + 1
+        if not quiet:
+            print(f"==> {path} [{code}] <==")
+            print(output, end="")
+
+    print(f"{len(scripts)} scripts: {counts.get(0, 0)} ok, {counts.get(65, 0)} static errors (65), "
+          f"{counts.get(70, 0)} runtime errors (70), {len(scripts) - sum(counts.get(code, 0) for code in (0, 65, 70))} failed")
+
+    #One code for the whole run, from the most serious category any script fell into: a script
+    #that crashed or could not be read (1), then static errors (65), then runtime errors (70).
+    #The summary line above gives the count for every category
+    if len(scripts) != sum(counts.get(code, 0) for code in (0, 65, 70)): exit(1)
+    if counts.get(65): exit(65)
+    if counts.get(70): exit(70)
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,35 +1,46 @@
 from pylox.lox_token import Token
-from typing import Any
+from typing import Any, Iterator, TextIO, TYPE_CHECKING
 from token_type import TokenType
-import lox
+from constant_pool import ConstantPool
+
+if TYPE_CHECKING:
+    from lox import Lox
+
+#Built once per process instead of once per Scanner
+KEYWORDS: dict[str, TokenType] = {
+    "and": TokenType.AND,
+    "class": TokenType.CLASS,
+    "else": TokenType.ELSE,
+    "false": TokenType.FALSE,
+    "for": TokenType.FOR,
+    "fun": TokenType.FUN,
+    "if": TokenType.IF,
+    "nil": TokenType.NIL,
+    "or": TokenType.OR,
+    "print": TokenType.PRINT,
+    "return": TokenType.RETURN, 
+    "super": TokenType.SUPER,
+    "this": TokenType.THIS,
+    "true": TokenType.TRUE,
+    "var": TokenType.VAR,
+    "while": TokenType.WHILE
+}
+
+DIGITS: frozenset[str] = frozenset("0123456789")
+ALPHA: frozenset[str] = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+ALPHA_NUMERIC: frozenset[str] = ALPHA | DIGITS
 
 class Scanner:
 
-    def __init__(self, source: str, lox_interp: lox.Lox):
-        self.lox_interp: lox.Lox = lox_interp
+    def __init__(self, source: str, lox_interp: "Lox", pool: ConstantPool|None=None):
+        self.lox_interp: "Lox" = lox_interp
         self.source: str = source
+        self.pool: ConstantPool = pool if pool is not None else ConstantPool()
         self.tokens: list[Token] = []
         self.start: int = 0
         self.current: int = 0
         self.line: int = 1
-        self.keywords: dict[str, TokenType] = {
-            "and": TokenType.AND,
-            "class": TokenType.CLASS,
-            "else": TokenType.ELSE,
-            "false": TokenType.FALSE,
-            "for": TokenType.FOR,
-            "fun": TokenType.FUN,
-            "if": TokenType.IF,
-            "nil": TokenType.NIL,
-            "or": TokenType.OR,
-            "print": TokenType.PRINT,
-            "return": TokenType.RETURN, 
-            "super": TokenType.SUPER,
-            "this": TokenType.THIS,
-            "true": TokenType.TRUE,
-            "var": TokenType.VAR,
-            "while": TokenType.WHILE
-        }
+        self.keywords: dict[str, TokenType] = KEYWORDS
 
     def scan_tokens(self) -> list[Token]:
         while not self.is_at_end():
@@ -38,6 +49,16 @@ class Scanner:
 
         self.tokens.append(Token(TokenType.EOF, "", None, self.line))
         return self.tokens
+
+    def iter_tokens(self) -> Iterator[Token]:
+        while not self.is_at_end():
+            self.start = self.current
+            self.scan_token()
+            if self.tokens:
+                yield from self.tokens
+                self.tokens.clear()
+
+        yield Token(TokenType.EOF, "", None, self.line)
     
     def is_at_end(self) -> bool:
         return self.current >= len(self.source)
@@ -47,7 +68,7 @@ class Scanner:
         return self.source[self.current - 1]
 
     def add_token(self, type: TokenType, literal: Any|None=None):
-        text: str = self.source[self.start:self.current]
+        text: str = self.pool.lexeme(self.source[self.start:self.current])
         self.tokens.append(Token(type, text, literal, self.line))
 
     def scan_token(self):
@@ -100,7 +121,7 @@ class Scanner:
                         self.advance()
                 else:
                     self.add_token(TokenType.SLASH)
-            case "":
+            case " ":
                 pass
             case "\r":
                 pass
@@ -129,15 +150,17 @@ class Scanner:
 
         self.add_token(type)
     
-    def is_alpha(self, c: str) -> bool:
-        return (c >= "a" and c <= "z") or (c >= "A" and c <= "Z") or c == "_"
+    @staticmethod
+    def is_alpha(c: str) -> bool:
+        return c in ALPHA
 
-    def is_alpha_numeric(self, c: str) -> bool:
-        return self.is_alpha(c) or self.is_digit(c)
+    @staticmethod
+    def is_alpha_numeric(c: str) -> bool:
+        return c in ALPHA_NUMERIC
 
     @staticmethod
     def is_digit(c: str) -> bool:
-        return c >= "0" and c <= "9"
+        return c in DIGITS
     
     def number(self):
         while self.is_digit(self.peek()):
@@ -150,7 +173,7 @@ class Scanner:
 
             while self.is_digit(self.peek()): self.advance()
         
-        self.add_token(TokenType.NUMBER, float(self.source[self.start:self.current]))
+        self.add_token(TokenType.NUMBER, self.pool.number(self.source[self.start:self.current]))
         
     def string(self):
         while self.peek() != '"' and not self.is_at_end():
@@ -159,14 +182,14 @@ class Scanner:
             self.advance()
         
         if self.is_at_end():
-            self.lox_interp.error(self.lox_interp, self.line, "Unterminated character.")
+            self.lox_interp.error(self.line, "Unterminated string.")
             return
         
         #Closing "
         self.advance()
 
         #Trim the surrounding quotes
-        value: str = self.source[self.start+1:self.current-1]
+        value: str = self.pool.string(self.source[self.start+1:self.current-1])
         self.add_token(TokenType.STRING, value)
         
     def match(self, expected: str) -> bool:
@@ -181,5 +204,36 @@ class Scanner:
         return self.source[self.current]
     
     def peek_next(self) -> str:
-        if self.current >= len(self.source): return "\0"
-        return self.source[self.current+1]
\ No newline at end of file
+        if self.current + 1 >= len(self.source): return "\0"
+        return self.source[self.current+1]
+
+class StreamingScanner(Scanner):
+
+    def __init__(self, reader: TextIO, lox_interp, chunk_size: int=65536, pool: ConstantPool|None=None):
+        super().__init__("", lox_interp, pool)
+        self.reader: TextIO = reader
+        self.chunk_size: int = chunk_size
+        self.exhausted: bool = False
+
+    def fill(self, length: int) -> bool:
+        #Read until the buffer holds length characters, dropping everything before the current token
+        while length > len(self.source) and not self.exhausted:
+            chunk: str = self.reader.read(self.chunk_size)
+            if not chunk:
+                self.exhausted = True
+                break
+
+            self.source = self.source[self.start:] + chunk
+            self.current -= self.start
+            length -= self.start
+            self.start = 0
+
+        return length <= len(self.source)
+
+    def is_at_end(self) -> bool:
+        if self.current < len(self.source): return False
+        return not self.fill(self.current + 1)
+
+    def peek_next(self) -> str:
+        if not self.fill(self.current + 2): return "\0"
+        return self.source[self.current+1]
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any
+from batch import Batch, BatchError
+from interpreter import Interpreter
+
+USAGE: str = "Usage: server [--host=HOST] [--port=N] [--unix=PATH] [--workers=N] [--max-pending=N] [--slow-scan]"
+
+#Longest request line accepted, longer ones get an error and the connection is closed
+MAX_LINE: int = 1 << 20
+
+#Per-process Batch, built once by the pool initializer so parsed trees are cached across requests
+worker_batch: Batch|None = None
+
+def init_worker(fast_scan: bool):
+    global worker_batch
+    worker_batch = Batch(fast_scan)
+
+def type_name(value: Any) -> str:
+    if value is None: return "nil"
+    if isinstance(value, bool): return "boolean"
+    if isinstance(value, float): return "number"
+    return "string"
+
+def evaluate_source(source: str) -> dict[str, Any]:
+    try:
+        value: Any = worker_batch.evaluate_one(source)
+    except Exception as error:
+        return {"ok": False, "error": {"kind": "internal", "line": None, "message": f"{type(error).__name__}: {error}"}}
+
+    if isinstance(value, BatchError):
+        return {"ok": False, "error": {"kind": value.kind, "line": value.line, "message": value.message}}
+    #Values are sent as their Lox text, JSON has no inf or nan
+    return {"ok": True, "type": type_name(value), "value": Interpreter.stringify(value)}
+
+def request_error(message: str) -> dict[str, Any]:
+    return {"ok": False, "error": {"kind": "request", "line": None, "message": message}}
+
+class Server:
+    #Protocol: one JSON object per line each way. Requests are {"id": any, "source": str} and
+    #responses echo the id with either {"ok": true, "type", "value"} or {"ok": false, "error"}.
+    #Responses on a connection may come back out of order when requests are pipelined.
+
+    def __init__(self, workers: int|None=None, max_pending: int|None=None, fast_scan: bool=True):
+        self.workers: int = workers or os.cpu_count() or 1
+        #Requests evaluating or queued for the pool, once reached connections stop being read
+        self.max_pending: int = max_pending or self.workers * 4
+        self.fast_scan: bool = fast_scan
+        self.executor: Executor|None = None
+        self.pending: asyncio.Semaphore|None = None
+
+    async def start(self, host: str="127.0.0.1", port: int=0, unix: str|None=None) -> asyncio.AbstractServer:
+        self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.fast_scan,))
+        self.pending = asyncio.Semaphore(self.max_pending)
+        if unix is not None:
+            return await asyncio.start_unix_server(self.handle, unix, limit=MAX_LINE)
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks: set[asyncio.Task] = set()
+        try:
+            while True:
+                #Waiting here before reading leaves further requests in the socket buffers,
+                #so a busy pool pushes back on clients instead of queueing without bound
+                await self.pending.acquire()
+                try:
+                    line: bytes = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as error:
+                    line = error.partial
+                except (asyncio.LimitOverrunError, ValueError):
+                    self.pending.release()
+                    await self.respond(writer, None, request_error(f"Request longer than {MAX_LINE} bytes."))
+                    break
+
+                if not line.strip():
+                    self.pending.release()
+                    if reader.at_eof(): break
+                    continue
+
+                task: asyncio.Task = asyncio.create_task(self.serve_request(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            if tasks: await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def serve_request(self, line: bytes, writer: asyncio.StreamWriter):
+        request_id: Any = None
+        try:
+            try:
+                request: Any = json.loads(line)
+            except ValueError:
+                await self.respond(writer, None, request_error("Request is not valid JSON."))
+                return
+
+            if isinstance(request, dict): request_id = request.get("id")
+            if not isinstance(request, dict) or not isinstance(request.get("source"), str):
+                await self.respond(writer, request_id, request_error("Request needs a string 'source'."))
+                return
+
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            response: dict[str, Any] = await loop.run_in_executor(self.executor, evaluate_source, request["source"])
+            await self.respond(writer, request_id, response)
+        finally:
+            self.pending.release()
+
+    async def respond(self, writer: asyncio.StreamWriter, request_id: Any, response: dict[str, Any]):
+        if writer.is_closing(): return
+        writer.write(json.dumps({"id": request_id, **response}).encode() + b"\n")
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+async def serve(server: Server, host: str, port: int, unix: str|None):
+    listener: asyncio.AbstractServer = await server.start(host, port, unix)
+    address: Any = listener.sockets[0].getsockname()
+    if unix is None: address = f"{address[0]}:{address[1]}"
+    print(f"Listening on {address} with {server.workers} workers", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+def main(argv: list[str]):
+    host: str = "127.0.0.1"
+    port: int = 0
+    unix: str|None = None
+    workers: int|None = None
+    max_pending: int|None = None
+    fast_scan: bool = True
+
+    for arg in argv[1:]:
+        if arg.startswith("--host="):
+            host = arg[len("--host="):]
+        elif arg.startswith("--port="):
+            port = int(arg[len("--port="):])
+        elif arg.startswith("--unix="):
+            unix = arg[len("--unix="):]
+        elif arg.startswith("--workers="):
+            workers = int(arg[len("--workers="):])
+        elif arg.startswith("--max-pending="):
+            max_pending = int(arg[len("--max-pending="):])
+        elif arg == "--slow-scan":
+            fast_scan = False
+        else:
+            print(USAGE)
+            exit(64)
+
+    try:
+        asyncio.run(serve(Server(workers, max_pending, fast_scan), host, port, unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,88 @@
+from abc import ABC, abstractmethod
+from pylox.lox_token import Token
+from expr import Expr
+
+class Stmt(ABC):
+    __slots__ = ("__weakref__",)
+
+    @abstractmethod
+    def accept(self, visitor):
+        pass
+
+class Block(Stmt):
+    __slots__ = ("statements",)
+
+    def __init__(self, statements):
+        self.statements: list[Stmt] = statements
+
+    def accept(self, visitor):
+        return visitor.visit_block_stmt(self)
+
+class Expression(Stmt):
+    __slots__ = ("expression",)
+
+    def __init__(self, expression):
+        self.expression: Expr = expression
+
+    def accept(self, visitor):
+        return visitor.visit_expression_stmt(self)
+
+class If(Stmt):
+    __slots__ = ("condition", "then_branch", "else_branch")
+
+    def __init__(self, condition, then_branch, else_branch):
+        self.condition: Expr = condition
+        self.then_branch: Stmt = then_branch
+        self.else_branch: Stmt|None = else_branch
+
+    def accept(self, visitor):
+        return visitor.visit_if_stmt(self)
+
+class Print(Stmt):
+    __slots__ = ("expression",)
+
+    def __init__(self, expression):
+        self.expression: Expr = expression
+
+    def accept(self, visitor):
+        return visitor.visit_print_stmt(self)
+
+class Var(Stmt):
+    __slots__ = ("name", "initializer")
+
+    def __init__(self, name, initializer):
+        self.name: Token = name
+        self.initializer: Expr|None = initializer
+
+    def accept(self, visitor):
+        return visitor.visit_var_stmt(self)
+
+class While(Stmt):
+    __slots__ = ("condition", "body")
+
+    def __init__(self, condition, body):
+        self.condition: Expr = condition
+        self.body: Stmt = body
+
+    def accept(self, visitor):
+        return visitor.visit_while_stmt(self)
+
+class StmtVisitor(ABC):
+    @abstractmethod
+    def visit_block_stmt(self, stmt: Block):
+        pass
+    @abstractmethod
+    def visit_expression_stmt(self, stmt: Expression):
+        pass
+    @abstractmethod
+    def visit_if_stmt(self, stmt: If):
+        pass
+    @abstractmethod
+    def visit_print_stmt(self, stmt: Print):
+        pass
+    @abstractmethod
+    def visit_var_stmt(self, stmt: Var):
+        pass
+    @abstractmethod
+    def visit_while_stmt(self, stmt: While):
+        pass
@@ -0,0 +1,47 @@
+from array import array
+from typing import Any, Iterator
+from pylox.lox_token import Token
+from token_type import TokenType
+
+TOKEN_TYPES: list[TokenType] = list(TokenType)
+TYPE_IDS: dict[TokenType, int] = {type: index for index, type in enumerate(TOKEN_TYPES)}
+
+class TokenBuffer:
+
+    def __init__(self, source: str):
+        self.source: str = source
+        #One entry per token in each array; lexemes and literals are sliced from source on demand
+        self.types: array = array("B")
+        self.starts: array = array("q")
+        self.ends: array = array("q")
+        self.lines: array = array("q")
+
+    def append(self, type: TokenType, start: int, end: int, line: int):
+        self.types.append(TYPE_IDS[type])
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> Token:
+        type: TokenType = TOKEN_TYPES[self.types[index]]
+        lexeme: str = self.lexeme(index)
+        return Token(type, lexeme, self.literal(type, lexeme), self.lines[index])
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.types)):
+            yield self[index]
+
+    def type(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.types[index]]
+
+    def lexeme(self, index: int) -> str:
+        return self.source[self.starts[index]:self.ends[index]]
+
+    @staticmethod
+    def literal(type: TokenType, lexeme: str) -> Any:
+        if type == TokenType.NUMBER: return float(lexeme)
+        if type == TokenType.STRING: return lexeme[1:-1]
+        return None
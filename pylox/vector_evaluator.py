@@ -0,0 +1,242 @@
+from typing import Any, Callable
+from expr import *
+from token_type import TokenType
+from lox_runtime_error import LoxRuntimeError
+from interpreter import Interpreter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class Vector:
+    #kind is "number" (float64), "bool", "nil" (values unused) or "object" (Lox values, evaluated per row)
+
+    def __init__(self, kind: str, values):
+        self.kind: str = kind
+        self.values = values
+
+class VectorEvaluator(Visitor):
+
+    numeric_ops: dict[TokenType, Callable] = {}
+
+    def __init__(self, rows: int, columns: dict[str, Any]|None=None):
+        if np is None:
+            raise ImportError("VectorEvaluator requires numpy")
+
+        if not VectorEvaluator.numeric_ops:
+            VectorEvaluator.numeric_ops = {
+                TokenType.MINUS: np.subtract,
+                TokenType.STAR: np.multiply,
+                TokenType.SLASH: np.divide,
+                TokenType.GREATER: np.greater,
+                TokenType.GREATER_EQUAL: np.greater_equal,
+                TokenType.LESS: np.less,
+                TokenType.LESS_EQUAL: np.less_equal
+            }
+
+        self.rows: int = rows
+        self.interpreter: Interpreter = Interpreter()
+        self.failed = np.zeros(rows, dtype=bool)
+        #Index into self.errors of the first error raised by each row, -1 if none
+        self.error_ids = np.full(rows, -1, dtype=np.int32)
+        self.errors: list[LoxRuntimeError] = []
+        #Rows the current subexpression runs for; the right operand of and/or only runs where the left does not decide
+        self.active = np.ones(rows, dtype=bool)
+        #Variables, one Lox value per row
+        self.columns: dict[str, Vector] = {}
+        for name, values in (columns or {}).items():
+            self.columns[name] = self.column(values)
+
+    def column(self, values) -> Vector:
+        #Numeric and boolean NumPy arrays are used as they are, with no pass over their rows.
+        #Anything else is a sequence of Lox values, narrowed to the tightest kind that holds them
+        if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+            if values.shape != (self.rows,):
+                raise ValueError(f"Column of shape {values.shape} for {self.rows} rows")
+            if values.dtype.kind == "b": return Vector("bool", values)
+            return Vector("number", values.astype(np.float64, copy=False))
+
+        column = np.empty(self.rows, dtype=object)
+        column[:] = list(values)
+        return self.narrow(column)
+
+    def evaluate(self, expr: Expr):
+        result: Vector = expr.accept(self)
+        if result.kind == "nil":
+            return np.full(self.rows, None, dtype=object)
+        return result.values
+
+    def failed_rows(self):
+        return np.flatnonzero(self.failed)
+
+    def error_for(self, row: int) -> LoxRuntimeError|None:
+        error_id: int = int(self.error_ids[row])
+        return self.errors[error_id] if error_id >= 0 else None
+
+    def fail(self, mask, token: Token, message: str):
+        #Rows keep the first error they hit, like the scalar Interpreter
+        mask = mask & self.active & ~self.failed
+        if not mask.any(): return
+        self.error_ids[mask] = len(self.errors)
+        self.errors.append(LoxRuntimeError(token, message))
+        self.failed |= mask
+
+    def fail_all(self, token: Token, message: str) -> Vector:
+        self.fail(np.ones(self.rows, dtype=bool), token, message)
+        return Vector("nil", None)
+
+    def broadcast(self, value: Any) -> Vector:
+        if value is None: return Vector("nil", None)
+        if isinstance(value, bool): return Vector("bool", np.full(self.rows, value, dtype=bool))
+        if isinstance(value, float): return Vector("number", np.full(self.rows, value, dtype=np.float64))
+        return Vector("object", np.full(self.rows, value, dtype=object))
+
+    def objects(self, vector: Vector):
+        if vector.kind == "nil": return np.full(self.rows, None, dtype=object)
+        if vector.kind == "object": return vector.values
+        if vector.kind == "number": return vector.values.astype(object)
+        return np.array([bool(value) for value in vector.values], dtype=object)
+
+    def narrow(self, values) -> Vector:
+        #Rows that failed or did not run hold None and do not decide the type
+        live: list[Any] = [value for value, failed, active in zip(values, self.failed, self.active) if active and not failed]
+        if all(isinstance(value, float) for value in live):
+            return Vector("number", np.array([value if isinstance(value, float) else 0.0 for value in values], dtype=np.float64))
+        if all(isinstance(value, bool) for value in live):
+            return Vector("bool", np.array([value is True for value in values], dtype=bool))
+        if all(value is None for value in live):
+            return Vector("nil", None)
+        return Vector("object", values)
+
+    def truthy(self, vector: Vector):
+        if vector.kind == "nil": return np.zeros(self.rows, dtype=bool)
+        if vector.kind == "number": return np.ones(self.rows, dtype=bool)
+        if vector.kind == "bool": return vector.values
+        return np.array([not (value is None or value is False) for value in vector.values], dtype=bool)
+
+    def select(self, mask, chosen: Vector, other: Vector) -> Vector:
+        #chosen where mask is set, other elsewhere
+        if chosen.kind == other.kind == "nil": return chosen
+        if chosen.kind == other.kind and chosen.kind != "object":
+            return Vector(chosen.kind, np.where(mask, chosen.values, other.values))
+        return self.narrow(np.where(mask, self.objects(chosen), self.objects(other)))
+
+    def per_row(self, expr: Expr, *operands: Vector) -> Vector:
+        #Scalar fallback for strings and mixed types: rebuild the node over literals for each row
+        columns: list = [self.objects(operand) for operand in operands]
+        results = np.full(self.rows, None, dtype=object)
+        errors: dict[str, Any] = {}
+
+        for row in range(self.rows):
+            if self.failed[row] or not self.active[row]: continue
+            literals: list[Literal] = [Literal(column[row]) for column in columns]
+            if isinstance(expr, Binary):
+                node: Expr = Binary(literals[0], expr.operator, literals[1])
+            else:
+                node = Unary(expr.operator, literals[0])
+
+            try:
+                results[row] = self.interpreter.evaluate(node)
+            except LoxRuntimeError as error:
+                errors.setdefault(error.message, []).append(row)
+            except ZeroDivisionError as error:
+                errors.setdefault(str(error), []).append(row)
+
+        for message, rows in errors.items():
+            mask = np.zeros(self.rows, dtype=bool)
+            mask[rows] = True
+            self.fail(mask, expr.operator, message)
+
+        return self.narrow(results)
+
+    def visit_literal_expr(self, expr: Literal) -> Vector:
+        return self.broadcast(expr.value)
+
+    def visit_grouping_expr(self, expr: Grouping) -> Vector:
+        return expr.expression.accept(self)
+
+    def visit_variable_expr(self, expr: Variable) -> Vector:
+        column: Vector|None = self.columns.get(expr.name.lexeme)
+        if column is None:
+            return self.fail_all(expr.name, f"Undefined variable '{expr.name.lexeme}'")
+        return column
+
+    def visit_assign_expr(self, expr: Assign) -> Vector:
+        value: Vector = expr.value.accept(self)
+        column: Vector|None = self.columns.get(expr.name.lexeme)
+        if column is None:
+            self.fail_all(expr.name, f"Undefined variable '{expr.name.lexeme}'")
+            return value
+        #Rows that did not run the assignment keep their old value
+        self.columns[expr.name.lexeme] = self.select(self.active & ~self.failed, value, column)
+        return value
+
+    def visit_logical_expr(self, expr: Logical) -> Vector:
+        left: Vector = expr.left.accept(self)
+        takes_right = self.truthy(left)
+        if expr.operator.type == TokenType.OR: takes_right = ~takes_right
+
+        active = self.active
+        self.active = active & takes_right
+        try:
+            right: Vector = expr.right.accept(self) if self.active.any() else Vector("nil", None)
+        finally:
+            self.active = active
+        return self.select(takes_right, right, left)
+
+    def visit_unary_expr(self, expr: Unary) -> Vector:
+        right: Vector = expr.right.accept(self)
+
+        if right.kind == "object":
+            return self.per_row(expr, right)
+
+        match expr.operator.type:
+            case TokenType.MINUS:
+                if right.kind != "number":
+                    return self.fail_all(expr.operator, "Operand must be a number")
+                return Vector("number", np.negative(right.values))
+            case TokenType.BANG:
+                if right.kind == "nil": return self.broadcast(True)
+                if right.kind == "number": return self.broadcast(False)
+                return Vector("bool", np.logical_not(right.values))
+
+        return Vector("nil", None)
+
+    def visit_binary_expr(self, expr: Binary) -> Vector:
+        left: Vector = expr.left.accept(self)
+        right: Vector = expr.right.accept(self)
+        type: TokenType = expr.operator.type
+
+        if left.kind == "object" or right.kind == "object":
+            return self.per_row(expr, left, right)
+
+        if type == TokenType.EQUAL_EQUAL or type == TokenType.BANG_EQUAL:
+            equal: Vector = self.equal(left, right)
+            if type == TokenType.BANG_EQUAL: equal.values = np.logical_not(equal.values)
+            return equal
+
+        if type == TokenType.PLUS:
+            if left.kind != "number" or right.kind != "number":
+                return self.fail_all(expr.operator, "Operands must be two numbers or two strings")
+            return Vector("number", np.add(left.values, right.values))
+
+        op: Callable|None = self.numeric_ops.get(type)
+        if op is None: return Vector("nil", None)
+        if left.kind != "number" or right.kind != "number":
+            return self.fail_all(expr.operator, "Operands must be numbers")
+
+        if type == TokenType.SLASH:
+            #The scalar Interpreter raises on division by zero instead of producing inf
+            self.fail(right.values == 0.0, expr.operator, "float division by zero")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return Vector("number", op(left.values, right.values))
+
+        values = op(left.values, right.values)
+        return Vector("bool" if values.dtype == bool else "number", values)
+
+    def equal(self, left: Vector, right: Vector) -> Vector:
+        if left.kind == "nil" or right.kind == "nil":
+            return self.broadcast(left.kind == right.kind)
+        #Matches Interpreter.is_equal, where true == 1 as in Python
+        return Vector("bool", np.equal(left.values, right.values))
@@ -0,0 +1 @@
+__version__: str = "0.1.0"
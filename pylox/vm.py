@@ -0,0 +1,162 @@
+from typing import Any
+from pylox.lox_token import Token
+from op_code import OpCode
+from lox_chunk import Chunk
+from lox_runtime_error import LoxRuntimeError
+from interpreter import Interpreter
+
+#Plain ints so the dispatch loop compares against locals instead of enum members
+CONSTANT: int = int(OpCode.CONSTANT)
+CONSTANT_LONG: int = int(OpCode.CONSTANT_LONG)
+NIL: int = int(OpCode.NIL)
+TRUE: int = int(OpCode.TRUE)
+FALSE: int = int(OpCode.FALSE)
+NEGATE: int = int(OpCode.NEGATE)
+NOT: int = int(OpCode.NOT)
+ADD: int = int(OpCode.ADD)
+SUBTRACT: int = int(OpCode.SUBTRACT)
+MULTIPLY: int = int(OpCode.MULTIPLY)
+DIVIDE: int = int(OpCode.DIVIDE)
+GREATER: int = int(OpCode.GREATER)
+GREATER_EQUAL: int = int(OpCode.GREATER_EQUAL)
+LESS: int = int(OpCode.LESS)
+LESS_EQUAL: int = int(OpCode.LESS_EQUAL)
+EQUAL: int = int(OpCode.EQUAL)
+NOT_EQUAL: int = int(OpCode.NOT_EQUAL)
+GET_GLOBAL: int = int(OpCode.GET_GLOBAL)
+SET_GLOBAL: int = int(OpCode.SET_GLOBAL)
+JUMP: int = int(OpCode.JUMP)
+JUMP_IF_FALSE: int = int(OpCode.JUMP_IF_FALSE)
+POP: int = int(OpCode.POP)
+RETURN: int = int(OpCode.RETURN)
+
+class VM:
+
+    def __init__(self, lox_interp=None):
+        self.lox_interp = lox_interp
+        #Read by GET_GLOBAL and written by SET_GLOBAL. Expressions can't declare a name, only the caller adds them
+        self.globals: dict[str, Any] = {}
+
+    def interpret(self, chunk: Chunk):
+        try:
+            value: Any = self.run(chunk)
+            print(Interpreter.stringify(value))
+        except LoxRuntimeError as error:
+            if self.lox_interp is not None:
+                self.lox_interp.runtime_error(error)
+
+    @staticmethod
+    def error(chunk: Chunk, ip: int, message: str) -> LoxRuntimeError:
+        token: Token = chunk.tokens[ip - 1]
+        return LoxRuntimeError(token, message)
+
+    def run(self, chunk: Chunk) -> Any:
+        code = chunk.code
+        constants: list[Any] = chunk.constants
+        stack: list[Any] = []
+        push = stack.append
+        pop = stack.pop
+        ip: int = 0
+
+        while True:
+            instruction: int = code[ip]
+            ip += 1
+
+            if instruction == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif instruction == ADD:
+                b: Any = pop()
+                a: Any = stack[-1]
+                if (a.__class__ is float and b.__class__ is float) or (a.__class__ is str and b.__class__ is str):
+                    stack[-1] = a + b
+                else:
+                    raise self.error(chunk, ip, "Operands must be two numbers or two strings")
+            elif instruction == SUBTRACT:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers")
+                stack[-1] = a - b
+            elif instruction == MULTIPLY:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers")
+                stack[-1] = a * b
+            elif instruction == DIVIDE:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers")
+                stack[-1] = a / b
+            elif instruction == NEGATE:
+                a = stack[-1]
+                if a.__class__ is not float:
+                    raise self.error(chunk, ip, "Operand must be a number")
+                stack[-1] = -a
+            elif instruction == GREATER:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers")
+                stack[-1] = a > b
+            elif instruction == GREATER_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers")
+                stack[-1] = a >= b
+            elif instruction == LESS:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers")
+                stack[-1] = a < b
+            elif instruction == LESS_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers")
+                stack[-1] = a <= b
+            elif instruction == EQUAL:
+                b = pop()
+                stack[-1] = Interpreter.is_equal(stack[-1], b)
+            elif instruction == NOT_EQUAL:
+                b = pop()
+                stack[-1] = not Interpreter.is_equal(stack[-1], b)
+            elif instruction == NOT:
+                a = stack[-1]
+                stack[-1] = a is None or a is False
+            elif instruction == NIL:
+                push(None)
+            elif instruction == TRUE:
+                push(True)
+            elif instruction == FALSE:
+                push(False)
+            elif instruction == CONSTANT_LONG:
+                push(constants[code[ip] | (code[ip + 1] << 8) | (code[ip + 2] << 16)])
+                ip += 3
+            elif instruction == JUMP_IF_FALSE:
+                a = stack[-1]
+                if a is None or a is False:
+                    ip += code[ip] | (code[ip + 1] << 8) | (code[ip + 2] << 16)
+                ip += 3
+            elif instruction == JUMP:
+                ip += (code[ip] | (code[ip + 1] << 8) | (code[ip + 2] << 16)) + 3
+            elif instruction == POP:
+                pop()
+            elif instruction == GET_GLOBAL:
+                name: str = constants[code[ip] | (code[ip + 1] << 8) | (code[ip + 2] << 16)]
+                ip += 3
+                if name not in self.globals:
+                    raise self.error(chunk, ip, f"Undefined variable '{name}'")
+                push(self.globals[name])
+            elif instruction == SET_GLOBAL:
+                name = constants[code[ip] | (code[ip + 1] << 8) | (code[ip + 2] << 16)]
+                ip += 3
+                if name not in self.globals:
+                    raise self.error(chunk, ip, f"Undefined variable '{name}'")
+                self.globals[name] = stack[-1]
+            elif instruction == RETURN:
+                return pop()
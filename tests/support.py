@@ -0,0 +1,51 @@
+import os
+import random
+import sys
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#pylox modules import each other both as top-level modules and through the pylox package
+for path in (os.path.join(ROOT, "pylox"), ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from pylox.lox_token import Token
+from token_type import TokenType
+
+#Pieces of source covering every token, literal and error the scanners know about
+FRAGMENTS: list[str] = [
+    "(", ")", "{", "}", ",", ".", "-", "+", ";", "*", "/", "!", "!=", "=", "==", "<", "<=", ">", ">=",
+    "1", "23.5", "7.", "foo", "_bar9", "and", "class", "nil", "true", "while",
+    '"str"', '"multi\nline"', "// comment\n", " ", "\t", "\r", "\n", "@", "#", "\0", "é"
+]
+
+class ErrorCollector:
+    #Stands in for Lox, keeping errors as (line, where, message) the way Lox reports them
+
+    def __init__(self):
+        self.errors: list[tuple[int, str, str]] = []
+
+    def error(self, token: Token|int, message: str):
+        if isinstance(token, Token):
+            where: str = "at end" if token.type == TokenType.EOF else f"at '{token.lexeme}'"
+            self.errors.append((token.line, where, message))
+        else:
+            self.errors.append((token, "", message))
+
+    def runtime_error(self, error):
+        self.errors.append((error.token.line, "", error.message))
+
+def random_source(rng: random.Random, size: int) -> str:
+    return "".join(rng.choice(FRAGMENTS) for _ in range(size))
+
+def token_tuples(tokens: list[Token]) -> list[tuple]:
+    return [(token.type, token.lexeme, token.literal, token.line) for token in tokens]
+
+def random_expression(rng: random.Random, depth: int) -> str:
+    roll: float = rng.random()
+    if depth == 0 or roll < 0.2:
+        return rng.choice(["1", "2.5", "0", "\"a\"", "true", "false", "nil"])
+    if roll < 0.35: return rng.choice(["-", "!"]) + random_expression(rng, depth - 1)
+    if roll < 0.5: return "(" + random_expression(rng, depth - 1) + ")"
+    op: str = rng.choice(["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "!=", "and", "or"])
+    return random_expression(rng, depth - 1) + f" {op} " + random_expression(rng, depth - 1)
@@ -0,0 +1,140 @@
+import gc
+import random
+import sys
+import unittest
+import weakref
+from typing import Any, Callable
+from support import ErrorCollector, random_expression
+from expr import *
+from scanner import Scanner
+from parser import Parser
+from lox_runtime_error import LoxRuntimeError
+from interpreter import Interpreter
+from resolver import Resolver
+from optimizer import Optimizer
+from closure_compiler import ClosureCompiler
+from python_compiler import PythonCompiler, SourceGenerator
+from compiler import Compiler
+from vm import VM
+
+NAMES: list[str] = ["a", "b", "c", "d"]
+
+def parse(source: str) -> Expr:
+    collector: ErrorCollector = ErrorCollector()
+    expression: Expr|None = Parser(Scanner(source, collector).scan_tokens(), collector).parse()
+    if collector.errors: raise ValueError(f"{collector.errors} in {source}")
+    return expression
+
+def random_operand(rng: random.Random, depth: int) -> str:
+    #random_expression with some leaves replaced by variables, d is never bound
+    if depth == 0 or rng.random() < 0.2: return rng.choice(NAMES)
+    if rng.random() < 0.3: return random_expression(rng, 2)
+    op: str = rng.choice(["+", "-", "*", "/", "<", ">=", "==", "!=", "and", "or"])
+    if rng.random() < 0.2: return f"{rng.choice(['-', '!'])}({random_operand(rng, depth - 1)} {op} {random_operand(rng, depth - 1)})"
+    return f"{random_operand(rng, depth - 1)} {op} {random_operand(rng, depth - 1)}"
+
+def outcome(evaluate: Callable[[Expr], Any], expression: Expr) -> tuple:
+    try:
+        return ("value", repr(evaluate(expression)))
+    except LoxRuntimeError as error:
+        return ("error", error.message, error.token.line, error.token.lexeme)
+    except ZeroDivisionError:
+        return ("zero division",)
+
+def bound_interpreter(expression: Expr, values: dict[str, Any]) -> Interpreter:
+    interpreter: Interpreter = Interpreter()
+    for name, value in values.items():
+        interpreter.globals[interpreter.global_slot(name)] = value
+    Resolver(interpreter).resolve_expression(expression)
+    return interpreter
+
+class BackendTest(unittest.TestCase):
+
+    def assert_backends_agree(self, source: str, values: dict[str, Any]):
+        expression: Expr = parse(source)
+        expected: tuple = outcome(bound_interpreter(expression, values).evaluate, expression)
+
+        #Each backend gets its own copy of the variables, assignments change them
+        optimized: Expr = Optimizer().optimize(parse(source))
+        closures: ClosureCompiler = ClosureCompiler()
+        closures.globals.update(values)
+        python: PythonCompiler = PythonCompiler()
+        python.globals.update(values)
+        vm: VM = VM()
+        vm.globals.update(values)
+
+        results: dict[str, tuple] = {
+            "optimizer": outcome(bound_interpreter(optimized, values).evaluate, optimized),
+            "closures": outcome(lambda expr: closures.compile(expr)(), expression),
+            "python": outcome(python.evaluate, expression),
+            "vm": outcome(lambda expr: vm.run(Compiler().compile(expr)), expression)
+        }
+        for backend, result in results.items():
+            self.assertEqual(result, expected, f"{backend} differs from Interpreter on {source} with {values}")
+
+    def test_literals_and_errors(self):
+        for source in ("1 + 2 * 3", '"a" + "b" == "ab"', '-"a"', '1 +\n"a"', "nil == false", "!nil and 1 or 2", "1 / 0"):
+            self.assert_backends_agree(source, {})
+
+    def test_variables(self):
+        self.assert_backends_agree("a = a + 1", {"a": 1.0})
+        self.assert_backends_agree("d", {})
+        self.assert_backends_agree("d = 1", {})
+
+    def test_random_expressions(self):
+        rng: random.Random = random.Random(0)
+        for _ in range(1000):
+            source: str = random_operand(rng, 4)
+            if rng.random() < 0.3: source = f"{rng.choice(NAMES)} = {source}"
+            values: dict[str, Any] = {name: rng.choice([1.0, 0.0, 2.5, None, True, False, "s"]) for name in NAMES[:3]}
+            self.assert_backends_agree(source, values)
+
+class PythonCompilerTest(unittest.TestCase):
+
+    def test_spilled_nodes_keep_evaluation_order(self):
+        #A tiny nesting limit spills nearly every node into a local
+        default: int = SourceGenerator.MAX_NESTING
+        SourceGenerator.MAX_NESTING = 2
+        try:
+            rng: random.Random = random.Random(1)
+            compiler: PythonCompiler = PythonCompiler(max_entries=32)
+            for _ in range(1000):
+                expression: Expr = parse(random_expression(rng, rng.randint(1, 7)))
+                self.assertEqual(outcome(compiler.evaluate, expression), outcome(Interpreter().evaluate, expression))
+        finally:
+            SourceGenerator.MAX_NESTING = default
+
+    def test_shared_code_uses_each_trees_constants(self):
+        #Same shape, so one code object runs with each tree's own constants and tokens
+        compiler: PythonCompiler = PythonCompiler()
+        self.assertEqual(compiler.evaluate(parse("(1 + 2) * 3")), 9.0)
+        self.assertEqual(outcome(compiler.evaluate, parse('(1 +\n"x") * 3')), outcome(Interpreter().evaluate, parse('(1 +\n"x") * 3')))
+        self.assertEqual(compiler.evaluate(parse("(4 + 5) * 6")), 54.0)
+        self.assertEqual(compiler.misses, 1)
+
+    def test_deep_expression(self):
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+        deep: Expr = parse("1" + " - 1" * 3000 + " == " + "-" * 500 + "2")
+        compiler: PythonCompiler = PythonCompiler()
+        self.assertEqual(compiler.evaluate(deep), Interpreter().evaluate(deep))
+        self.assertEqual(compiler.misses, 1)
+
+    def test_uncompiled_tree_is_collected(self):
+        def too_deep(generator: SourceGenerator, expression: Expr) -> str:
+            raise RecursionError()
+
+        generate = SourceGenerator.generate
+        SourceGenerator.generate = too_deep
+        try:
+            compiler: PythonCompiler = PythonCompiler()
+            tree: Expr = parse("1 + 2 * 3")
+            collected: weakref.ref = weakref.ref(tree)
+            self.assertEqual(compiler.evaluate(tree), 7.0)
+            del tree
+            gc.collect()
+            self.assertIsNone(collected())
+        finally:
+            SourceGenerator.generate = generate
+
+if __name__ == "__main__":
+    unittest.main()
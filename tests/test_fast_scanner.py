@@ -0,0 +1,38 @@
+import random
+import unittest
+from support import ErrorCollector, random_source, token_tuples
+from scanner import Scanner
+from fast_scanner import FastScanner
+
+def scan(scanner_class, source: str) -> tuple[list[tuple], list[tuple[int, str, str]]]:
+    collector: ErrorCollector = ErrorCollector()
+    tokens: list = scanner_class(source, collector).scan_tokens()
+    return token_tuples(tokens), collector.errors
+
+class FastScannerTest(unittest.TestCase):
+
+    def assert_same(self, source: str):
+        self.assertEqual(scan(Scanner, source), scan(FastScanner, source), f"FastScanner differs on {source!r}")
+
+    def test_empty(self):
+        self.assert_same("")
+
+    def test_lines(self):
+        self.assert_same('1 +\n"two\nlines" // comment\n\n  foo')
+
+    def test_errors(self):
+        self.assert_same('@ 1\n# "unterminated\nstring')
+
+    def test_numbers(self):
+        self.assert_same("7. 7.5 .5 12.34.56")
+
+    def test_random_sources(self):
+        rng: random.Random = random.Random(0)
+        for _ in range(2000):
+            source: str = random_source(rng, rng.randint(0, 60))
+            #Occasionally leave a string open at the end
+            if rng.random() < 0.1: source += '"open'
+            self.assert_same(source)
+
+if __name__ == "__main__":
+    unittest.main()
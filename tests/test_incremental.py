@@ -0,0 +1,87 @@
+import random
+import unittest
+from support import ErrorCollector, FRAGMENTS, random_source, random_expression, token_tuples
+from expr import *
+from scanner import Scanner
+from parser import Parser
+from incremental import IncrementalDocument
+
+def shape(expr: Expr|None) -> list:
+    #Preorder description including operator lines, so shifted tokens are checked too
+    out: list = []
+    stack: list[Expr|None] = [expr]
+    while stack:
+        node: Expr|None = stack.pop()
+        if node is None:
+            out.append(None)
+        elif isinstance(node, Literal):
+            out.append(("literal", type(node.value), node.value))
+        elif isinstance(node, Grouping):
+            out.append(("grouping",))
+            stack.append(node.expression)
+        elif isinstance(node, Unary):
+            out.append(("unary", node.operator.type, node.operator.line))
+            stack.append(node.right)
+        elif isinstance(node, Variable):
+            out.append(("variable", node.name.lexeme, node.name.line))
+        elif isinstance(node, Assign):
+            out.append(("assign", node.name.lexeme, node.name.line))
+            stack.append(node.value)
+        else:
+            out.append((type(node).__name__, node.operator.type, node.operator.line))
+            stack.append(node.right)
+            stack.append(node.left)
+    return out
+
+def full_parse(source: str) -> tuple[list, list, list]:
+    collector: ErrorCollector = ErrorCollector()
+    tokens: list = Scanner(source, collector).scan_tokens()
+    expression: Expr|None = Parser(tokens, collector).parse()
+    return token_tuples(tokens), collector.errors, shape(expression)
+
+class IncrementalDocumentTest(unittest.TestCase):
+
+    def assert_matches_full_parse(self, document: IncrementalDocument, edit: tuple[int, int, str]):
+        tokens, errors, tree = full_parse(document.source)
+        context: str = f"after {edit!r} giving {document.source!r}"
+        self.assertEqual(token_tuples(document.tokens), tokens, f"Tokens differ {context}")
+        self.assertEqual(document.errors(), errors, f"Errors differ {context}")
+        self.assertEqual(shape(document.expression), tree, f"Trees differ {context}")
+
+    def test_edit_shifts_later_lines(self):
+        document: IncrementalDocument = IncrementalDocument("(1 +\n2) *\n(3 -\n4)")
+        for edit in ((5, 0, "\n\n"), (0, 1, ""), (0, 0, "(")):
+            document.edit(*edit)
+            self.assert_matches_full_parse(document, edit)
+
+    def test_reuses_unchanged_groupings(self):
+        source: str = " +\n".join(f"({i} * 2 - {i})" for i in range(50))
+        document: IncrementalDocument = IncrementalDocument(source)
+        middle: int = source.index("(25 ") + 1
+        edit: tuple[int, int, str] = (middle, 2, "99")
+        document.edit(*edit)
+        self.assert_matches_full_parse(document, edit)
+        self.assertGreater(document.reused, 0)
+
+    def test_rejects_edit_outside_source(self):
+        document: IncrementalDocument = IncrementalDocument("1 + 2")
+        with self.assertRaises(ValueError):
+            document.edit(4, 5, "")
+
+    def test_random_edits(self):
+        rng: random.Random = random.Random(0)
+        for _ in range(200):
+            if rng.random() < 0.5:
+                source: str = random_source(rng, rng.randint(0, 40))
+            else:
+                source = random_expression(rng, 5).replace(" ", rng.choice([" ", "\n", " // c\n"]))
+            document: IncrementalDocument = IncrementalDocument(source)
+            for _ in range(20):
+                offset: int = rng.randint(0, len(document.source))
+                removed: int = rng.randint(0, min(len(document.source) - offset, 6))
+                inserted: str = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 3)))
+                document.edit(offset, removed, inserted)
+                self.assert_matches_full_parse(document, (offset, removed, inserted))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+#Puts pylox on the path
+import support
+import runner
+from lox import Lox
+
+LOX_TEST: str = os.path.join(support.ROOT, "tests", "lox_test.lox")
+
+def run_file(path: str, options: list[str]|None=None) -> tuple[int, str]:
+    out: io.StringIO = io.StringIO()
+    code: int = 0
+    with contextlib.redirect_stdout(out):
+        try:
+            Lox(["pylox", *(options or []), path])
+        except SystemExit as error:
+            code = error.code
+    return code, out.getvalue()
+
+def run_source(source: str, options: list[str]|None=None) -> tuple[int, str]:
+    with tempfile.TemporaryDirectory() as directory:
+        path: str = os.path.join(directory, "script.lox")
+        with open(path, "w") as f:
+            f.write(source)
+        return run_file(path, options)
+
+def served(scripts: list[str], options: list[str]|None=None) -> str:
+    out: io.StringIO = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Lox(["pylox", *(options or [])]).serve(io.StringIO("\n%%\n".join(scripts) + "\n"))
+    return out.getvalue()
+
+class BackendScriptTest(unittest.TestCase):
+
+    def test_expression_statement_prints_value_and_tree(self):
+        for backend in ("interpreter", "vm", "closure", "python"):
+            self.assertEqual(run_file(LOX_TEST, [f"--backend={backend}"]), (0, "-5617.41\n(* (- 123.0) 45.67)\n"))
+
+    def test_program_needs_interpreter_backend(self):
+        self.assertEqual(served(["print 1;", "print 2;\n1 + 2;"], ["--backend=vm"]),
+                         "The vm backend runs a single expression, programs need --backend=interpreter\n%% 64\n" * 2)
+        self.assertEqual(served(["print 1;"]), "1\n%% 0\n")
+
+class ScriptIsolationTest(unittest.TestCase):
+
+    def test_served_scripts_do_not_share_globals(self):
+        self.assertEqual(served(["var a = 42;\nprint a;", "print a;"]), "42\n%% 0\nUndefined variable 'a'\n[line 1]\n%% 70\n")
+
+    def test_served_scripts_keep_output_buffer_size(self):
+        self.assertEqual(served(["print 1;", "print 2;"], ["--output-buffer=0"]), "1\n%% 0\n2\n%% 0\n")
+
+    def test_runner_scripts_do_not_share_globals(self):
+        runner.init_worker([])
+        with tempfile.TemporaryDirectory() as directory:
+            paths: list[str] = []
+            for name, source in (("declare.lox", "var a = 42;\n"), ("use.lox", "print a;\n")):
+                paths.append(os.path.join(directory, name))
+                with open(paths[-1], "w") as f:
+                    f.write(source)
+
+            self.assertEqual(runner.run_script(paths[0]), (paths[0], 0, ""))
+            self.assertEqual(runner.run_script(paths[1]), (paths[1], 70, "Undefined variable 'a'\n[line 1]\n"))
+
+class DeepScriptTest(unittest.TestCase):
+
+    def test_deep_program(self):
+        #Thousands of levels, far past the recursion limit of a recursive parser or interpreter
+        depth: int = 5000
+        source: str = f"var a = {' + '.join(['1'] * depth)};\nprint {'-' * depth}a;\nprint {'(' * depth}a{')' * depth} == a;\n"
+        self.assertEqual(run_source(source), (0, "5000\nTrue\n"))
+
+    def test_deep_expression(self):
+        depth: int = 3000
+        self.assertEqual(run_source("-" * depth + "1"), (0, "1\n" + "(- " * depth + "1.0" + ")" * depth + "\n"))
+
+class StreamTest(unittest.TestCase):
+
+    def test_statements_run_as_they_are_parsed(self):
+        source: str = "var a = 1;\nprint a;\n{ var b = a + 1; print b; }\nprint (;\nprint 3;\n"
+        self.assertEqual(run_source(source), (65, "[line 4] Error at ';': Expect expression.\n"))
+        self.assertEqual(run_source(source, ["--stream"]), (65, "1\n2\n[line 4] Error at ';': Expect expression.\n"))
+
+    def test_same_output_as_whole_script(self):
+        for source in ("1 + 2;\n", "print 1;\nprint a;\nprint 2;\n", "var a = 1;\n{ var a = 2; print a; }\nprint a;\n"):
+            self.assertEqual(run_source(source, ["--stream"]), run_source(source))
+
+class ProgramOptionTest(unittest.TestCase):
+
+    SOURCE: str = "var a = 1;\n{ var b = a + 1; print b; }\nprint a;\n"
+
+    def test_program_is_cached(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = os.path.join(directory, "program.lox")
+            with open(path, "w") as f:
+                f.write(self.SOURCE)
+            cache_dir: str = os.path.join(directory, "cache")
+
+            out: io.StringIO = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                lox: Lox = Lox(["pylox", f"--cache-dir={cache_dir}"])
+                lox.run_file(path)
+                lox.reset()
+                lox.run_file(path)
+                fresh: Lox = Lox(["pylox", f"--cache-dir={cache_dir}"])
+                fresh.run_file(path)
+
+            self.assertEqual(out.getvalue(), "2\n1\n" * 3)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            self.assertEqual((lox.parse_cache.misses, lox.parse_cache.hits), (1, 1))
+            self.assertEqual(fresh.parse_cache.disk_hits, 1)
+
+    def test_program_is_profiled(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            lox: Lox = Lox(["pylox", "--profile"])
+            lox.run(self.SOURCE)
+
+        #Var, Literal, Block, Var, Binary, Variable, Literal, Print, Variable, Print, Variable
+        self.assertEqual(lox.profiler.counters["nodes"], 11)
+        self.assertEqual({name: lox.profiler.visits[name] for name in ("Var", "Block", "Print")}, {"Var": 2, "Block": 1, "Print": 2})
+
+class RunnerOptionTest(unittest.TestCase):
+
+    def test_unknown_option_is_a_usage_error(self):
+        out: io.StringIO = io.StringIO()
+        with contextlib.redirect_stdout(out), self.assertRaises(SystemExit) as raised:
+            runner.main(["runner", "--bogus", LOX_TEST])
+        self.assertEqual(raised.exception.code, 64)
+        self.assertEqual(out.getvalue(), f"Unknown option --bogus\n{runner.USAGE}\n")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,10 +10,22 @@ class GenerateAst():
         
         output_dir: str = args[1]
         self.define_ast(output_dir, "Expr", [
+            "Assign   : name, value, depth, slot",
             "Binary   : left, operator, right",
             "Grouping : expression",
             "Literal  : value",
-            "Unary    : operator, right"
+            "Logical  : left, operator, right",
+            "Unary    : operator, right",
+            "Variable : name, depth, slot"
+        ])
+
+        self.define_ast(output_dir, "Stmt", [
+            "Block      : statements",
+            "Expression : expression",
+            "If         : condition, then_branch, else_branch",
+            "Print      : expression",
+            "Var        : name, initializer",
+            "While      : condition, body"
         ])
 
     def define_ast(self, output_dir: str, base_name: str, types: list[str]):
@@ -38,6 +50,9 @@ class GenerateAst():
     @staticmethod
     def define_base_class(writer, base_name: str):
         writer.write(f"class {base_name}(ABC):\n")
+        #Weak references keep per-node caches from holding trees alive
+        writer.write("    __slots__ = (\"__weakref__\",)\n")
+        writer.write("\n")
         #Base accept method
         writer.write("    @abstractmethod\n")
         writer.write("    def accept(self, visitor):\n")
@@ -46,7 +61,9 @@ class GenerateAst():
 
     @staticmethod
     def define_visitor(writer, base_name: str, types: list[str]):
-        writer.write("class Visitor(ABC):\n")
+        #Expr keeps the plain name so both visitors can be star-imported together
+        visitor_name: str = "Visitor" if base_name == "Expr" else f"{base_name}Visitor"
+        writer.write(f"class {visitor_name}(ABC):\n")
 
         for type in types:
             type_name: str = type.split(":")[0].strip()
@@ -60,11 +77,17 @@ class GenerateAst():
     def define_type(writer, base_name: str, class_name: str, field_list: str):
         writer.write(f"class {class_name}({base_name}):\n")
 
+        #Slots instead of a per-instance __dict__
+        fields: list[str] = field_list.split(", ")
+        slots: str = ", ".join(f"\"{field.strip()}\"" for field in fields)
+        if len(fields) == 1: slots += ","
+        writer.write(f"    __slots__ = ({slots})\n")
+        writer.write("\n")
+
         #Constructor
         writer.write(f"    def __init__(self, {field_list}):\n")
 
         #Store paramaters in fields
-        fields: list[str] = field_list.split(", ")
         for field in fields:
             name: str = field.strip()
             writer.write(f"        self.{name} = {name}\n")